@@ -1,10 +1,139 @@
-import win32gui
-import win32process
+try:
+    import win32gui
+    import win32process
+except ImportError:  # 非Windows平台只能使用 x11/fake 焦点来源
+    win32gui = None
+    win32process = None
 import psutil
 import time
 import multiprocessing
 from multiprocessing import Process, Queue
+import queue
 import threading
+from collections import OrderedDict, deque
+from Focus_Source import FocusSource, create_focus_source
+from focus_snapshot import FocusSnapshot
+
+class _Win32WindowApi():
+    """WindowInfoCache 使用的 win32 查询函数"""
+    get_foreground_window = staticmethod(lambda: win32gui.GetForegroundWindow())
+    get_window_text = staticmethod(lambda hwnd: win32gui.GetWindowText(hwnd))
+    get_class_name = staticmethod(lambda hwnd: win32gui.GetClassName(hwnd))
+    get_window_pid = staticmethod(lambda hwnd: win32process.GetWindowThreadProcessId(hwnd)[1])
+
+
+class WindowInfoCache():
+    """
+    前台窗口信息的增量缓存。
+
+    - 前台窗口句柄(hwnd)不变时直接返回缓存，只按 title_refresh_interval 刷新标题
+    - hwnd 变化时才重新查询类名和进程ID
+    - 进程名按 PID 存入有界 LRU，并用进程创建时间校验，避免 PID 被复用后报错进程名
+
+    构造函数参数：
+    title_refresh_interval: 标题刷新间隔（秒）
+    max_processes: PID→进程名 LRU 的容量
+    api: 窗口查询函数集合，默认使用 win32gui/win32process，基准测试可传入伪造实现
+    """
+
+    def __init__(self, title_refresh_interval=2.0, max_processes=64, api=None):
+        self.title_refresh_interval = title_refresh_interval
+        self.max_processes = max_processes
+        self.api = api or _Win32WindowApi
+        self._info = None  # 当前缓存的窗口信息
+        self._title_time = 0.0  # 上次刷新标题的时间
+        self._process_names = OrderedDict()  # pid -> (create_time, process_name)
+        self.hits = 0  # hwnd 未变化，直接命中
+        self.misses = 0  # hwnd 变化，重新查询
+        self.process_hits = 0  # 进程名命中 LRU
+        self.process_misses = 0  # 进程名需要重新查询
+
+    def get(self):
+        """获取当前前台窗口信息"""
+        try:
+            hwnd = self.api.get_foreground_window()
+            now = time.monotonic()
+            info = self._info
+            if info is not None and info['window_handle'] == hwnd:
+                self.hits += 1
+                if now - self._title_time >= self.title_refresh_interval:
+                    self._title_time = now
+                    title = self.api.get_window_text(hwnd)
+                    if title != info['window_title']:
+                        # 生成新字典，已交给队列的旧字典保持不变
+                        info = dict(info, window_title=title)
+                        self._info = info
+                return info
+
+            self.misses += 1
+            pid = self.api.get_window_pid(hwnd)
+            self._info = {
+                'window_handle': hwnd,
+                'window_title': self.api.get_window_text(hwnd),
+                'class_name': self.api.get_class_name(hwnd),
+                'process_id': pid,
+                'process_name': self._process_name(pid)
+            }
+            self._title_time = now
+            return self._info
+        except Exception:
+            return None
+
+    def query_uncached(self):
+        """不经缓存完整查询一次（原有实现，供基准对比）"""
+        try:
+            hwnd = self.api.get_foreground_window()
+            pid = self.api.get_window_pid(hwnd)
+            try:
+                process_name = psutil.Process(pid).name()
+            except:
+                process_name = "Unknown"
+            return {
+                'window_handle': hwnd,
+                'window_title': self.api.get_window_text(hwnd),
+                'class_name': self.api.get_class_name(hwnd),
+                'process_id': pid,
+                'process_name': process_name
+            }
+        except Exception:
+            return None
+
+    def _process_name(self, pid):
+        """从 LRU 获取进程名，创建时间不一致（PID 被复用）时重新查询"""
+        try:
+            process = psutil.Process(pid)
+            create_time = process.create_time()
+        except Exception:
+            self._process_names.pop(pid, None)
+            return "Unknown"
+
+        cached = self._process_names.get(pid)
+        if cached is not None and cached[0] == create_time:
+            self.process_hits += 1
+            self._process_names.move_to_end(pid)
+            return cached[1]
+
+        self.process_misses += 1
+        try:
+            process_name = process.name()
+        except Exception:
+            return "Unknown"
+        self._process_names[pid] = (create_time, process_name)
+        self._process_names.move_to_end(pid)
+        while len(self._process_names) > self.max_processes:
+            self._process_names.popitem(last=False)
+        return process_name
+
+    def stats(self):
+        """命中/未命中计数"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'process_hits': self.process_hits,
+            'process_misses': self.process_misses,
+            'cached_processes': len(self._process_names),
+        }
+
 
 class Focus_Detection():
     """
@@ -15,7 +144,7 @@ class Focus_Detection():
     - 启动后台监测进程（start_monitoring）
     - 停止后台监测进程（stop_monitoring）
     - 获取当前活动窗口信息（get_active_window_info）
-    - 获取当前焦点信息（get_current_focus_info）
+    - 获取当前焦点信息（get_current_focus_info，读取共享快照，不经过队列）
     - 检查监测进程是否活跃（is_monitoring_active）
     - 设置中断回调函数（set_interrupt_callback）
     - 添加/移除中断目标进程（add_interrupt_target/remove_interrupt_target）
@@ -34,28 +163,54 @@ class Focus_Detection():
     其中：
     interrupt_callback用于设置当焦点切换到指定进程时触发的回调函数。
     构造函数参数：
-    无
+    source: 焦点来源，'auto'（默认，Windows 用前台切换钩子，X11 用属性监听）、
+            'polling'（原0.5秒轮询）、'winevent'、'x11'，或一个 FocusSource 实例
+    title_refresh_interval: 前台窗口不变时，窗口标题的刷新间隔（秒）
+    mode: 监测执行方式，'thread'（默认，进程内线程，启动快、不额外占用解释器内存）
+          或 'process'（独立子进程，原有方式）
 
     特殊使用限制或潜在的副作用：
     - 该类依赖于 `psutil`、`win32gui` 和 `win32process` 库，确保在使用前已安装。
-    - 监测进程为守护进程，程序退出时监测进程会自动终止。
+    - 监测线程/进程均为守护模式，程序退出时会自动终止。
+    - 启动后调用 add_interrupt_target/remove_interrupt_target 会立即对监测生效；
+      'process' 模式下通过队列把目标集快照同步给子进程，子进程中的转发线程收到后立即唤醒监测循环。
+    - 'process' 模式下 source 只能是来源名称（FocusSource 实例无法传入子进程）。
+    - 'process' 模式的焦点快照位于共享内存中，stop_monitoring 后仍可读取，对象销毁时释放。
     - 获取窗口信息时可能会受到系统权限的限制。
     """
     
-    def __init__(self):
-        self.info_queue = Queue()  # 创建一个队列，用于存储焦点窗口信息
-        self.interrupt_queue = Queue()  # 创建一个队列，用于存储中断事件
+    def __init__(self, source='auto', title_refresh_interval=2.0, mode='thread'):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"未知的监测模式: {mode}")
+        self.source = source  # 焦点来源名称或 FocusSource 实例
+        self.mode = mode  # 监测执行方式
+        self.window_cache = WindowInfoCache(title_refresh_interval=title_refresh_interval)  # 窗口信息缓存
+        # 线程模式只需普通队列，避免多进程队列的管道和feeder线程开销
+        queue_class = Queue if mode == 'process' else queue.Queue
+        # 最新焦点窗口信息：监测循环原地覆盖，读取方无锁读取（进程模式位于共享内存）
+        self.focus_snapshot = FocusSnapshot.create(shared=mode == 'process')
+        self.interrupt_queue = queue_class()  # 创建一个队列，用于存储中断事件
+        self.targets_updates = None  # 进程模式下子进程的目标集快照队列，每次启动新建
         self.monitor_process = None  # 创建一个进程变量，用于存储监测进程
+        self.monitor_thread = None  # 线程模式下的监测线程
+        self.focus_source = None  # 线程模式下正在使用的焦点来源
+        self.stop_event = None  # 通知监测循环退出
+        self.ready_event = None  # 监测循环开始等待焦点变化时置位
         self.latest_info = None  # 创建一个变量，用于存储最新焦点窗口信息
         self.running = False  # 创建一个变量，用于存储监测进程是否正在运行
         self.interrupt_targets = set()  # 存储需要监听中断的目标进程名
         self.interrupt_callback = None  # 中断回调函数
         self.interrupt_thread = None  # 中断处理线程
         self.interrupt_thread_running = False  # 中断线程运行状态
+        self.interrupt_wakeups = 0  # 中断线程被唤醒的次数
+        self.interrupt_latencies = deque(maxlen=256)  # 最近的入队→回调延迟（秒）
     
     def set_interrupt_callback(self, callback_function):
         """设置中断回调函数
         
+        回调在中断处理线程中被调用。若回调要操作 Qt 控件，请传入一个
+        Signal 的 emit（如 Client_UI.focus_signal.emit），由 Qt 排队转交给主线程执行。
+
         Args:
             callback_function: 回调函数，接收参数(event_type, process_name, window_info)
                              event_type: 'enter' 或 'exit'
@@ -71,6 +226,7 @@ class Focus_Detection():
             process_name: 进程名，如 'POWERPNT.EXE'
         """
         self.interrupt_targets.add(process_name.upper())
+        self._publish_targets()
     
     def remove_interrupt_target(self, process_name):
         """移除中断目标进程名
@@ -79,161 +235,275 @@ class Focus_Detection():
             process_name: 进程名
         """
         self.interrupt_targets.discard(process_name.upper())
+        self._publish_targets()
+
+    def _publish_targets(self):
+        """把目标集变化通知给正在运行的监测循环
+
+        线程模式下监测线程直接读取同一个 set，只需唤醒它按当前焦点重新判断；
+        进程模式下把目标集快照放入 targets_updates，由子进程替换本地副本。
+        """
+        if self.mode == 'process':
+            if self.monitor_process is not None and self.monitor_process.is_alive():
+                self.targets_updates.put(frozenset(self.interrupt_targets))
+        elif self.focus_source is not None:
+            self.focus_source.wake()
     
+    def _create_source(self):
+        """根据 self.source 创建焦点来源"""
+        if isinstance(self.source, FocusSource):
+            return self.source
+        return create_focus_source(self.source, self.get_active_window_info)
+
     @staticmethod
-    def _monitor_worker(queue, interrupt_queue, interrupt_targets):
-        """子进程工作函数，持续监测焦点窗口"""
-        detector = Focus_Detection()
-        previous_process = None
-        
-        while True:
-            try:
-                window_info = detector.get_active_window_info()
-                if window_info:
-                    current_process = window_info['process_name'].upper()
-                    
-                    # 检查是否需要触发中断事件
-                    if interrupt_targets:
-                        # 检查是否进入目标进程
-                        if current_process in interrupt_targets and (previous_process is None or previous_process not in interrupt_targets):
-                            interrupt_event = {
-                                'event_type': 'enter',
-                                'process_name': window_info['process_name'],
-                                'window_info': window_info,
-                                'timestamp': time.time()
-                            }
-                            interrupt_queue.put(interrupt_event)
-                        
-                        # 检查是否离开目标进程
-                        elif previous_process is not None and previous_process in interrupt_targets and current_process not in interrupt_targets:
-                            interrupt_event = {
-                                'event_type': 'exit',
-                                'process_name': previous_process,
-                                'window_info': window_info,
-                                'timestamp': time.time()
-                            }
-                            interrupt_queue.put(interrupt_event)
-                    
-                    previous_process = current_process
-                    
-                    # 将最新信息放入队列，如果队列满了就丢弃旧信息
-                    if not queue.empty():
-                        try:
-                            queue.get_nowait()  # 移除旧信息
-                        except:
-                            pass
-                    queue.put(window_info)
-                
-                time.sleep(0.5)  # 每0.5秒检测一次
-            except Exception as e:
-                print(f"监测进程错误: {e}")
-                time.sleep(1)
-    
+    def _track_focus(window_info, previous, interrupt_queue, interrupt_targets):
+        """根据窗口信息判断是否进入/离开目标进程
+
+        Args:
+            previous: 上一次的 (进程名, 是否为目标进程)，首次为 None
+        Returns:
+            本次的 (进程名, 是否为目标进程)
+        """
+        current_process = window_info['process_name'].upper()
+        in_target = current_process in interrupt_targets
+        was_in_target = previous is not None and previous[1]
+
+        # 在两个目标进程之间直接切换时，先报告离开旧进程，再报告进入新进程
+        switched = in_target and was_in_target and current_process != previous[0]
+
+        # 检查是否离开目标进程
+        if was_in_target and (not in_target or switched):
+            interrupt_event = {
+                'event_type': 'exit',
+                'process_name': previous[0],
+                'window_info': window_info,
+                'timestamp': time.time(),
+                'enqueue_time': time.monotonic()
+            }
+            interrupt_queue.put(interrupt_event)
+
+        # 检查是否进入目标进程
+        if in_target and (not was_in_target or switched):
+            interrupt_event = {
+                'event_type': 'enter',
+                'process_name': window_info['process_name'],
+                'window_info': window_info,
+                'timestamp': time.time(),
+                'enqueue_time': time.monotonic()
+            }
+            interrupt_queue.put(interrupt_event)
+
+        return current_process, in_target
+
+    @staticmethod
+    def _monitor_worker(snapshot, interrupt_queue, interrupt_targets, source='auto', stop_event=None,
+                        targets_updates=None, ready_event=None):
+        """工作函数，阻塞等待焦点来源报告前台窗口变化
+
+        Args:
+            snapshot: FocusSnapshot，进程模式下为共享内存名称，由子进程 attach
+            interrupt_targets: 目标进程名集合；线程模式下是与主对象共享的同一个 set
+            source: 焦点来源名称（子进程中只能传名称）或 FocusSource 实例
+            stop_event: 可选的停止事件，置位后循环退出
+            targets_updates: 进程模式下接收目标集快照的队列
+            ready_event: 开始等待焦点变化时置位，用于测量启动耗时
+        """
+        if isinstance(source, FocusSource):
+            focus_source = source
+        else:
+            focus_source = create_focus_source(source, WindowInfoCache().get)
+        attached = isinstance(snapshot, str)
+        if attached:
+            snapshot = FocusSnapshot.attach(snapshot)
+        focus_source.start()
+        if ready_event is not None:
+            ready_event.set()
+        previous = None
+        last_info = None
+        latest_targets = [interrupt_targets]
+        if targets_updates is not None:
+            # 进程模式：转发线程阻塞读取目标集快照，收到后立即唤醒 wait_for_change，
+            # 不必等到超时；stop_monitoring 放入的 None 只用于唤醒
+            def relay_targets():
+                while True:
+                    targets = targets_updates.get()
+                    if targets is not None:
+                        latest_targets[0] = targets
+                    focus_source.wake()
+                    if targets is None:
+                        return
+            threading.Thread(target=relay_targets, name="FocusTargetsRelay", daemon=True).start()
+
+        try:
+            while stop_event is None or not stop_event.is_set():
+                try:
+                    # 超时只是为了定期检查 stop_event，不代表焦点变化
+                    window_info = focus_source.wait_for_change(timeout=0.5)
+                    interrupt_targets = latest_targets[0]
+
+                    if window_info is None:
+                        # 超时或被唤醒：目标集可能已变化，按当前焦点重新判断
+                        if last_info is not None:
+                            previous = Focus_Detection._track_focus(
+                                last_info, previous, interrupt_queue, interrupt_targets
+                            )
+                        continue
+
+                    previous = Focus_Detection._track_focus(
+                        window_info, previous, interrupt_queue, interrupt_targets
+                    )
+                    last_info = window_info
+
+                    # 原地覆盖最新信息快照
+                    snapshot.write(window_info)
+                except Exception as e:
+                    print(f"监测进程错误: {e}")
+                    time.sleep(1)
+        finally:
+            focus_source.stop()
+            if attached:
+                snapshot.close()
+
     def _interrupt_handler(self):
-        """中断事件处理线程"""
+        """中断事件处理线程，阻塞等待事件，不做空转轮询"""
         while self.interrupt_thread_running:
             try:
-                if not self.interrupt_queue.empty():
-                    interrupt_event = self.interrupt_queue.get_nowait()
-                    if self.interrupt_callback:
-                        self.interrupt_callback(
-                            interrupt_event['event_type'],
-                            interrupt_event['process_name'],
-                            interrupt_event['window_info']
-                        )
-                time.sleep(0.1)  # 快速检查中断事件
+                interrupt_event = self.interrupt_queue.get()
+                self.interrupt_wakeups += 1
+                if interrupt_event is None:  # 停止哨兵
+                    break
+                if self.interrupt_callback:
+                    self.interrupt_callback(
+                        interrupt_event['event_type'],
+                        interrupt_event['process_name'],
+                        interrupt_event['window_info']
+                    )
+                    if 'enqueue_time' in interrupt_event:
+                        self.interrupt_latencies.append(time.monotonic() - interrupt_event['enqueue_time'])
             except Exception as e:
                 print(f"中断处理错误: {e}")
                 time.sleep(0.5)
+
+    def get_interrupt_stats(self):
+        """获取中断投递统计：唤醒次数和入队→回调延迟（毫秒）"""
+        latencies = sorted(self.interrupt_latencies)
+        return {
+            'wakeups': self.interrupt_wakeups,
+            'delivered': len(latencies),
+            'latency_p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+            'latency_max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        }
     
     def start_monitoring(self):
-        """启动后台监测进程"""
-        if self.monitor_process is None or not self.monitor_process.is_alive():
+        """启动后台监测（线程或子进程，取决于 mode）"""
+        if self.is_monitoring_active():
+            return
+        if self.mode == 'process':
+            # 上一个子进程可能没读完就退出了，队列里会留下旧快照或停止哨兵，新进程不能沿用
+            self.targets_updates = Queue()
+            self.stop_event = multiprocessing.Event()
+            self.ready_event = multiprocessing.Event()
             # 启动监测进程，传递中断目标列表
             self.monitor_process = Process(
                 target=self._monitor_worker, 
-                args=(self.info_queue, self.interrupt_queue, self.interrupt_targets)
+                args=(self.focus_snapshot.name, self.interrupt_queue, frozenset(self.interrupt_targets),
+                      self.source, self.stop_event, self.targets_updates, self.ready_event)
             )
             self.monitor_process.daemon = True  # 设置为守护进程
             self.monitor_process.start()
-            self.running = True
-            
-            # 启动中断处理线程
-            if self.interrupt_callback and not self.interrupt_thread_running:
-                self.interrupt_thread_running = True
-                self.interrupt_thread = threading.Thread(target=self._interrupt_handler)
-                self.interrupt_thread.daemon = True
-                self.interrupt_thread.start()
-            
-            print("焦点监测进程已启动")
-    
-
-    
-    def get_active_window_info(self):
-        """获取当前活动窗口信息"""
-        try:
-            # 获取前台窗口句柄
-            hwnd = win32gui.GetForegroundWindow()
-
-            # 获取窗口标题
-            window_title = win32gui.GetWindowText(hwnd)
+        else:
+            self.stop_event = threading.Event()
+            self.ready_event = threading.Event()
+            self.focus_source = self._create_source()
+            # 线程模式直接共享 interrupt_targets，之后的增删立即可见
+            self.monitor_thread = threading.Thread(
+                target=self._monitor_worker,
+                args=(self.focus_snapshot, self.interrupt_queue, self.interrupt_targets,
+                      self.focus_source, self.stop_event, None, self.ready_event)
+            )
+            self.monitor_thread.daemon = True
+            self.monitor_thread.start()
+        self.running = True
+        
+        # 启动中断处理线程
+        self._start_interrupt_thread()
+        
+        print(f"焦点监测已启动（{'进程' if self.mode == 'process' else '线程'}模式）")
 
-            # 获取窗口类名
-            class_name = win32gui.GetClassName(hwnd)
+    def wait_until_ready(self, timeout=None):
+        """等待监测循环就绪，返回是否在超时前就绪"""
+        return self.ready_event is not None and self.ready_event.wait(timeout)
 
-            # 获取进程ID
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+    def _start_interrupt_thread(self):
+        """启动中断处理线程（已设置回调且未运行时）"""
+        if self.interrupt_callback and not self.interrupt_thread_running:
+            self.interrupt_thread_running = True
+            self.interrupt_thread = threading.Thread(target=self._interrupt_handler)
+            self.interrupt_thread.daemon = True
+            self.interrupt_thread.start()
 
-            # 获取进程名
-            try:
-                process = psutil.Process(pid)
-                process_name = process.name()
-            except:
-                process_name = "Unknown"
+    def _stop_interrupt_thread(self):
+        """停止中断处理线程：放入哨兵唤醒阻塞中的 get"""
+        if self.interrupt_thread_running:
+            self.interrupt_thread_running = False
+            self.interrupt_queue.put(None)
+        if self.interrupt_thread and self.interrupt_thread.is_alive():
+            self.interrupt_thread.join(timeout=1)
+    
 
-            return {
-                'window_handle': hwnd,
-                'window_title': window_title,
-                'class_name': class_name,
-                'process_id': pid,
-                'process_name': process_name
-            }
-        except Exception as e:
+    
+    def get_active_window_info(self):
+        """获取当前活动窗口信息（经 WindowInfoCache 增量缓存）"""
+        if win32gui is None:
             return None
+        return self.window_cache.get()
+
+    def get_window_cache_stats(self):
+        """获取窗口信息缓存的命中/未命中计数"""
+        return self.window_cache.stats()
     
     def get_current_focus_info(self):
-        """获取当前焦点信息（从子进程获取最新数据）"""
-        try:
-            # 尝试从队列中获取最新信息
-            while not self.info_queue.empty():
-                self.latest_info = self.info_queue.get_nowait()
-            return self.latest_info
-        except:
-            return self.latest_info
+        """获取当前焦点信息（读取监测循环写入的快照，无锁、不序列化）"""
+        if self.focus_snapshot is not None:
+            self.latest_info = self.focus_snapshot.read()
+        return self.latest_info
     
     def is_monitoring_active(self):
-        """检查监测进程是否活跃"""
-        return self.monitor_process and self.monitor_process.is_alive()
+        """检查监测线程/进程是否活跃"""
+        worker = self.monitor_process if self.mode == 'process' else self.monitor_thread
+        return bool(worker and worker.is_alive())
+
     def stop_monitoring(self):
-        """停止监控进程"""
+        """停止监控线程/进程"""
+        self._stop_interrupt_thread()
+        if self.stop_event is not None:
+            self.stop_event.set()
+        if self.monitor_process is not None and self.monitor_process.is_alive():
+            self.targets_updates.put(None)  # 唤醒子进程，立即检查 stop_event
+        if hasattr(self, 'monitor_thread') and self.monitor_thread:
+            self.focus_source.wake()
+            self.monitor_thread.join(timeout=2)
+            self.monitor_thread = None
+            self.focus_source = None
         if hasattr(self, 'monitor_process') and self.monitor_process:
+            self.monitor_process.join(timeout=1)  # 先等待子进程自行退出
             if self.monitor_process.is_alive():
                 self.monitor_process.terminate()  # 终止进程
                 self.monitor_process.join(timeout=2)  # 等待进程结束
                 if self.monitor_process.is_alive():
                     self.monitor_process.kill()  # 强制结束
+        self.running = False
+
     def __del__(self):
         """析构函数，确保在对象销毁时正确清理所有资源"""
         try:
             # 停止中断处理线程
             if hasattr(self, 'interrupt_thread_running'):
-                self.interrupt_thread_running = False
-            
-            if hasattr(self, 'interrupt_thread') and self.interrupt_thread:
-                if self.interrupt_thread.is_alive():
-                    self.interrupt_thread.join(timeout=1)
+                self._stop_interrupt_thread()
             
-            # 停止监测进程
+            # 停止监测线程/进程
+            if hasattr(self, 'stop_event') and self.stop_event is not None:
+                self.stop_event.set()
             if hasattr(self, 'monitor_process') and self.monitor_process:
                 if self.monitor_process.is_alive():
                     self.monitor_process.terminate()
@@ -241,13 +511,10 @@ class Focus_Detection():
                     if self.monitor_process.is_alive():
                         self.monitor_process.kill()
             
-            # 清理队列资源
-            if hasattr(self, 'info_queue') and self.info_queue:
-                try:
-                    while not self.info_queue.empty():
-                        self.info_queue.get_nowait()
-                except:
-                    pass
+            # 释放焦点快照（进程模式下删除共享内存）
+            if getattr(self, 'focus_snapshot', None) is not None:
+                self.focus_snapshot.close(unlink=True)
+                self.focus_snapshot = None
                 
             if hasattr(self, 'interrupt_queue') and self.interrupt_queue:
                 try:
@@ -0,0 +1,329 @@
+import sys
+import os
+import queue
+import threading
+
+try:
+    import psutil
+except ImportError:  # 仅影响进程名解析
+    psutil = None
+
+
+def _process_name(pid):
+    """根据PID获取进程名，失败时返回 'Unknown'"""
+    try:
+        return psutil.Process(pid).name()
+    except Exception:
+        return "Unknown"
+
+
+class FocusSource():
+    """
+    焦点来源接口，Focus_Detection 的监测循环通过它获取前台窗口变化。
+
+    子类只需实现 wait_for_change：阻塞直到前台窗口变化（或超时），
+    返回与 Focus_Detection.get_active_window_info 相同结构的窗口信息字典，
+    超时返回 None。
+
+    - 轮询来源（PollingFocusSource）：定时调用查询函数，即原来的0.5秒轮询
+    - 事件来源（WinEventFocusSource / X11FocusSource）：由系统通知前台变化
+    - 伪造来源（FakeFocusSource）：由测试或基准脚本手动切换焦点
+    """
+
+    def start(self):
+        """启动来源（事件来源在这里注册钩子）"""
+
+    def stop(self):
+        """停止来源并释放资源"""
+
+    def wake(self):
+        """让阻塞中的 wait_for_change 立即返回 None（如中断目标集发生变化）"""
+
+    def wait_for_change(self, timeout=None):
+        """阻塞等待前台窗口变化
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待
+        Returns:
+            窗口信息字典，超时返回 None
+        """
+        raise NotImplementedError
+
+
+class PollingFocusSource(FocusSource):
+    """按固定间隔调用 get_info 的轮询来源（原有行为）"""
+
+    def __init__(self, get_info, interval=0.5):
+        self.get_info = get_info
+        self.interval = interval
+        self._stopped = False
+        self._wakeup = threading.Event()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def wait_for_change(self, timeout=None):
+        wait = self.interval if timeout is None else min(self.interval, timeout)
+        if self._wakeup.wait(wait):
+            if not self._stopped:
+                self._wakeup.clear()
+            return None
+        return self.get_info()
+
+
+class _QueuedFocusSource(FocusSource):
+    """事件来源的公共部分：后台线程把窗口信息放入队列，wait_for_change 阻塞读取"""
+
+    def __init__(self):
+        self._changes = queue.Queue()
+        self._thread = None
+        self._running = False
+
+    def _push(self, window_info):
+        if window_info:
+            self._changes.put(window_info)
+
+    def wake(self):
+        self._changes.put(None)
+
+    def wait_for_change(self, timeout=None):
+        try:
+            return self._changes.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class WinEventFocusSource(_QueuedFocusSource):
+    """
+    Windows 前台切换钩子来源。
+
+    使用 SetWinEventHook(EVENT_SYSTEM_FOREGROUND) 在独立线程中注册钩子并运行消息循环，
+    前台窗口一变化就会收到回调，无需轮询。
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    WM_QUIT = 0x0012
+
+    def __init__(self, get_info):
+        super().__init__()
+        self.get_info = get_info
+        self._thread_id = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._hook_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=2)
+        if self._error:
+            raise self._error
+
+    def _hook_loop(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+            self._push(self.get_info())
+
+        # 回调对象必须在钩子存续期间保持引用
+        self._callback = WinEventProc(on_event)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        hook = user32.SetWinEventHook(
+            self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND,
+            0, self._callback, 0, 0,
+            self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+        )
+        if not hook:
+            self._error = OSError("SetWinEventHook 注册失败")
+            self._ready.set()
+            return
+        self._thread_id = kernel32.GetCurrentThreadId()
+        self._ready.set()
+        # 启动时先推送一次当前前台窗口，作为初始状态
+        self._push(self.get_info())
+
+        msg = wintypes.MSG()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            user32.UnhookWinEvent(hook)
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        if self._thread_id:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        if self._thread:
+            self._thread.join(timeout=1)
+
+
+class X11FocusSource(_QueuedFocusSource):
+    """
+    X11 属性变化来源。
+
+    监听根窗口 _NET_ACTIVE_WINDOW 属性的 PropertyNotify 事件，依赖 python-xlib
+    （pyautogui 在 Linux 上已依赖它）。
+    """
+
+    def __init__(self, display_name=None):
+        super().__init__()
+        self.display_name = display_name
+
+    def start(self):
+        if self._running:
+            return
+        from Xlib import X, display
+
+        self._display = display.Display(self.display_name)
+        self._root = self._display.screen().root
+        self._atom_active = self._display.intern_atom('_NET_ACTIVE_WINDOW')
+        self._atom_pid = self._display.intern_atom('_NET_WM_PID')
+        self._atom_name = self._display.intern_atom('_NET_WM_NAME')
+        self._root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._display.flush()
+        self._running = True
+        self._push(self.get_active_window_info())
+        self._thread = threading.Thread(target=self._event_loop, daemon=True)
+        self._thread.start()
+
+    def _event_loop(self):
+        import select
+        from Xlib import X
+
+        fd = self._display.fileno()
+        while self._running:
+            # select 带超时，保证 stop 后线程能及时退出
+            if not self._display.pending_events():
+                readable, _, _ = select.select([fd], [], [], 0.2)
+                if not readable:
+                    continue
+            try:
+                event = self._display.next_event()
+            except Exception:
+                break
+            if event.type == X.PropertyNotify and event.atom == self._atom_active:
+                self._push(self.get_active_window_info())
+
+    def get_active_window_info(self):
+        """读取当前活动窗口信息，字段与 Focus_Detection.get_active_window_info 一致"""
+        from Xlib import X
+
+        try:
+            prop = self._root.get_full_property(self._atom_active, X.AnyPropertyType)
+            if not prop or not prop.value or not prop.value[0]:
+                return None
+            window_id = int(prop.value[0])
+            window = self._display.create_resource_object('window', window_id)
+            pid_prop = window.get_full_property(self._atom_pid, X.AnyPropertyType)
+            pid = int(pid_prop.value[0]) if pid_prop else 0
+            name_prop = window.get_full_property(self._atom_name, 0)
+            if name_prop:
+                title = name_prop.value
+                if isinstance(title, bytes):
+                    title = title.decode('utf-8', 'replace')
+            else:
+                title = window.get_wm_name() or ''
+            wm_class = window.get_wm_class()
+            return {
+                'window_handle': window_id,
+                'window_title': title,
+                'class_name': wm_class[1] if wm_class else '',
+                'process_id': pid,
+                'process_name': _process_name(pid) if pid else "Unknown"
+            }
+        except Exception:
+            return None
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1)
+        try:
+            self._display.close()
+        except Exception:
+            pass
+
+
+class FakeFocusSource(_QueuedFocusSource):
+    """
+    可脚本化的伪造来源，用于 Linux 下的测试和基准。
+
+    set_focus 模拟一次前台切换：立即推送给事件式等待者，
+    同时 get_active_window_info 返回新状态，供 PollingFocusSource 轮询。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._handle = 0
+        self.current_info = None
+
+    def set_focus(self, process_name, window_title='', class_name='', process_id=0):
+        """切换伪造的前台窗口"""
+        self._handle += 1
+        self.current_info = {
+            'window_handle': self._handle,
+            'window_title': window_title,
+            'class_name': class_name,
+            'process_id': process_id,
+            'process_name': process_name
+        }
+        self._push(self.current_info)
+
+    def get_active_window_info(self):
+        return self.current_info
+
+
+def default_source_name():
+    """根据当前平台选择默认的焦点来源"""
+    if sys.platform == 'win32':
+        return 'winevent'
+    if os.environ.get('DISPLAY'):
+        try:
+            import Xlib  # noqa: F401
+            return 'x11'
+        except ImportError:
+            pass
+    return 'polling'
+
+
+def create_focus_source(name, get_info, interval=0.5):
+    """按名称创建焦点来源
+
+    Args:
+        name: 'auto'、'polling'、'winevent'、'x11' 或 'fake'
+        get_info: 查询当前前台窗口信息的函数（轮询和 Windows 钩子使用）
+        interval: 轮询间隔（秒）
+    """
+    if name == 'auto':
+        name = default_source_name()
+    if name == 'polling':
+        return PollingFocusSource(get_info, interval)
+    if name == 'winevent':
+        return WinEventFocusSource(get_info)
+    if name == 'x11':
+        return X11FocusSource()
+    if name == 'fake':
+        return FakeFocusSource()
+    raise ValueError(f"未知的焦点来源: {name}")
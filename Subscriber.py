@@ -2,125 +2,219 @@
 import paho.mqtt.client as mqtt
 import time
 import logging
-import pyautogui
+import threading
+import uuid
+from collections import deque
 
-from PySide6.QtCore import QObject, Signal, Slot
+from gesture_transport import (Gesture_Subscriber, STATE_IDLE, STATE_CONNECTING, STATE_CONNECTED,
+                               STATE_RETRYING, STATE_FAILED)
+import gesture_trace
 # MQTT配置
 MQTT_BROKER = "localhost"
 MQTT_PORT = 1883
 MQTT_TOPIC = "gesture/control"
-CLIENT_ID = f"Publisher_{int(time.time())}"  # 客户端ID，确保唯一性
-# 命令到操作的映射
-COMMAND_ACTIONS = {
-    "page_up": lambda:pyautogui.press('up'),
-    "page_down":lambda:pyautogui.press('down'),
-    "zoom_in":lambda:pyautogui.hotkey('ctrl','+'),
-    "zoom_out":lambda:pyautogui.hotkey('ctrl','-'),
-    "left": lambda: pyautogui.press('left'),
-    "right": lambda:pyautogui.press('right')
-}
-
-class Mqtt_Subscriber(QObject):
-    signal = Signal(str)  # 根据实际需要调整参数类型
-    def __init__(self,username=None, password=None, timeout=60):
+CLIENT_ID = f"PPT_Client_{uuid.getnode():012x}"  # 客户端ID，按本机固定，断线重连后沿用同一个持久会话
+
+class Mqtt_Subscriber(Gesture_Subscriber):
+    """
+    MQTT 手势订阅者。
+
+    构造时不连接；调用 start() 后在唯一的网络线程里完成连接、订阅和消息处理，
+    连接进度通过 state_changed 信号通知界面：
+    connecting -> connected，连接失败时 retrying 并按带抖动的指数退避重试，
+    首次连接超过 connect_timeout 仍未连上则 failed 并退出网络线程；
+    连上之后断线会一直自动重连。
+
+    使用固定的客户端ID和持久会话（clean_session=False）：断线期间代理会保留订阅并
+    暂存 QoS 1 手势，重连后补发。进程首次连接前会先用 clean session 连一次，
+    清掉上一次运行遗留的会话，避免启动时重放旧手势。
+
+    收到消息后的处理（门控、去重、过期、过滤、信号）在基类 gesture_transport.Gesture_Subscriber 中。
+    """
+    display_name = "MQTT代理"
+    def __init__(self,username=None, password=None, timeout=60, command_filter=None, max_command_age=1.0,
+                 broker=MQTT_BROKER, port=MQTT_PORT, connect_timeout=10, retry_interval=0.5,
+                 max_retry_interval=30, client_id=CLIENT_ID, devices=None, pause_when_unfocused=None):
+        """
+        Args:
+            command_filter: 传入 CommandFilter 的关键字参数（debounce、windows、edge、rate、burst），
+                            默认按 action_interval 对每个命令去抖
+            max_command_age: 带发布时间戳的命令超过该时长（秒）即视为过期并丢弃，None 表示不检查
+            connect_timeout: 首次连接的总超时（秒），超时后状态变为 failed
+            retry_interval: 重连退避的初始间隔（秒），每次失败翻倍
+            max_retry_interval: 重连退避的最大间隔（秒）
+            client_id: MQTT 客户端ID，默认按本机固定
+            devices: device_routing.DeviceRouter，给定时订阅其通配符主题并按设备策略路由，
+                     None 时只订阅单一主题 MQTT_TOPIC
+            pause_when_unfocused: 焦点不在目标程序时是否暂停投递：None 只在 on_message 中丢弃；
+                                  'unsubscribe' 取消订阅，代理不再发送；
+                                  'qos0' 降为 QoS 0 订阅，代理不再为离焦期间的手势排队和重发
+        """
         # 设置日志
-        super().__init__()
+        super().__init__(command_filter=command_filter, max_command_age=max_command_age,
+                         connect_timeout=connect_timeout, retry_interval=retry_interval,
+                         max_retry_interval=max_retry_interval, logger_name=f"MQTTClient.{client_id}")
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        self.logger = logging.getLogger(f"MQTTClient.{CLIENT_ID}")
-        self.client = mqtt.Client(client_id=CLIENT_ID, callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
+        self.client_id = client_id
+        self.client = mqtt.Client(client_id=client_id, callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+                                  clean_session=False)
         self.use_new_api = True
-        self.broker = MQTT_BROKER
-        self.port = MQTT_PORT
-        self.topic = MQTT_TOPIC
+        self.broker = broker
+        self.port = port
+        self.router = devices
+        self.topic = devices.topic_filter if devices is not None else MQTT_TOPIC
         self.username = username
         self.password = password
         self.timeout = timeout
         self.connected = False
         self.client.on_message = self.on_message
+        # 重连指标
+        self.reconnect_count = 0  # 断线后成功重连的次数
+        self.connect_attempts = 0  # 连接尝试总次数
+        self.outages = deque(maxlen=50)  # 最近每次断线到恢复的时长（秒）
+        self._disconnected_at = None  # 本次断线的开始时间
+        self._session_purged = False
+        self._session_subscribed = False  # 本进程是否已在持久会话中确认过订阅
+        self._network_thread = None
+        self._stop_event = threading.Event()
 
-        # 防止过快连操作
-        self.last_action_time = 0
-        self.action_interval = 0.5  # 最小操作问隔(秒)
+        # 离焦时暂停投递（焦点门控本身在基类中）
+        if pause_when_unfocused not in (None, 'unsubscribe', 'qos0'):
+            raise ValueError(f"未知的暂停方式: {pause_when_unfocused}")
+        self.pause_when_unfocused = pause_when_unfocused
+        self.pauses = 0  # 离焦时暂停投递的次数
 
         # 设置回调函数
         self.client.on_connect = self.on_connect
         self.client.on_disconnect = self.on_disconnect
+        self.client.on_subscribe = self.on_subscribe
 
         # 设置认证
         if username and password:
             self.client.username_pw_set(username, password)
 
-        # 连接MQTT代理
-        self.connect()
-  
-    def start_to_connect(self):
-        # 初始化MQTT订阅者
-        mqtt_subscriber = Mqtt_Subscriber(
-            client_id=CLIENT_ID,
-            broker=MQTT_BROKER,
-            port=MQTT_PORT,
-            topic=MQTT_TOPIC
-        )
-
-        # 等待MQTT连接
-        print("等待MQTT连接...")
-        connect_timeout = 10
-        start_time = time.time()
-        while not mqtt_subscriber.connected:
-            time.sleep(0.5)
-            if time.time() - start_time > connect_timeout:
-                print("MQTT连接超时!")
-                return False
-
-        print(f"成功连接到MQTT代理: {MQTT_BROKER}:{MQTT_PORT}")
-        mqtt_subscriber.subscribe(MQTT_TOPIC)
-        print(f"已订阅主题: {MQTT_TOPIC}")
-
-        mqtt_subscriber.client.on_message = mqtt_subscriber.on_message
-        # 启动MQTT循环
-        mqtt_subscriber.client.loop_start()
-
-        return mqtt_subscriber
-    def connect(self):
-        try:
-            self.logger.info(f"尝试连接到MQTT代理: {self.broker}:{self.port}")
-            self.client.connect(self.broker, self.port, keepalive=60)
-            self.client.subscribe(self.topic)
-            self.client.loop_start()
-
-            # 等待连接建立
-            retry = 0
-            while not self.connected and retry < 10:
-                self.logger.debug(f"等待连接建立...({retry + 1}/10)")
-                time.sleep(0.5)
-                retry += 1
-
-            if self.connected:
-                self.logger.info("成功连接到MQTT代理")
-            else:
+    def start(self):
+        """非阻塞地启动连接，立即返回；进度见 state_changed"""
+        if self._network_thread is not None and self._network_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._network_thread = threading.Thread(target=self._network_loop, daemon=True)
+        self._network_thread.start()
+
+    def endpoint(self):
+        return f"{self.display_name} {self.broker}:{self.port}（主题 {self.topic}）"
+
+    def _purge_stale_session(self):
+        """用同一客户端ID以 clean session 连接一次再断开，让代理丢弃上次运行遗留的会话"""
+        purge = mqtt.Client(client_id=self.client_id, callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+                            clean_session=True)
+        if self.username and self.password:
+            purge.username_pw_set(self.username, self.password)
+        purge.connect(self.broker, self.port, keepalive=10)
+        deadline = time.monotonic() + 2
+        while not purge.is_connected() and time.monotonic() < deadline:
+            if purge.loop(timeout=0.1) != mqtt.MQTT_ERR_SUCCESS:
+                break
+        purge.disconnect()
+        purge.loop(timeout=0.1)
+        self._session_purged = True
+
+    def _network_loop(self):
+        """唯一的网络线程：连接、处理消息和心跳，断线后按退避策略重连"""
+        started = time.monotonic()
+        ever_connected = False
+        attempt = 0
+        while not self._stop_event.is_set():
+            self._set_state(STATE_CONNECTING)
+            self.connect_attempts += 1
+            session_up = False
+            try:
+                self.logger.info(f"尝试连接到MQTT代理: {self.broker}:{self.port}")
+                if not self._session_purged:
+                    self._purge_stale_session()
+                self.client.connect(self.broker, self.port, keepalive=60)
+                # 处理 CONNACK、消息和心跳，直到连接断开或被要求停止
+                while not self._stop_event.is_set():
+                    if self.client.loop(timeout=0.2) != mqtt.MQTT_ERR_SUCCESS:
+                        break
+                    if self.connected and not session_up:
+                        session_up = ever_connected = True
+                        attempt = 0
+            except Exception as e:
+                self.logger.error(f"连接异常: {e}")
+            if session_up and self._disconnected_at is None:
+                self._disconnected_at = time.monotonic()
+            self.connected = False
+            if self._stop_event.is_set():
+                break
+            if not ever_connected and time.monotonic() - started >= self.connect_timeout:
                 self.logger.error("连接超时，未能建立连接")
+                self._set_state(STATE_FAILED)
+                return
+            delay = self._retry_delay(attempt)
+            attempt += 1
+            self.logger.warning(f"{delay:.2f}秒后重连（第{attempt}次）")
+            self._set_state(STATE_RETRYING)
+            self._stop_event.wait(delay)
+        self._set_state(STATE_IDLE)
 
-            return self.connected
-        except Exception as e:
-            self.logger.error(f"连接异常: {e}")
-            return False
+    def get_connection_stats(self):
+        """获取连接/重连指标"""
+        outages = list(self.outages)
+        return {
+            'state': self.state,
+            'connect_attempts': self.connect_attempts,
+            'reconnects': self.reconnect_count,
+            'last_outage_ms': outages[-1] * 1000 if outages else 0.0,
+            'max_outage_ms': max(outages) * 1000 if outages else 0.0,
+            'total_downtime_s': sum(outages),
+        }
 
-    def on_disconnect(self, client, userdata, rc):
+    def on_disconnect(self, client, userdata, disconnect_flags, rc, properties=None):
         self.connected = False
         if rc != 0:
             self.logger.warning(f"意外断开连接，返回码: {rc}")
         else:
             self.logger.info("正常断开连接")
 
+    def _focus_changed(self, focused):
+        """配置了 pause_when_unfocused 时调整订阅，让代理在离焦期间少发或不发"""
+        if self.pause_when_unfocused is not None and self.connected:
+            if not focused:
+                self.pauses += 1
+            self._apply_subscription()
+
+    def _apply_subscription(self):
+        """按焦点和暂停方式订阅/取消订阅"""
+        paused = self.pause_when_unfocused is not None and self.target_focused is False
+        if paused and self.pause_when_unfocused == 'unsubscribe':
+            self.client.unsubscribe(self.topic)
+            self._set_state(STATE_CONNECTED)
+        else:
+            self.client.subscribe(self.topic, qos=0 if paused else 1)
+
     def on_message(self, client, userdata, msg):
-        """MQTT消息回调函数"""
-        command = msg.payload.decode('utf-8')
-        print(f"收到命令: {command}")
-        self.signal.emit(command)
-       
+        """MQTT消息回调函数：按主题路由后交给基类处理"""
+        route = None
+        router = self.router
+        if router is not None and self.target_focused is not False:
+            route = router.route(msg.topic)
+            if route is None:
+                if gesture_trace.RECORDER is not None:
+                    gesture_trace.RECORDER.record(None, 'unrouted')
+                return
+        self.handle_payload(msg.payload, route)
+
+    def get_device_stats(self):
+        """获取每个设备的计数，未启用多设备路由时返回 None"""
+        return self.router.stats() if self.router is not None else None
 
-    def on_subscribe(self, client, userdata, mid, granted_qos):
+
+    def on_subscribe(self, client, userdata, mid, granted_qos, properties=None):
         self.logger.debug(f"订阅成功 (ID: {mid}, QoS: {granted_qos})")
+        self._session_subscribed = True
+        # 订阅确认后才算就绪
+        self._set_state(STATE_CONNECTED)
 
 
     def on_connect(self, client, userdata, flags, reason_code, properties=None):
@@ -128,6 +222,18 @@ class Mqtt_Subscriber(QObject):
             if reason_code == 0:
                 self.connected = True
                 self.logger.info(f"成功连接到MQTT代理")
+                if self._disconnected_at is not None:
+                    self.outages.append(time.monotonic() - self._disconnected_at)
+                    self._disconnected_at = None
+                    self.reconnect_count += 1
+                if flags.session_present and self._session_subscribed and self.pause_when_unfocused is None:
+                    # 持久会话仍在，且本进程此前在该会话中订阅过，代理保留了订阅；
+                    # 首次连接时 session_present 可能来自清理前的旧会话，不能信任
+                    self._set_state(STATE_CONNECTED)
+                else:
+                    # 在连接回调中订阅，重连后也会自动恢复订阅；
+                    # 离线期间焦点可能变化过，按暂停方式重新订阅
+                    self._apply_subscription()
             else:
                 self.connected = False
                 self.logger.error(f"连接失败: {reason_code}")
@@ -141,9 +247,18 @@ class Mqtt_Subscriber(QObject):
                 self.logger.error(f"连接失败: {rc}")
 
     def disconnect(self):
+        """断开连接并停止网络线程"""
+        self.command_filter.cancel_pending()
+        self._stop_event.set()
         if self.connected:
-            self.client.loop_stop()
             self.client.disconnect()
+        if self._network_thread is not None and self._network_thread is not threading.current_thread():
+            self._network_thread.join(timeout=2)
+        self._network_thread = None
+
+    def stop(self):
+        """同 disconnect()，各传输方式统一的停止接口"""
+        self.disconnect()
 
     def subscribe(self, topic, qos=1):
         if not self.connected:
@@ -165,7 +280,7 @@ class Mqtt_Subscriber(QObject):
             if hasattr(self, 'client') and self.client:
                 if self.connected:
                     self.logger.info("对象销毁时断开MQTT连接")
-                    self.client.loop_stop()
+                    self._stop_event.set()
                     self.client.disconnect()
                 # 清理客户端引用
                 self.client = None
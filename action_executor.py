@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import deque
+
+import latency_metrics
+from gesture_profiles import MAX_REPEAT
+
+
+class ActionExecutor():
+    """
+    手势动作执行器：在独立线程中执行 script 动作，避免阻塞 Qt 界面线程。
+
+    - 待执行命令存放在有界队列中，相邻的相同命令合并为一次批量注入
+      （如连续5个 "1" 合并为一次 5 倍的动作）；带重复次数的命令按次数累加，
+      一批最多 max_times 次，超出时另起一批
+    - 相反的命令（上/下、放大/缩小、左/右）会抵消队尾尚未执行的命令
+    - 绝对动作（ABSOLUTE，如跳转到第 N 页）的 times 是目标值，相邻的同一动作只保留最后一条
+    - 队列满时按 overflow 策略丢弃：'drop_oldest' 丢最早的，'drop_newest' 丢新来的
+
+    构造函数参数：
+    actions: {命令: 可调用对象}，可调用对象接收重复次数 times
+    max_pending: 队列中最多保留的（合并后的）命令条数
+    overflow: 'drop_oldest' 或 'drop_newest'
+    max_times: 一批动作的最大重复次数，默认与 gesture_profiles.MAX_REPEAT 相同
+
+    使用示例：
+    executor = ActionExecutor({"1": my_script.down_sliding})
+    executor.start()
+    executor.submit("1")
+    """
+
+    # 互为相反动作的命令（手势命令和 script 动作名两种写法）
+    OPPOSITE = {
+        "0": "1", "1": "0", "2": "3", "3": "2", "4": "5", "5": "4",
+        "up_sliding": "down_sliding", "down_sliding": "up_sliding",
+        "zoom_in": "zoom_out", "zoom_out": "zoom_in",
+        "Left_sliding": "Right_sliding", "Right_sliding": "Left_sliding",
+    }
+    # times 表示目标值而不是次数的动作，不合并、不抵消
+    ABSOLUTE = frozenset({"6", "goto_slide"})
+
+    def __init__(self, actions, max_pending=16, overflow='drop_oldest', max_times=MAX_REPEAT):
+        if overflow not in ('drop_oldest', 'drop_newest'):
+            raise ValueError(f"未知的溢出策略: {overflow}")
+        self.actions = actions
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.max_times = max_times
+        self._pending = deque()  # 元素为 [命令, 次数, trace]
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.submitted = 0  # 提交的命令数
+        self.coalesced = 0  # 被合并进已有条目的命令数
+        self.cancelled = 0  # 与相反命令互相抵消的命令数
+        self.dropped = 0  # 因队列满被丢弃的命令数
+        self.executed = 0  # 实际执行的批次数
+
+    def start(self):
+        """启动执行线程"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止执行线程，丢弃尚未执行的命令"""
+        with self._condition:
+            self._running = False
+            self._pending.clear()
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def submit(self, command, trace=None, times=1):
+        """提交一个命令，返回处理结果；未被接受（未知命令、drop_newest 时队列满）返回 None
+
+        合并时保留最早那条命令的 trace，统计的是批次中等待最久的延迟。
+
+        Args:
+            command: 命令
+            trace: 延迟统计用的 trace
+            times: 重复次数（带参数的命令），超过 max_times 时截断；绝对动作为目标值
+        Returns:
+            'queued' 入队、'coalesced' 并入队尾的相同命令、'cancelled' 与队尾的相反命令完全抵消、
+            'overflow' 入队并丢弃了最早的一条（drop_oldest），或 None
+        """
+        if command not in self.actions:
+            return None
+        absolute = command in self.ABSOLUTE
+        if not absolute:
+            times = min(times, self.max_times)
+        if trace is not None:
+            trace['queued'] = time.monotonic()
+        with self._condition:
+            self.submitted += 1
+            pending = self._pending
+            if pending:
+                tail = pending[-1]
+                if tail[0] == command and (absolute or tail[1] + times <= self.max_times):
+                    if absolute:
+                        tail[1] = times  # 只有最后的目标值有意义
+                    else:
+                        tail[1] += times
+                    self.coalesced += 1
+                    return 'coalesced'
+                if tail[0] == self.OPPOSITE.get(command):
+                    cancelled = min(tail[1], times)
+                    tail[1] -= cancelled
+                    times -= cancelled
+                    self.cancelled += 2 * cancelled
+                    if tail[1] == 0:
+                        pending.pop()
+                    if times == 0:
+                        return 'cancelled'
+            outcome = 'queued'
+            if len(pending) >= self.max_pending:
+                self.dropped += 1
+                if self.overflow == 'drop_newest':
+                    return None
+                pending.popleft()
+                outcome = 'overflow'
+            pending.append([command, times, trace])
+            self._condition.notify()
+            return outcome
+
+    def _run(self):
+        """执行线程：阻塞等待命令，逐批执行"""
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                command, times, trace = self._pending.popleft()
+            if trace is not None:
+                trace['started'] = time.monotonic()
+            try:
+                self.actions[command](times)
+                self.executed += 1
+            except Exception as e:
+                print(f"❌ 执行动作 {command} 出错: {e}")
+                continue
+            if trace is not None:
+                trace['finished'] = time.monotonic()
+                recorder = latency_metrics.RECORDER
+                if recorder is not None:
+                    recorder.finish(trace)
+
+    def queue_depth(self):
+        """当前队列深度：(合并后的条目数, 待执行的命令总数)"""
+        with self._condition:
+            return len(self._pending), sum(1 if entry[0] in self.ABSOLUTE else entry[1] for entry in self._pending)
+
+    def stats(self):
+        """执行器计数"""
+        entries, commands = self.queue_depth()
+        return {
+            'submitted': self.submitted,
+            'coalesced': self.coalesced,
+            'cancelled': self.cancelled,
+            'dropped': self.dropped,
+            'executed': self.executed,
+            'queue_entries': entries,
+            'queue_commands': commands,
+        }
@@ -0,0 +1,1115 @@
+"""
+性能基准脚本。
+
+用法：
+    python benchmark.py focus-latency [--rounds 20]
+    python benchmark.py interrupt-delivery [--idle 3] [--events 50]
+    python benchmark.py window-cache [--ticks 20000] [--switch-every 200]
+    python benchmark.py focus-modes [--start-method spawn]
+    python benchmark.py action-latency [--actions 30]
+    python benchmark.py wire-format [--messages 200000]
+    python benchmark.py startup-connect [--no-broker]
+    python benchmark.py reconnect [--outage 2] [--queued 5]
+    python benchmark.py stage-latency [--gestures 200] [--rate 50]
+    python benchmark.py device-routing [--messages 200000]
+    python benchmark.py focus-gate [--messages 500]
+    python benchmark.py focus-snapshot [--reads 100000] [--write-interval 0.001] [--duration 3]
+    python benchmark.py ui-updates [--rate 500] [--duration 2]
+    python benchmark.py input-backends [--backends all] [--iterations 50] [--delay 3]
+    python benchmark.py gesture-dispatch [--messages 200000]
+    python benchmark.py batch-commands [--counts 5,10,20] [--interval 0.02] [--pause 0.01]
+    python benchmark.py recognition [--file recording.csv] [--gestures 300] [--window 50] [--hop 5]
+    python benchmark.py transport-latency [--transports mqtt,serial,udp,zmq] [--messages 500] [--interval 0.005] [--burst 2000]
+    python benchmark.py e2e [--rates 10,50,200] [--duration 5] [--format binary] [--output e2e.jsonl]
+
+所有基准都使用伪造的焦点来源/输入后端，可以在没有 PowerPoint 的 Linux 机器上运行。
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import random
+import statistics
+import threading
+import time
+
+
+def _percentile(values, p):
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary_ms(values):
+    """把秒为单位的样本汇总为毫秒统计"""
+    ms = [v * 1000 for v in values]
+    return {
+        'count': len(ms),
+        'mean': statistics.fmean(ms) if ms else 0.0,
+        'p50': _percentile(ms, 50),
+        'p95': _percentile(ms, 95),
+        'max': max(ms) if ms else 0.0,
+    }
+
+
+def _print_summary(title, summary):
+    print(f"{title}: n={summary['count']} mean={summary['mean']:.2f}ms "
+          f"p50={summary['p50']:.2f}ms p95={summary['p95']:.2f}ms max={summary['max']:.2f}ms")
+
+
+def _measure_focus_latency(source_kind, rounds):
+    """测量从焦点切换到 enter/exit 回调的延迟"""
+    from Focus_Detection import Focus_Detection
+    from Focus_Source import FakeFocusSource, PollingFocusSource
+
+    fake = FakeFocusSource()
+    if source_kind == 'polling':
+        source = PollingFocusSource(fake.get_active_window_info, interval=0.5)
+    else:
+        source = fake
+
+    fired = threading.Event()
+    fired_at = []
+
+    def callback(event_type, process_name, window_info):
+        fired_at.append(time.perf_counter())
+        fired.set()
+
+    detector = Focus_Detection(source=source, mode='thread')
+    detector.set_interrupt_callback(callback)
+    detector.add_interrupt_target("POWERPNT.EXE")
+    fake.set_focus("explorer.exe")
+    detector.start_monitoring()
+    detector.wait_until_ready(timeout=2)
+    time.sleep(0.6)
+
+    latencies = []
+    for i in range(rounds):
+        # 随机间隔，避免总是落在轮询周期的同一相位
+        time.sleep(random.uniform(0.05, 0.3))
+        fired.clear()
+        changed_at = time.perf_counter()
+        fake.set_focus("POWERPNT.EXE" if i % 2 == 0 else "explorer.exe")
+        if fired.wait(timeout=2):
+            latencies.append(fired_at[-1] - changed_at)
+
+    detector.stop_monitoring()
+    return latencies
+
+
+def bench_focus_latency(args):
+    """对比轮询来源和事件来源的焦点切换延迟"""
+    for kind in ('polling', 'event'):
+        _print_summary(f"焦点切换→回调延迟 [{kind}]", _summary_ms(_measure_focus_latency(kind, args.rounds)))
+
+
+def bench_interrupt_delivery(args):
+    """测量中断线程空闲时的唤醒频率，以及入队→Qt主线程回调的延迟"""
+    from PySide6.QtCore import QCoreApplication, QObject, Signal
+    from Focus_Detection import Focus_Detection
+
+    class Bridge(QObject):
+        signal = Signal(str, str, object)
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    received = []
+    bridge = Bridge()
+    bridge.signal.connect(lambda event_type, name, info: received.append(time.monotonic()))
+
+    detector = Focus_Detection(source='fake')
+    detector.set_interrupt_callback(bridge.signal.emit)
+    detector._start_interrupt_thread()
+
+    # 空闲阶段：没有任何事件时线程应当零唤醒
+    cpu_start = time.process_time()
+    time.sleep(args.idle)
+    idle_cpu = time.process_time() - cpu_start
+    print(f"空闲 {args.idle}s: 唤醒 {detector.interrupt_wakeups / args.idle:.2f} 次/秒, CPU {idle_cpu * 1000:.1f}ms")
+
+    latencies = []
+    for i in range(args.events):
+        enqueue_time = time.monotonic()
+        detector.interrupt_queue.put({
+            'event_type': 'enter' if i % 2 == 0 else 'exit',
+            'process_name': "POWERPNT.EXE",
+            'window_info': {},
+            'timestamp': time.time(),
+            'enqueue_time': enqueue_time
+        })
+        count = len(received)
+        deadline = time.monotonic() + 2
+        while len(received) == count and time.monotonic() < deadline:
+            app.processEvents()
+        if len(received) > count:
+            latencies.append(received[-1] - enqueue_time)
+        time.sleep(0.01)
+
+    detector._stop_interrupt_thread()
+    _print_summary("入队→主线程回调延迟", _summary_ms(latencies))
+
+
+def bench_window_cache(args):
+    """对比缓存前后每次获取前台窗口信息的开销"""
+    from Focus_Detection import WindowInfoCache
+
+    class FakeWindowApi():
+        """伪造的窗口查询：前台窗口每 switch_every 次切换一次，进程固定为当前进程"""
+        tick = 0
+        get_window_text = staticmethod(lambda hwnd: f"演示文稿{hwnd}.pptx")
+        get_class_name = staticmethod(lambda hwnd: "PPTFrameClass")
+        get_window_pid = staticmethod(lambda hwnd: os.getpid())
+
+        @classmethod
+        def get_foreground_window(cls):
+            cls.tick += 1
+            return 1000 + cls.tick // args.switch_every
+
+    cache = WindowInfoCache(title_refresh_interval=2.0, api=FakeWindowApi)
+    for title, query in (("无缓存", cache.query_uncached), ("有缓存", cache.get)):
+        FakeWindowApi.tick = 0
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            query()
+        elapsed = time.perf_counter() - start
+        print(f"{title}: 每次 {elapsed / args.ticks * 1e6:.2f}us")
+    print(f"缓存统计: {cache.stats()}")
+
+
+def bench_focus_modes(args):
+    """对比线程模式和进程模式的启动耗时与内存占用"""
+    import multiprocessing
+    import psutil
+    from Focus_Detection import Focus_Detection
+
+    if args.start_method:
+        # Windows 上只有 spawn，可在 Linux 上用它模拟
+        multiprocessing.set_start_method(args.start_method, force=True)
+
+    def total_rss():
+        me = psutil.Process()
+        return me.memory_info().rss + sum(child.memory_info().rss for child in me.children(recursive=True))
+
+    for mode in ('thread', 'process'):
+        detector = Focus_Detection(source='polling', mode=mode)
+        detector.add_interrupt_target("POWERPNT.EXE")
+        rss_before = total_rss()
+        start = time.perf_counter()
+        detector.start_monitoring()
+        ready = detector.wait_until_ready(timeout=10)
+        startup = time.perf_counter() - start
+        rss_delta = total_rss() - rss_before
+        detector.stop_monitoring()
+        print(f"[{mode}] 启动耗时 {startup * 1000:.1f}ms, 内存增量 {rss_delta / 1024 / 1024:.1f}MB"
+              f"{'' if ready else '（未就绪）'}")
+
+
+ACTION_NAMES = ('up_sliding', 'down_sliding', 'zoom_in', 'zoom_out', 'Left_sliding', 'Right_sliding')
+
+
+def bench_action_latency(args):
+    """对比原有“每次动画回中”与按需回中策略的单次动作耗时"""
+    from input_backend import RecordingBackend
+    from script import script
+
+    legacy = script(
+        backend=RecordingBackend(pause=0.1),  # 模拟 pyautogui 默认 PAUSE
+        target_area=None,
+        animations={name: 0.2 for name in ACTION_NAMES}
+    )
+    cursor_aware = script(backend=RecordingBackend())
+    for title, actuator in (("原有策略", legacy), ("按需回中", cursor_aware)):
+        latencies = []
+        for i in range(args.actions):
+            if i % 10 == 0:
+                actuator.backend.cursor = (0, 0)  # 偶尔模拟用户把光标移出目标区域
+            action = getattr(actuator, ACTION_NAMES[i % len(ACTION_NAMES)])
+            start = time.perf_counter()
+            action()
+            latencies.append(time.perf_counter() - start)
+        _print_summary(f"动作耗时 [{title}]", _summary_ms(latencies))
+
+
+def bench_input_backends(args):
+    """逐个输入后端测量每个动作的注入耗时，选出本机最快的后端
+
+    除 recording 外的后端会向当前焦点窗口注入真实的按键和滚轮，
+    请先切换到一个空白文档（翻页、缩放各动作成对执行，文档状态基本不变）。
+    """
+    from input_backend import BACKENDS, create_backend
+    from script import script
+
+    names = list(BACKENDS) if args.backends == 'all' else args.backends.split(',')
+    if any(name != 'recording' for name in names) and args.delay:
+        print(f"⚠ 将向当前焦点窗口注入真实按键和滚轮，请在 {args.delay:g} 秒内切换到一个空白文档")
+        time.sleep(args.delay)
+    medians = {}
+    for name in names:
+        try:
+            actuator = script(backend=create_backend(name))
+        except Exception as e:
+            print(f"⏭ {name}: 不可用（{type(e).__name__}: {e}）")
+            continue
+        latencies = {action_name: [] for action_name in ACTION_NAMES}
+        for _ in range(args.iterations):
+            for action_name in ACTION_NAMES:
+                action = getattr(actuator, action_name)
+                start = time.perf_counter()
+                action()
+                latencies[action_name].append(time.perf_counter() - start)
+        for action_name, values in latencies.items():
+            _print_summary(f"[{name}] {action_name}", _summary_ms(values))
+        medians[name] = statistics.median(v for values in latencies.values() for v in values)
+        close = getattr(actuator.backend, 'close', None)
+        if close is not None:
+            close()
+    real = {name: median for name, median in medians.items() if name != 'recording'}
+    if real:
+        fastest = min(real, key=real.get)
+        print(f"🏁 本机最快的后端: {fastest}（动作耗时中位数 {real[fastest] * 1000:.3f}ms），"
+              f"启动时使用 --input-backend {fastest}")
+
+
+def bench_wire_format(args):
+    """对比文本/JSON/二进制载荷的解析+分发开销"""
+    from gesture_protocol import SequenceWindow, decode_payload, encode_binary, encode_text
+
+    handled = [0] * 6
+    handlers = {str(i): (lambda i=i: handled.__setitem__(i, handled[i] + 1)) for i in range(6)}
+
+    def dispatch_match(command):
+        # 原有 Client_UI.gesture_callback 的逐个字符串匹配
+        match command:
+            case "0": handlers["0"]()
+            case "1": handlers["1"]()
+            case "2": handlers["2"]()
+            case "3": handlers["3"]()
+            case "4": handlers["4"]()
+            case "5": handlers["5"]()
+
+    now = time.time()
+    commands = [str(i % 6) for i in range(args.messages)]
+    plain = [c.encode('utf-8') for c in commands]
+    json_payloads = [encode_text(c, now) for c in commands]
+    binary = [encode_binary(c, i, now) for i, c in enumerate(commands)]
+
+    def run_plain():
+        for payload in plain:
+            dispatch_match(payload.decode('utf-8'))
+
+    def run_json():
+        for payload in json_payloads:
+            dispatch_match(decode_payload(payload).command)
+
+    def run_binary():
+        window = SequenceWindow()
+        for payload in binary:
+            message = decode_payload(payload)
+            if window.accept(message.sequence, message.timestamp):
+                handlers[message.command]()
+
+    cases = (("旧文本", plain, run_plain), ("JSON带时间戳", json_payloads, run_json),
+             ("二进制(含去重)", binary, run_binary))
+    for title, payloads, run in cases:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f"{title}: 每条 {elapsed / args.messages * 1e9:.0f}ns, 载荷 {len(payloads[0])}字节")
+
+
+class _CountingExecutor():
+    """只计数的执行器，用于单独测量分发开销"""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, command, trace=None, times=1):
+        self.submitted += 1
+
+
+def _legacy_gesture_callback(ui, event_type, trace=None):
+    """原有写法：每条手势先检查焦点，再逐个匹配命令字符串"""
+    if trace is not None:
+        trace['dispatched'] = time.monotonic()
+    if ui.in_ppt:
+        match event_type:
+            case "0":
+                ui.executor.submit("up_sliding", trace)
+                ui.labels.set_text(ui.ui.label2, "🟢 向上翻页！")
+            case "1":
+                ui.executor.submit("down_sliding", trace)
+                ui.labels.set_text(ui.ui.label2, "🟢 向下翻页！")
+            case "2":
+                ui.executor.submit("zoom_in", trace)
+                ui.labels.set_text(ui.ui.label2, "🟢 放大！")
+            case "3":
+                ui.executor.submit("zoom_out", trace)
+                ui.labels.set_text(ui.ui.label2, "🟢 缩小！")
+            case "4":
+                ui.executor.submit("Left_sliding", trace)
+                ui.labels.set_text(ui.ui.label2, "🟢 左键")
+            case "5":
+                ui.executor.submit("Right_sliding", trace)
+                ui.labels.set_text(ui.ui.label2, "🟢 右键")
+
+
+def bench_gesture_dispatch(args):
+    """对比原有 match 分发与按配置编译的分发表，并测量切换配置的开销"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtWidgets import QApplication
+    from client_do import Client_UI
+    from input_backend import RecordingBackend
+
+    QApplication.instance() or QApplication([])
+    ui = Client_UI(backend=RecordingBackend())
+    ui.load_automation()
+    ui.executor.stop()
+    ui.executor = _CountingExecutor()
+    commands = [str(i % 6) for i in range(args.messages)]
+    for focus in ("POWERPNT.EXE", None):
+        ui.switch_profile(focus)
+        for title, dispatch in (("match 分发", lambda command: _legacy_gesture_callback(ui, command)),
+                                ("分发表", ui.gesture_callback)):
+            start = time.perf_counter()
+            for command in commands:
+                dispatch(command)
+            elapsed = time.perf_counter() - start
+            print(f"[{'焦点在PPT' if focus else '焦点不在PPT'}] {title}: 每条 {elapsed / args.messages * 1e9:.0f}ns")
+    start = time.perf_counter()
+    for i in range(args.messages):
+        ui.switch_profile("POWERPNT.EXE" if i % 2 else None)
+    elapsed = time.perf_counter() - start
+    print(f"切换分发表: 每次 {elapsed / args.messages * 1e9:.0f}ns")
+    with contextlib.redirect_stdout(io.StringIO()):
+        ui.close()
+
+
+def bench_batch_commands(args):
+    """N 条单步手势与 1 条带参数的命令对比：从发布第一条到最后一次注入的耗时、消息数和注入调用数"""
+    import itertools
+    import logging
+    from e2e_harness import GesturePipeline, drive, payload_factory
+
+    logging.getLogger().setLevel(logging.WARNING)
+    pipeline = GesturePipeline().start()
+    backend = pipeline.ui.script.backend
+    backend.pause = args.pause  # 模拟每次注入调用的耗时
+    sequences = itertools.count()
+    try:
+        for count in (int(value) for value in args.counts.split(',')):
+            cases = (
+                (f"{count} 条 \"1\"（向下翻页）", [(index * args.interval, payload_factory("1", 'binary', sequences))
+                                                for index in range(count)]),
+                (f"1 条 \"1:{count}\"", [(0.0, payload_factory("1", 'binary', sequences, count))]),
+                (f"1 条 \"6:{count}\"（跳转到第{count}页）", [(0.0, payload_factory("6", 'binary', sequences, count))]),
+            )
+            for title, schedule in cases:
+                calls = len(backend.calls)
+                started = time.perf_counter()
+                result = drive(pipeline, schedule)
+                finished = backend.calls[-1][2] if len(backend.calls) > calls else started
+                print(f"{title}: 耗时 {(finished - started) * 1000:7.1f}ms  消息 {result['sent']}  "
+                      f"批次 {result['batches']}  注入调用 {len(backend.calls) - calls}")
+    finally:
+        pipeline.close()
+
+
+def bench_recognition(args):
+    """从原始采样识别手势：准确率、整段批量识别和逐帧识别的吞吐
+
+    数据为录制文件或模拟的 IMU 数据，前一半用于训练模板分类器，后一半用于评估两种分类器。
+    """
+    import gesture_recognition as recognition
+
+    if args.file:
+        samples, labels = recognition.load_recording(args.file)
+    else:
+        samples, labels = recognition.synthetic_recording(args.gestures, rate=args.rate, seed=args.seed)
+    half = len(samples) // 2
+    train, test, test_labels = samples[:half], samples[half:], labels[half:]
+    print(f"数据: {len(samples)} 帧（{len(samples) / args.rate:.0f}s @ {args.rate}Hz），"
+          f"测试集 {len(recognition.label_events(test_labels))} 个手势")
+    classifiers = {
+        'threshold': recognition.ThresholdClassifier(),
+        'template': recognition.TemplateClassifier.from_recording(train, labels[:half], args.window, args.hop),
+    }
+    for name, classifier in classifiers.items():
+        recognizer = recognition.GestureRecognizer(classifier, args.window, args.hop)
+        start = time.perf_counter()
+        detections = recognizer.push_many(test)
+        batch = time.perf_counter() - start
+        result = recognition.evaluate(detections, test_labels, tolerance=args.window)
+        delay = result['mean_delay_frames']
+        print(f"[{name}] 正确 {result['correct']}/{result['events']}（{result['accuracy']:.1%}），"
+              f"误判 {result['wrong']}，漏检 {result['missed']}，误报 {result['false_positive']}，"
+              f"平均检测时刻 {'-' if delay is None else f'{delay / args.rate * 1000:+.0f}ms'}（相对手势结束）")
+
+        recognizer = recognition.GestureRecognizer(classifier, args.window, args.hop)
+        start = time.perf_counter()
+        streamed = [(index + 1, command) for index, frame in enumerate(test)
+                    if (command := recognizer.push(frame)) is not None]
+        stream = time.perf_counter() - start
+        assert streamed == detections, "逐帧与整段识别结果不一致"
+        print(f"[{name}] 整段批量: {len(test) / batch / 1e3:.0f}k 帧/s；"
+              f"逐帧: 每帧 {stream / len(test) * 1e6:.1f}µs（{len(test) / stream / 1e3:.0f}k 帧/s，"
+              f"实时 {args.rate}Hz 占用 {stream / len(test) * args.rate:.2%} 单核）")
+
+
+def _mqtt_link(options):
+    """MQTT：进程内代理替身 + paho 发布端，返回 (接收端, send(载荷), close())"""
+    import paho.mqtt.client as mqtt
+    from broker_stub import BrokerStub
+    from Subscriber import Mqtt_Subscriber
+
+    broker = BrokerStub().start()
+    subscriber = Mqtt_Subscriber(broker="127.0.0.1", port=broker.port, client_id="transport_bench", **options)
+    publisher = mqtt.Client(client_id="transport_publisher", callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
+    publisher.connect("127.0.0.1", broker.port)
+    publisher.loop_start()
+
+    def close():
+        publisher.loop_stop()
+        publisher.disconnect()
+        subscriber.stop()
+        broker.stop()
+    return subscriber, lambda payload: publisher.publish(subscriber.topic, payload, qos=1), close
+
+
+def _serial_link(options):
+    """串口：伪终端对，设备端直接写 master，返回 (接收端, send(载荷), close())"""
+    import tty
+    from serial_transport import Serial_Subscriber, encode_frame
+
+    master, slave = os.openpty()
+    tty.setraw(master)
+    subscriber = Serial_Subscriber(os.ttyname(slave), **options)
+
+    def close():
+        subscriber.stop()
+        os.close(master)
+        os.close(slave)
+    return subscriber, lambda payload: os.write(master, encode_frame(payload)), close
+
+
+def _udp_link(options):
+    """UDP：本机回环，系统分配端口，返回 (接收端, send(载荷), close())"""
+    import socket
+    from lan_transport import Udp_Subscriber
+
+    subscriber = Udp_Subscriber(host="127.0.0.1", port=0, **options)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def close():
+        subscriber.stop()
+        sender.close()
+    # 端口在接收线程打开后才确定，发送时再取
+    return subscriber, lambda payload: sender.sendto(payload, ("127.0.0.1", subscriber.port)), close
+
+
+def _zmq_link(options):
+    """ZeroMQ：本机回环，接收端 PULL bind 随机端口，设备端 PUSH 连接，返回 (接收端, send(载荷), close())"""
+    import zmq
+    from lan_transport import Zmq_Subscriber
+
+    subscriber = Zmq_Subscriber("tcp://127.0.0.1:*", mode='pull', **options)
+    context = zmq.Context.instance()
+    pusher = []
+
+    def send(payload):
+        if not pusher:
+            sock = context.socket(zmq.PUSH)
+            sock.setsockopt(zmq.LINGER, 0)
+            sock.connect(subscriber.address)
+            pusher.append(sock)
+        pusher[0].send(payload)
+
+    def close():
+        subscriber.stop()
+        for sock in pusher:
+            sock.close()
+    return subscriber, send, close
+
+
+_TRANSPORT_LINKS = {'mqtt': _mqtt_link, 'serial': _serial_link, 'udp': _udp_link, 'zmq': _zmq_link}
+
+
+def _transport_burst(app, name, send, sent_at, latencies, offset, count):
+    """连续发送 count 条，收齐或 1 秒内没有新消息时结束，打印吞吐和丢失"""
+    from PySide6.QtCore import QEventLoop, QTimer
+    from gesture_protocol import encode_binary
+
+    received = len(latencies)
+    last = [received, time.perf_counter()]  # 最近一次看到新消息时的 (数量, 时刻)，精度为轮询间隔
+
+    def finished():
+        now = time.perf_counter()
+        if len(latencies) != last[0]:
+            last[:] = [len(latencies), now]
+        return len(latencies) - received >= count or now - last[1] > 1.0
+
+    loop = QEventLoop()
+    watcher = QTimer()
+    watcher.timeout.connect(lambda: finished() and loop.quit())
+    watcher.start(20)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for index in range(offset, offset + count):
+            sent_at[index] = time.perf_counter()
+            send(encode_binary("1", index, None, index))
+        loop.exec()
+    watcher.stop()
+    got = len(latencies) - received
+    elapsed = last[1] - start
+    print(f"[{name}] 连续 {count} 条：收到 {got}（丢失 {count - got}），"
+          f"{got / elapsed if got and elapsed > 0 else 0:.0f} 条/s")
+
+
+def bench_transport_latency(args):
+    """各传输方式从设备发送到界面线程收到 signal 的延迟
+
+    载荷为二进制格式，参数字段携带序号，收到 "1:序号" 后按发送时刻计算延迟。
+    --burst 大于 0 时再不加间隔地连续发送，测量吞吐和丢失（UDP 缓冲区满时会丢包）。
+    """
+    import logging
+    from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+    from gesture_protocol import encode_binary, split_command
+
+    logging.getLogger().setLevel(logging.WARNING)
+    app = QCoreApplication.instance() or QCoreApplication([])
+    options = {'command_filter': {'debounce': 0}, 'max_command_age': None}
+    for name in args.transports.split(','):
+        subscriber, send, close = _TRANSPORT_LINKS[name](options)
+        sent_at = {}
+        latencies = []
+        subscriber.signal.connect(lambda command, trace: latencies.append(
+            time.perf_counter() - sent_at[split_command(command)[1]]))
+        subscriber.start()
+        if not _pump(app, 5, until=lambda: subscriber.state == "connected"):
+            print(f"[{name}] 连接失败，状态: {subscriber.state}")
+            close()
+            continue
+
+        def produce():
+            for index in range(args.messages):
+                sent_at[index] = time.perf_counter()
+                send(encode_binary("1", index, None, index))
+                time.sleep(args.interval)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        # 运行真正的事件循环（_pump 轮询间隔 5ms 会掩盖传输本身的延迟）
+        loop = QEventLoop()
+        deadline = time.monotonic() + args.messages * args.interval + 5
+        watcher = QTimer()
+        watcher.timeout.connect(lambda: (len(latencies) >= args.messages or time.monotonic() > deadline)
+                                and loop.quit())
+        watcher.start(20)
+        with contextlib.redirect_stdout(io.StringIO()):
+            producer.start()
+            loop.exec()
+        watcher.stop()
+        producer.join()
+        _print_summary(f"[{name}] 发送 → signal（{len(latencies)}/{args.messages}）", _summary_ms(latencies))
+        if args.burst > 0:
+            _transport_burst(app, name, send, sent_at, latencies, args.messages, args.burst)
+        if name == 'serial':
+            stats = subscriber.get_link_stats()
+            print(f"[{name}] 帧 {stats['frames']}，校验错误 {stats['crc_errors']}，跳过字节 {stats['dropped_bytes']}")
+        close()
+
+
+def bench_startup_connect(args):
+    """测量点击启动到 MQTT 就绪的耗时，并用 5ms 心跳定时器检测事件循环是否卡顿"""
+    from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+    from broker_stub import BrokerStub
+    from Subscriber import Mqtt_Subscriber
+
+    QCoreApplication.instance() or QCoreApplication([])
+    broker = None if args.no_broker else BrokerStub().start()
+    port = broker.port if broker else 1
+    loop = QEventLoop()
+    states = []
+    gaps = []
+    last_tick = [time.perf_counter()]
+
+    def heartbeat():
+        now = time.perf_counter()
+        gaps.append(now - last_tick[0])
+        last_tick[0] = now
+
+    def on_state(state):
+        states.append((state, time.perf_counter()))
+        if state in ("connected", "failed"):
+            loop.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(heartbeat)
+    timer.start(5)
+    QTimer.singleShot(20000, loop.quit)
+
+    clicked = time.perf_counter()
+    client = Mqtt_Subscriber(broker="127.0.0.1", port=port, connect_timeout=3)
+    client.state_changed.connect(on_state)
+    client.start()
+    returned = time.perf_counter()
+    loop.exec()
+    timer.stop()
+
+    print(f"start 返回耗时: {(returned - clicked) * 1000:.2f}ms")
+    for state, at in states:
+        print(f"  {state}: +{(at - clicked) * 1000:.1f}ms")
+    print(f"事件循环最大间隔: {max(gaps, default=0) * 1000:.1f}ms（定时器周期 5ms）")
+    client.disconnect()
+    if broker:
+        broker.stop()
+
+
+def _pump(app, seconds, until=None):
+    """处理 Qt 事件一段时间，until() 为真时提前返回"""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if until is not None and until():
+            return True
+        time.sleep(0.005)
+    return until is not None and until()
+
+
+def bench_reconnect(args):
+    """代理宕机再恢复：测量重连耗时，并确认宕机期间排队的 QoS 1 手势在恢复后送达"""
+    from PySide6.QtCore import QCoreApplication, Qt
+    from broker_stub import BrokerStub
+    from Subscriber import Mqtt_Subscriber
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    broker = BrokerStub().start()
+    client = Mqtt_Subscriber(broker="127.0.0.1", port=broker.port, command_filter={'debounce': 0},
+                             client_id="benchmark_reconnect")
+    received = []
+    client.signal.connect(lambda command, trace: received.append(command), Qt.DirectConnection)
+    client.start()
+    _pump(app, 5, lambda: client.state == "connected")
+
+    broker.stop()
+    _pump(app, args.outage)
+    for i in range(args.queued):
+        broker.publish(client.topic, str(i % 6).encode('utf-8'), qos=1)
+    restarted = time.monotonic()
+    broker.start()
+    _pump(app, 60, lambda: len(received) >= args.queued)
+    recovered = time.monotonic() - restarted
+
+    print(f"代理恢复到排队手势全部送达: {recovered * 1000:.0f}ms，送达 {len(received)}/{args.queued}")
+    print(f"连接指标: {client.get_connection_stats()}")
+    client.disconnect()
+    broker.stop()
+
+
+def bench_stage_latency(args):
+    """代理 → on_message → Qt 信号 → 执行器 → 注入 的分阶段延迟，以及关闭统计时 on_message 的开销"""
+    from PySide6.QtCore import QCoreApplication, QEventLoop, QObject, QTimer
+    import latency_metrics
+    from action_executor import ActionExecutor
+    from broker_stub import BrokerStub
+    from gesture_protocol import encode_text
+    from input_backend import RecordingBackend
+    from script import script
+    from Subscriber import Mqtt_Subscriber
+
+    class Message():
+        def __init__(self, payload):
+            self.payload = payload
+
+    # 关闭/开启统计时 on_message 本身的开销（不经过网络）
+    client = Mqtt_Subscriber(command_filter={'debounce': 0}, max_command_age=None)
+    payloads = [Message(str(i % 6).encode('utf-8')) for i in range(args.gestures * 100)]
+    for title, enabled in (("关闭", False), ("开启", True)):
+        if enabled:
+            latency_metrics.enable()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for message in payloads:
+                client.on_message(None, None, message)
+        elapsed = time.perf_counter() - start
+        print(f"on_message [统计{title}]: 每条 {elapsed / len(payloads) * 1e9:.0f}ns")
+    latency_metrics.disable()
+
+    recorder = latency_metrics.enable()
+    app = QCoreApplication.instance() or QCoreApplication([])
+    broker = BrokerStub().start()
+    actuator = script(backend=RecordingBackend())
+    executor = ActionExecutor({str(i): getattr(actuator, name) for i, name in enumerate(ACTION_NAMES)})
+    executor.start()
+    loop = QEventLoop()
+
+    class Receiver(QObject):
+        # 与 Client_UI.gesture_callback 相同：在主线程打时间戳后交给执行器
+        def on_gesture(self, command, trace):
+            if trace is not None:
+                trace['dispatched'] = time.monotonic()
+            executor.submit(command, trace)
+
+    receiver = Receiver()
+    client = Mqtt_Subscriber(broker="127.0.0.1", port=broker.port, command_filter={'debounce': 0},
+                             client_id="benchmark_stage_latency")
+    client.signal.connect(receiver.on_gesture)
+    client.start()
+    _pump(app, 5, lambda: client.state == "connected")
+
+    def publish():
+        interval = 1 / args.rate
+        for i in range(args.gestures):
+            broker.publish(client.topic, encode_text(str(i % 6), time.time()), qos=1)
+            time.sleep(interval)
+        time.sleep(0.5)
+
+    publisher = threading.Thread(target=publish, daemon=True)
+    watcher = QTimer()
+    watcher.timeout.connect(lambda: publisher.is_alive() or loop.quit())
+    watcher.start(50)
+    with contextlib.redirect_stdout(io.StringIO()):
+        publisher.start()
+        loop.exec()  # 真实的事件循环，signal 阶段反映 Qt 排队投递的实际延迟
+    publisher.join()
+
+    for stage, values in recorder.summary().items():
+        print(f"{stage:>8}: n={values['count']} p50={values['p50_ms']:.2f}ms "
+              f"p95={values['p95_ms']:.2f}ms p99={values['p99_ms']:.2f}ms")
+    client.disconnect()
+    executor.stop()
+    broker.stop()
+    latency_metrics.disable()
+
+
+def bench_device_routing(args):
+    """设备数增加时每条消息的路由+策略开销（应保持不变）"""
+    from device_routing import DevicePolicy, DeviceRouter
+
+    for count in (1, 10, 100, 1000):
+        devices = {f"device{i}": DevicePolicy() for i in range(count)}
+        router = DeviceRouter(devices=devices, max_routes=count)
+        topics = [router.topic_for(f"device{i % count}") for i in range(1024)]
+        start = time.perf_counter()
+        for i in range(args.messages):
+            route = router.route(topics[i & 1023])
+            router.admit(route, "1")
+        elapsed = time.perf_counter() - start
+        print(f"{count:>5} 个设备: 每条 {elapsed / args.messages * 1e9:.0f}ns")
+
+
+def bench_focus_gate(args):
+    """焦点不在 PPT 时，对比不门控 / on_message 门控 / 暂停订阅 三种方式在各环节的工作量"""
+    import logging
+    from e2e_harness import GesturePipeline
+
+    logging.getLogger().setLevel(logging.WARNING)
+    cases = (("不门控", None, None), ("on_message 门控", False, None),
+             ("取消订阅", False, 'unsubscribe'), ("降为 QoS 0", False, 'qos0'))
+    for title, focused, pause in cases:
+        pipeline = GesturePipeline(pause_when_unfocused=pause).start()
+        pipeline.ui.switch_profile(None)
+        subscriber = pipeline.subscriber
+        subscriber.set_target_focus(focused)
+        pipeline.run_until(lambda: False, timeout=0.2)  # 等待订阅变更生效
+        delivered = pipeline.broker.delivered
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(args.messages):
+                pipeline.broker.publish(subscriber.topic, str(i % 6).encode('utf-8'), qos=1)
+        # 代理在 publish 中同步发送，此时投递数已确定
+        sent = pipeline.broker.delivered - delivered
+        pipeline.run_until(lambda: pipeline.dispatched + subscriber.gated >= sent, timeout=2)
+        elapsed = time.perf_counter() - start
+        print(f"{title}: 代理投递 {sent}，门控丢弃 {subscriber.gated}，"
+              f"界面线程回调 {pipeline.dispatched}，耗时 {elapsed * 1000:.0f}ms")
+        pipeline.close()
+
+
+_SAMPLE_INFO = {'window_handle': 0x2A0B4C, 'window_title': "第3章 演示文稿.pptx - PowerPoint",
+                'class_name': 'PPTFrameClass', 'process_id': 4242, 'process_name': 'POWERPNT.EXE'}
+
+
+def _queue_writer(info_queue, stop_event, interval):
+    """原有写法：每次先取走旧信息再放入新字典（子进程中运行）"""
+    sequence = 0
+    while not stop_event.is_set():
+        sequence += 1
+        if not info_queue.empty():
+            try:
+                info_queue.get_nowait()
+            except Exception:
+                pass
+        info_queue.put(dict(_SAMPLE_INFO, window_handle=sequence))
+        time.sleep(interval)
+
+
+def _snapshot_writer(name, stop_event, interval):
+    """快照写法：原地覆盖共享内存（子进程中运行）"""
+    from focus_snapshot import FocusSnapshot
+
+    snapshot = FocusSnapshot.attach(name)
+    sequence = 0
+    while not stop_event.is_set():
+        sequence += 1
+        snapshot.write(dict(_SAMPLE_INFO, window_handle=sequence))
+        time.sleep(interval)
+    snapshot.close()
+
+
+def bench_focus_snapshot(args):
+    """子进程持续写入最新焦点信息时，对比队列和共享内存快照的读取开销与CPU占用"""
+    import multiprocessing
+    from queue import Empty
+    import psutil
+    from focus_snapshot import FocusSnapshot
+
+    stop_event = multiprocessing.Event()
+    info_queue = multiprocessing.Queue()
+    latest = [None]
+
+    def read_queue():
+        try:
+            while not info_queue.empty():
+                latest[0] = info_queue.get_nowait()
+        except Empty:
+            pass
+        return latest[0]
+
+    snapshot = FocusSnapshot.create(shared=True)
+    cases = (("队列", _queue_writer, info_queue, read_queue),
+             ("共享快照", _snapshot_writer, snapshot.name, snapshot.read))
+    for title, writer, target, read in cases:
+        stop_event.clear()
+        process = multiprocessing.Process(target=writer, args=(target, stop_event, args.write_interval), daemon=True)
+        process.start()
+        while read() is None:
+            time.sleep(0.01)
+        wall = time.perf_counter()
+        for _ in range(args.reads):
+            read()
+        wall = time.perf_counter() - wall
+        # 按界面轮询的节奏读取 duration 秒，比较读写双方的CPU占用
+        writer_process = psutil.Process(process.pid)
+        writer_cpu = sum(writer_process.cpu_times()[:2])
+        cpu = time.process_time()
+        deadline = time.monotonic() + args.duration
+        while time.monotonic() < deadline:
+            read()
+            time.sleep(args.read_interval)
+        cpu = time.process_time() - cpu
+        writer_cpu = sum(writer_process.cpu_times()[:2]) - writer_cpu
+        handle = read()['window_handle']
+        stop_event.set()
+        process.join(timeout=2)
+        print(f"{title}: 每次读取 {wall / args.reads * 1e9:.0f}ns，轮询时读取方CPU {cpu / args.duration * 100:.1f}%，"
+              f"写入方CPU {writer_cpu / args.duration * 100:.1f}%，最后读到第 {handle} 次写入")
+    print(f"快照读取重试次数: {snapshot.retries}")
+    snapshot.close(unlink=True)
+
+
+_LEGACY_LABEL_STYLE = """
+    QLabel {
+        background: %s;
+        color: white;
+        border-radius: 5px;
+        font-weight: bold;
+    }
+"""
+
+
+def _legacy_ui_update(ui, focused, command):
+    """原有写法：每次焦点变化拼接并设置新的样式表，每个手势直接 setText"""
+    ui.ui.label3.setStyleSheet(_LEGACY_LABEL_STYLE % ("#4CAF50" if focused else "#3c3b31"))
+    ui.ui.label3.setText("🔴 目前焦点已在powerpoint中！" if focused else "🟢 焦点离开 powerpoint！")
+    ui.ui.label2.setText(f"🟢 手势 {command}")
+
+
+def _frame_ui_update(ui, focused, command):
+    """新写法：与 interrupt_callback/gesture_callback 相同，经 FrameUpdater 按帧合并"""
+    ui.labels.set_state(ui.ui.label3, 'active', focused)
+    ui.labels.set_text(ui.ui.label3, "🔴 目前焦点已在powerpoint中！" if focused else "🟢 焦点离开 powerpoint！")
+    ui.labels.set_text(ui.ui.label2, f"🟢 手势 {command}")
+
+
+def bench_ui_updates(args):
+    """焦点来回切换 + 手势连发时，对比逐次更新与按帧合并的主线程开销和重绘次数"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtCore import QEventLoop, QTimer
+    from PySide6.QtWidgets import QApplication
+    from client_do import Client_UI
+    from input_backend import RecordingBackend
+    import ui_updates
+
+    app = QApplication.instance() or QApplication([])
+    for title, update in (("逐次 setStyleSheet/setText", _legacy_ui_update),
+                          ("动态属性 + 按帧合并", _frame_ui_update)):
+        ui = Client_UI(backend=RecordingBackend())
+        counter = ui_updates.FrameUpdater()  # 两种写法使用同一种方式统计重绘
+        counter.track(ui.ui.label2, ui.ui.label3)
+        ui.show()
+        app.processEvents()
+        events = int(args.rate * args.duration)
+        state = {'sent': 0, 'cpu': 0.0}
+        loop = QEventLoop()
+
+        def tick():
+            start = time.thread_time()
+            for _ in range(max(1, args.rate // 1000)):
+                sent = state['sent']
+                update(ui, sent % 2 == 0, str(sent % 6))
+                state['sent'] = sent + 1
+            state['cpu'] += time.thread_time() - start
+            if state['sent'] >= events:
+                driver.stop()
+                QTimer.singleShot(100, loop.quit)  # 等最后一帧应用并绘制
+
+        driver = QTimer()
+        driver.timeout.connect(tick)
+        repaints = counter.repaints
+        cpu = time.thread_time()
+        driver.start(max(1, 1000 // args.rate))
+        loop.exec()
+        cpu = time.thread_time() - cpu
+        repaints = counter.repaints - repaints
+        print(f"{title}: {state['sent']} 次焦点切换+手势，更新调用 {state['cpu'] * 1e6 / state['sent']:.1f}µs/次，"
+              f"主线程CPU {cpu * 1000:.0f}ms，标签重绘 {repaints} 次")
+        if update is _frame_ui_update:
+            print(f"  FrameUpdater: {ui.labels.stats()}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            ui.close()
+
+
+def bench_e2e(args):
+    """端到端基准：发布 → 代理替身 → 订阅者 → 分发 → 注入，每个速率输出一行 JSON"""
+    import json
+    from e2e_harness import run_suite
+
+    results = run_suite(
+        [float(rate) for rate in args.rates.split(',')], args.duration, pattern=args.pattern,
+        payload_format=args.format, qos=args.qos,
+        command_filter={'debounce': args.debounce}, max_command_age=args.max_age, seed=args.seed
+    )
+    lines = [json.dumps(result, ensure_ascii=False) for result in results]
+    print("\n".join(lines))
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPT智能助手性能基准")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    focus_parser = subparsers.add_parser('focus-latency', help="焦点切换到回调的延迟")
+    focus_parser.add_argument('--rounds', type=int, default=20)
+    focus_parser.set_defaults(func=bench_focus_latency)
+
+    delivery_parser = subparsers.add_parser('interrupt-delivery', help="中断投递的唤醒频率和延迟")
+    delivery_parser.add_argument('--idle', type=float, default=3.0)
+    delivery_parser.add_argument('--events', type=int, default=50)
+    delivery_parser.set_defaults(func=bench_interrupt_delivery)
+
+    cache_parser = subparsers.add_parser('window-cache', help="窗口信息缓存的每次开销")
+    cache_parser.add_argument('--ticks', type=int, default=20000)
+    cache_parser.add_argument('--switch-every', type=int, default=200)
+    cache_parser.set_defaults(func=bench_window_cache)
+
+    modes_parser = subparsers.add_parser('focus-modes', help="线程/进程监测模式的启动耗时和内存")
+    modes_parser.add_argument('--start-method', choices=('fork', 'spawn', 'forkserver'))
+    modes_parser.set_defaults(func=bench_focus_modes)
+
+    action_parser = subparsers.add_parser('action-latency', help="手势动作的注入耗时")
+    action_parser.add_argument('--actions', type=int, default=30)
+    action_parser.set_defaults(func=bench_action_latency)
+
+    wire_parser = subparsers.add_parser('wire-format', help="载荷格式的解析和分发开销")
+    wire_parser.add_argument('--messages', type=int, default=200000)
+    wire_parser.set_defaults(func=bench_wire_format)
+
+    startup_parser = subparsers.add_parser('startup-connect', help="点击启动到MQTT就绪的耗时")
+    startup_parser.add_argument('--no-broker', action='store_true', help="不启动代理，测量失败路径")
+    startup_parser.set_defaults(func=bench_startup_connect)
+
+    reconnect_parser = subparsers.add_parser('reconnect', help="代理重启后的重连耗时和消息补发")
+    reconnect_parser.add_argument('--outage', type=float, default=2.0)
+    reconnect_parser.add_argument('--queued', type=int, default=5)
+    reconnect_parser.set_defaults(func=bench_reconnect)
+
+    stage_parser = subparsers.add_parser('stage-latency', help="手势从收到到注入的分阶段延迟")
+    stage_parser.add_argument('--gestures', type=int, default=200)
+    stage_parser.add_argument('--rate', type=float, default=50.0, help="每秒发布的手势数")
+    stage_parser.set_defaults(func=bench_stage_latency)
+
+    routing_parser = subparsers.add_parser('device-routing', help="多设备路由的每条消息开销")
+    routing_parser.add_argument('--messages', type=int, default=200000)
+    routing_parser.set_defaults(func=bench_device_routing)
+
+    gate_parser = subparsers.add_parser('focus-gate', help="离焦时的手势门控和暂停投递")
+    gate_parser.add_argument('--messages', type=int, default=500)
+    gate_parser.set_defaults(func=bench_focus_gate)
+
+    snapshot_parser = subparsers.add_parser('focus-snapshot', help="最新焦点信息：队列与共享内存快照对比")
+    snapshot_parser.add_argument('--reads', type=int, default=100000)
+    snapshot_parser.add_argument('--write-interval', type=float, default=0.001, help="子进程写入间隔（秒）")
+    snapshot_parser.add_argument('--read-interval', type=float, default=0.01, help="轮询阶段的读取间隔（秒）")
+    snapshot_parser.add_argument('--duration', type=float, default=3.0, help="轮询阶段时长（秒）")
+    snapshot_parser.set_defaults(func=bench_focus_snapshot)
+
+    ui_parser = subparsers.add_parser('ui-updates', help="界面更新：逐次样式表与按帧合并对比")
+    ui_parser.add_argument('--rate', type=int, default=500, help="每秒焦点切换+手势次数")
+    ui_parser.add_argument('--duration', type=float, default=2.0)
+    ui_parser.set_defaults(func=bench_ui_updates)
+
+    input_parser = subparsers.add_parser('input-backends', help="各输入后端的动作注入耗时")
+    input_parser.add_argument('--backends', default='all', help="逗号分隔的后端名，或 all")
+    input_parser.add_argument('--iterations', type=int, default=50, help="每个动作的执行次数")
+    input_parser.add_argument('--delay', type=float, default=3.0, help="开始注入前等待切换窗口的秒数")
+    input_parser.set_defaults(func=bench_input_backends)
+
+    dispatch_parser = subparsers.add_parser('gesture-dispatch', help="手势分发：match 与分发表对比")
+    dispatch_parser.add_argument('--messages', type=int, default=200000)
+    dispatch_parser.set_defaults(func=bench_gesture_dispatch)
+
+    batch_parser = subparsers.add_parser('batch-commands', help="带参数的批量命令与逐条手势对比")
+    batch_parser.add_argument('--counts', default='5,10,20', help="逗号分隔的步数")
+    batch_parser.add_argument('--interval', type=float, default=0.02, help="逐条发布的间隔（秒）")
+    batch_parser.add_argument('--pause', type=float, default=0.01, help="模拟的每次注入调用耗时（秒）")
+    batch_parser.set_defaults(func=bench_batch_commands)
+
+    recognition_parser = subparsers.add_parser('recognition', help="原始采样手势识别的准确率和吞吐")
+    recognition_parser.add_argument('--file', help="录制文件（CSV，见 gesture_recognition.py），默认使用模拟数据")
+    recognition_parser.add_argument('--gestures', type=int, default=300, help="模拟数据的手势数")
+    recognition_parser.add_argument('--rate', type=int, default=100, help="采样率（Hz）")
+    recognition_parser.add_argument('--window', type=int, default=50, help="窗口长度（帧）")
+    recognition_parser.add_argument('--hop', type=int, default=5, help="分类间隔（帧）")
+    recognition_parser.add_argument('--seed', type=int, default=0)
+    recognition_parser.set_defaults(func=bench_recognition)
+
+    transport_parser = subparsers.add_parser('transport-latency', help="各传输方式的发送到信号延迟")
+    transport_parser.add_argument('--transports', default='mqtt,serial,udp,zmq',
+                                  help="逗号分隔：mqtt、serial、udp、zmq")
+    transport_parser.add_argument('--messages', type=int, default=500)
+    transport_parser.add_argument('--interval', type=float, default=0.005, help="发送间隔（秒）")
+    transport_parser.add_argument('--burst', type=int, default=2000, help="不加间隔连续发送的条数，0 表示不测")
+    transport_parser.set_defaults(func=bench_transport_latency)
+
+    e2e_parser = subparsers.add_parser('e2e', help="端到端吞吐、延迟和丢弃数（JSON 输出）")
+    e2e_parser.add_argument('--rates', default='10,50,200', help="逗号分隔的发布速率（条/秒）")
+    e2e_parser.add_argument('--duration', type=float, default=5.0, help="每个速率的发布时长（秒）")
+    e2e_parser.add_argument('--pattern', choices=('cycle', 'same', 'random'), default='cycle')
+    e2e_parser.add_argument('--format', choices=('text', 'json', 'binary'), default='binary')
+    e2e_parser.add_argument('--qos', type=int, choices=(0, 1), default=1)
+    e2e_parser.add_argument('--debounce', type=float, default=0.0, help="去抖窗口（秒），默认不去抖")
+    e2e_parser.add_argument('--max-age', type=float, default=1.0, help="过期阈值（秒）")
+    e2e_parser.add_argument('--seed', type=int, default=0)
+    e2e_parser.add_argument('--output', help="把结果追加到该 JSON Lines 文件")
+    e2e_parser.set_defaults(func=bench_e2e)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""
+进程内的 MQTT 3.1.1 代理替身，用于基准和本地调试，不依赖外部代理。
+
+只实现本项目用到的子集：CONNECT/CONNACK、SUBSCRIBE/SUBACK、UNSUBSCRIBE/UNSUBACK、
+PUBLISH（QoS 0/1）/PUBACK、PINGREQ/PINGRESP、DISCONNECT，主题过滤支持 + 和 #。
+
+持久会话（clean session = 0）：客户端离线期间的 QoS 1 消息会排队，未确认的消息在重连后
+带 DUP 标志重发，订阅也会保留。stop() 只断开连接、不清除会话，
+再次 start() 相当于一个带持久化的代理重启，可用来测试断线重连。
+
+使用示例：
+    broker = BrokerStub()
+    broker.start()          # 监听 127.0.0.1 的随机端口，broker.port 为实际端口
+    broker.publish("gesture/control", b"1", qos=1)
+    broker.stop()
+"""
+import socket
+import struct
+import threading
+from collections import OrderedDict, deque
+
+CONNECT = 1
+CONNACK = 2
+PUBLISH = 3
+PUBACK = 4
+SUBSCRIBE = 8
+SUBACK = 9
+UNSUBSCRIBE = 10
+UNSUBACK = 11
+PINGREQ = 12
+PINGRESP = 13
+DISCONNECT = 14
+
+
+def topic_matches(topic_filter, topic):
+    """判断主题是否匹配订阅过滤器（支持 + 和 #）"""
+    filter_parts = topic_filter.split('/')
+    topic_parts = topic.split('/')
+    for index, part in enumerate(filter_parts):
+        if part == '#':
+            return True
+        if index >= len(topic_parts):
+            return False
+        if part != '+' and part != topic_parts[index]:
+            return False
+    return len(filter_parts) == len(topic_parts)
+
+
+def _encode_length(length):
+    encoded = bytearray()
+    while True:
+        byte = length % 128
+        length //= 128
+        if length:
+            byte |= 0x80
+        encoded.append(byte)
+        if not length:
+            return bytes(encoded)
+
+
+def _encode_string(text):
+    data = text.encode('utf-8')
+    return struct.pack('!H', len(data)) + data
+
+
+def _packet(packet_type, flags, body):
+    return bytes([packet_type << 4 | flags]) + _encode_length(len(body)) + body
+
+
+class _Session():
+    """一个客户端的会话：订阅、连接和发出的 QoS 1 消息"""
+
+    def __init__(self, client_id, clean=True, max_queued=1000):
+        self.client_id = client_id
+        self.clean = clean
+        self.subscriptions = {}  # 主题过滤器 -> QoS
+        self.connection = None
+        self.send_lock = threading.RLock()  # 保护连接切换、报文ID分配和发送
+        self.next_packet_id = 1
+        self.inflight = OrderedDict()  # packet_id -> (topic, payload)，等待 PUBACK
+        self.offline_queue = deque(maxlen=max_queued)  # 离线期间的 QoS 1 消息
+
+    def allocate_packet_id(self):
+        packet_id = self.next_packet_id
+        self.next_packet_id = packet_id % 65535 + 1
+        return packet_id
+
+    def send(self, data):
+        connection = self.connection
+        if connection is None:
+            return False
+        try:
+            with self.send_lock:
+                connection.sendall(data)
+            return True
+        except OSError:
+            return False
+
+
+class BrokerStub():
+    """
+    MQTT 代理替身。
+
+    构造函数参数：
+    host: 监听地址
+    port: 监听端口，0 表示随机端口（start 后可从 self.port 读取）
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.sessions = {}  # client_id -> _Session
+        self._lock = threading.Lock()
+        self._server = None
+        self._connections = set()
+        self._threads = []
+        self._running = False
+        self.published = 0  # 收到的 PUBLISH 数
+        self.delivered = 0  # 投递给订阅者的消息数
+
+    def start(self):
+        """开始监听"""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self._server.listen()
+        self.port = self._server.getsockname()[1]
+        self._running = True
+        thread = threading.Thread(target=self._accept_loop, daemon=True)
+        thread.start()
+        self._threads = [thread]
+        return self
+
+    def stop(self):
+        """停止代理并断开所有客户端（模拟代理宕机）"""
+        self._running = False
+        if self._server is not None:
+            try:
+                # Linux 上仅 close 不会唤醒阻塞中的 accept，需要先 shutdown
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            connection.close()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def publish(self, topic, payload, qos=0):
+        """由代理直接向匹配的订阅者发布消息"""
+        self._route(topic, payload, qos)
+
+    def _accept_loop(self):
+        server = self._server
+        while self._running:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                break
+            if not self._running:
+                connection.close()
+                break
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._connections.add(connection)
+            thread = threading.Thread(target=self._client_loop, args=(connection,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _read_exact(self, connection, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = connection.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("连接已关闭")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_packet(self, connection):
+        header = self._read_exact(connection, 1)[0]
+        length = 0
+        multiplier = 1
+        while True:
+            byte = self._read_exact(connection, 1)[0]
+            length += (byte & 0x7F) * multiplier
+            if not byte & 0x80:
+                break
+            multiplier *= 128
+        body = self._read_exact(connection, length) if length else b''
+        return header >> 4, header & 0x0F, body
+
+    def _client_loop(self, connection):
+        session = None
+        try:
+            packet_type, _, body = self._read_packet(connection)
+            if packet_type != CONNECT:
+                return
+            session = self._handle_connect(connection, body)
+            while self._running:
+                packet_type, flags, body = self._read_packet(connection)
+                if packet_type == PUBLISH:
+                    self._handle_publish(session, flags, body)
+                elif packet_type == PUBACK:
+                    self._handle_puback(session, body)
+                elif packet_type == SUBSCRIBE:
+                    self._handle_subscribe(session, body)
+                elif packet_type == UNSUBSCRIBE:
+                    self._handle_unsubscribe(session, body)
+                elif packet_type == PINGREQ:
+                    session.send(_packet(PINGRESP, 0, b''))
+                elif packet_type == DISCONNECT:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if session is not None:
+                with session.send_lock:
+                    went_offline = session.connection is connection
+                    if went_offline:
+                        session.connection = None
+                if went_offline:
+                    self._on_session_offline(session)
+            with self._lock:
+                self._connections.discard(connection)
+            try:
+                connection.close()
+            except OSError:
+                pass
+
+    def _handle_connect(self, connection, body):
+        offset = 2 + struct.unpack_from('!H', body)[0]  # 协议名
+        offset += 1  # 协议级别
+        connect_flags = body[offset]
+        offset += 3  # 标志 + keepalive
+        id_length = struct.unpack_from('!H', body, offset)[0]
+        client_id = body[offset + 2:offset + 2 + id_length].decode('utf-8')
+        clean_session = bool(connect_flags & 0x02)
+
+        with self._lock:
+            session = self.sessions.get(client_id)
+            # 只有持久会话才算"会话仍在"；尚未清理掉的清洁会话直接替换，不能复用
+            session_present = session is not None and not session.clean and not clean_session
+            if not session_present:
+                session = _Session(client_id, clean=clean_session)
+                self.sessions[client_id] = session
+        with session.send_lock:
+            previous = session.connection
+            session.connection = connection
+            # CONNACK 必须先于任何投递发出
+            session.send(_packet(CONNACK, 0, bytes([1 if session_present else 0, 0])))
+            self._on_session_online(session)
+        if previous is not None and previous is not connection:
+            try:
+                previous.close()  # 同一 client_id 重复连接时踢掉旧连接
+            except OSError:
+                pass
+        return session
+
+    def _on_session_online(self, session):
+        """会话上线：重发未确认的消息，再投递离线期间排队的消息"""
+        for packet_id, (topic, payload) in list(session.inflight.items()):
+            self._send_publish(session, topic, payload, 1, packet_id, dup=True)
+        while session.offline_queue:
+            topic, payload = session.offline_queue.popleft()
+            self._deliver(session, topic, payload, 1)
+
+    def _on_session_offline(self, session):
+        """会话断开：清洁会话直接删除，持久会话保留"""
+        if session.clean:
+            with self._lock:
+                if self.sessions.get(session.client_id) is session:
+                    del self.sessions[session.client_id]
+
+    def _handle_subscribe(self, session, body):
+        packet_id = struct.unpack_from('!H', body)[0]
+        offset = 2
+        granted = bytearray()
+        while offset < len(body):
+            length = struct.unpack_from('!H', body, offset)[0]
+            topic_filter = body[offset + 2:offset + 2 + length].decode('utf-8')
+            qos = min(body[offset + 2 + length], 1)
+            offset += 3 + length
+            session.subscriptions[topic_filter] = qos
+            granted.append(qos)
+        session.send(_packet(SUBACK, 0, struct.pack('!H', packet_id) + bytes(granted)))
+
+    def _handle_unsubscribe(self, session, body):
+        packet_id = struct.unpack_from('!H', body)[0]
+        offset = 2
+        while offset < len(body):
+            length = struct.unpack_from('!H', body, offset)[0]
+            session.subscriptions.pop(body[offset + 2:offset + 2 + length].decode('utf-8'), None)
+            offset += 2 + length
+        session.send(_packet(UNSUBACK, 0, struct.pack('!H', packet_id)))
+
+    def _handle_publish(self, session, flags, body):
+        qos = (flags >> 1) & 0x03
+        length = struct.unpack_from('!H', body)[0]
+        topic = body[2:2 + length].decode('utf-8')
+        offset = 2 + length
+        if qos:
+            packet_id = struct.unpack_from('!H', body, offset)[0]
+            offset += 2
+            session.send(_packet(PUBACK, 0, struct.pack('!H', packet_id)))
+        self.published += 1
+        self._route(topic, body[offset:], qos)
+
+    def _handle_puback(self, session, body):
+        """客户端确认了代理发出的 QoS 1 消息"""
+        session.inflight.pop(struct.unpack_from('!H', body)[0], None)
+
+    def _route(self, topic, payload, qos):
+        with self._lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            granted = None
+            for topic_filter, sub_qos in session.subscriptions.items():
+                if topic_matches(topic_filter, topic):
+                    granted = sub_qos if granted is None else max(granted, sub_qos)
+            if granted is not None:
+                self._deliver(session, topic, payload, min(qos, granted))
+
+    def _deliver(self, session, topic, payload, qos):
+        with session.send_lock:
+            if session.connection is None:
+                if qos and not session.clean:
+                    session.offline_queue.append((topic, payload))
+                return
+            packet_id = None
+            if qos:
+                packet_id = session.allocate_packet_id()
+                session.inflight[packet_id] = (topic, payload)
+            self._send_publish(session, topic, payload, qos, packet_id)
+
+    def _send_publish(self, session, topic, payload, qos, packet_id, dup=False):
+        body = _encode_string(topic)
+        if qos:
+            body += struct.pack('!H', packet_id)
+        if session.send(_packet(PUBLISH, (0x08 if dup else 0) | qos << 1, body + payload)):
+            self.delivered += 1
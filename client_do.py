@@ -1,15 +1,33 @@
 from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QWidget
-from PySide6.QtUiTools import QUiLoader
 import sys
 import os  # 添加路径处理
+import importlib
+import threading
 from all_ui.ppt_client_ui import Ui_Form
-from script import script
+from action_executor import ActionExecutor
 from Focus_Detection import Focus_Detection
-from PySide6.QtCore import QMetaObject, Qt
-from Subscriber import Mqtt_Subscriber
+from PySide6.QtCore import QMetaObject, Qt, Signal
 import time
+import gesture_trace
+import startup_profile
+import ui_updates
+import gesture_profiles
+import gesture_protocol
 class Client_UI(QWidget):
-    def __init__(self):  # 添加loader参数
+    # 焦点中断信号：Focus_Detection 在后台线程 emit，Qt 排队后在主线程执行 interrupt_callback
+    focus_signal = Signal(str, str, object)
+    # 后台预加载（paho、pyautogui）完成，在主线程创建输入脚本和执行线程
+    automation_ready = Signal()
+    def __init__(self, backend=None, subscriber_options=None, profiles=None, transport='mqtt'):  # 添加loader参数
+        """
+        Args:
+            backend: script 使用的输入后端对象或名称（见 input_backend.create_backend），默认 pyautogui；
+                基准测试传入 RecordingBackend
+            subscriber_options: 创建手势接收端时的关键字参数，如 MQTT 的 {'devices': DeviceRouter(...)}、
+                串口的 {'port': 'COM3'}
+            profiles: 手势配置 gesture_profiles.ProfileSet，默认只有 PowerPoint
+            transport: 手势传输方式（见 gesture_transport），'mqtt'、'serial'、'udp' 或 'zmq'
+        """
         super().__init__()
         #使用ui文件动态创建窗口
         # # 获取UI文件的绝对路径
@@ -31,157 +49,188 @@ class Client_UI(QWidget):
         self.ui.setupUi(self)
         # 基础置顶设置
         self.setWindowFlags(Qt.WindowStaysOnTopHint) # 窗口置顶
-        self.ui.Button1.setStyleSheet("""
-            QPushButton {
-                background: #4CAF50;
-                color: white;
-                border-radius: 5px;
-                font-weight: bold;
-            }
-            QPushButton:hover { background: #45a049; }
-        """)
-        #显示是否启动的label
-        self.ui.label1.setStyleSheet("""
-                    QLabel {
-                        background: #3c3b31;
-                        color: white;
-                        border-radius: 5px;
-                        font-weight: bold;
-                    }
-                """)
-        #显示当前是什么手势
-        self.ui.label2.setStyleSheet("""
-                         QLabel {
-                             background: #3c3b31;
-                             color: white;
-                             border-radius: 5px;
-                             font-weight: bold;
-                         }
-                     """)
-        #显示焦点是否在ppt中
-        self.ui.label3.setStyleSheet("""
-                         QLabel {
-                             background: #3c3b31;
-                             color: white;
-                             border-radius: 5px;
-                             font-weight: bold;
-                         }
-                     """)
-        self.in_ppt = False
+        # 样式表只设置一次，标签的激活配色由动态属性 active 切换
+        self.setStyleSheet(ui_updates.STYLESHEET)
+        # 标签文字和状态按帧合并后再应用（label1 是否启动、label2 当前手势、label3 焦点是否在ppt中）
+        self.labels = ui_updates.FrameUpdater(self)
+        self.labels.track(self.ui.label1, self.ui.label2, self.ui.label3)
+        self.in_ppt = False  # 焦点是否在任一配置了手势的程序中
+        # 手势配置：焦点进入/离开对应程序时整体替换分发表 {命令: (动作键, 标签文字)}
+        self.profiles = profiles or gesture_profiles.default_profiles()
+        self.active_profile = None
+        self.dispatch_table = {}
+        self._focus_process = None
         
         self.ui.Button1.clicked.connect(self.start_ppt)
      
         ############
         
-        #创建一个脚本对象用于实现对应效果
-        self.script = script()
+        #脚本对象和执行线程在首帧绘制后才创建（导入 pyautogui 较慢，不拖慢窗口出现）
+        self._backend = backend
+        self.script = None
+        self.executor = None
+        self._first_paint = True
+        self.automation_ready.connect(self.load_automation)
         
         ############创建一个视奸进程用来监控当前焦点进程，焦点是ppt时，则执行脚本
         self.detector = Focus_Detection()
-        self.detector.set_interrupt_callback(self.interrupt_callback)#设置中断回调函数
+        self.focus_signal.connect(self.interrupt_callback)
+        self.detector.set_interrupt_callback(self.focus_signal.emit)#设置中断回调函数（经信号转交主线程）
          # 添加需要监听的目标进程（PowerPoint）
-        self.detector.add_interrupt_target("POWERPNT.EXE")  # PowerPoint
+        for process_name in self.profiles.processes():  # 默认只有 PowerPoint
+            self.detector.add_interrupt_target(process_name)
         ############
-        self.mqtt_client = None
+        self.mqtt_client = None  # 手势接收端（任一传输方式）
+        self.transport = transport
+        self.subscriber_options = subscriber_options or {}
+        # 轨迹记录需要知道收到手势时焦点在哪个已配置的程序中
+        if gesture_trace.RECORDER is not None:
+            gesture_trace.RECORDER.focus_provider = lambda: self._focus_process if self.in_ppt else None
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._first_paint:
+            # 窗口已经显示出来，再在后台加载MQTT和键鼠自动化相关模块
+            self._first_paint = False
+            startup_profile.mark("首帧绘制")
+            threading.Thread(target=self._preload, name="preload", daemon=True).start()
+    def _preload(self):
+        """后台线程：预先导入传输模块（paho 或 pyserial）和 pyautogui，点击启动时无需等待"""
+        with startup_profile.phase(f"后台预加载传输模块（{self.transport}）"):
+            import gesture_transport
+            gesture_transport.load_transport(self.transport)
+        if self._backend is None or self._backend == 'pyautogui':
+            with startup_profile.phase("后台预加载pyautogui"):
+                try:
+                    importlib.import_module('pyautogui')  # 只为提前导入，结果留在 sys.modules 中
+                except Exception as e:
+                    print(f"❌ 预加载 pyautogui 失败: {e}")
+        self.automation_ready.emit()
+    def load_automation(self):
+        """创建输入脚本和动作执行线程，已创建时直接返回"""
+        if self.executor is None:
+            with startup_profile.phase("创建输入脚本与执行线程"):
+                from script import script
+                #创建一个脚本对象用于实现对应效果
+                self.script = script(backend=self._backend)
+                #各程序的手势配置编译为分发表，动作注册到执行器（键为动作名，各配置共用）
+                actions = {}
+                self.profiles.compile(self.script, actions)
+                #动作在独立线程中执行，连续的相同动作会被合并
+                self.executor = ActionExecutor(actions, max_pending=16, overflow='drop_oldest')
+                self.executor.start()
+            self.switch_profile(self._focus_process)  # 编译前已有焦点事件时，补上分发表
+        return self.executor
+    def switch_profile(self, process_name):
+        """焦点进入 process_name 时换上它的分发表，None 表示离开（换成空表，手势全部忽略）"""
+        self._focus_process = process_name
+        profile = self.profiles.for_process(process_name)
+        self.active_profile = profile
+        table = profile.table if profile is not None else None
+        # 一次赋值整体替换，gesture_callback 看到的总是某个完整的表
+        self.dispatch_table = table or {}
+        self.in_ppt = profile is not None
+        return profile
 #焦点检测中断函数
     def interrupt_callback(self,event_type, process_name, window_info):
         """中断事件回调函数示例"""
         if event_type == 'enter':
-            print(f"🔴 目前焦点已在powerpoint中！")
-            self.ui.label3.setStyleSheet(
-                """
-                  QLabel {
-                        background: #4CAF50;
-                        border-radius: 5px;
-                    }
-                """
-                )
-            self.in_ppt = True
-            self.ui.label3.setText(f"🔴 目前焦点已在powerpoint中！")
+            profile = self.switch_profile(process_name)
+            title = profile.title if profile is not None else process_name
+            print(f"🔴 目前焦点已在{title}中！")
+            self.labels.set_state(self.ui.label3, 'active', True)
+            if self.mqtt_client is not None:
+                self.mqtt_client.set_target_focus(True)  # 开启网络线程中的手势投递
+            self.labels.set_text(self.ui.label3, f"🔴 目前焦点已在{title}中！")
         elif event_type == 'exit':
-            print(f"🟢 焦点离开 powerpoint！")
-            self.ui.label3.setStyleSheet(
-                """
-                  QLabel {
-                        background: #3c3b31;
-                        border-radius: 5px;
-                    }
-                """
-                )
-            self.in_ppt = False
-            self.ui.label3.setText(f"🟢 焦点离开 powerpoint！")
+            title = self.active_profile.title if self.active_profile is not None else process_name
+            self.switch_profile(None)
+            print(f"🟢 焦点离开 {title}！")
+            self.labels.set_state(self.ui.label3, 'active', False)
+            if self.mqtt_client is not None:
+                self.mqtt_client.set_target_focus(False)  # 离焦期间手势在网络线程中直接丢弃
+            self.labels.set_text(self.ui.label3, f"🟢 焦点离开 {title}！")
     #启动整个功能
     def start_ppt(self):
-        """启动PPT监控功能"""
+        """启动PPT监控功能（非阻塞，连接进度由 mqtt_state_callback 更新）"""
         if not hasattr(self, 'monitoring_started'):
+            import gesture_transport
+            self.load_automation()
             self.detector.start_monitoring()
             self.monitoring_started = True
            
-            self.mqtt_client=Mqtt_Subscriber()
-            if not self.mqtt_client:
-                self.ui.label1.setText("程序启动失败！初始化MQTT失败！")
-                return False
-            # 等待MQTT连接
-            print("等待MQTT连接...")
-            connect_timeout = 10
-            start_time = time.time()
-            while not self.mqtt_client.connected:
-                time.sleep(0.5)
-                if time.time() - start_time > connect_timeout:
-                    self.ui.label1.setText("程序启动失败！连接超时！") # 连接超时
-                    return False
-
-            print(f"成功连接到MQTT代理: {self.mqtt_client.broker}:{self.mqtt_client.port}")
-            self.mqtt_client.subscribe(self.mqtt_client.topic)
-            print(f"已订阅主题: {self.mqtt_client.topic}")
-            self.mqtt_client.client.on_message = self.mqtt_client.on_message
-            self.mqtt_client.client.loop_start()
-            self.ui.label1.setText("程序已启动！")
-            self.ui.label1.setStyleSheet(
-                """
-                  QLabel {
-                        background: #4CAF50;
-                        border-radius: 5px;
-                    }
-                """
-                )
-            self.ui.label2.setText("🟢 程序已启动！正在检测手势中")
-            self.ui.label3.setText("🎈 程序已启动！等待焦点移动至ppt窗口")
-            self.ui.label2.setStyleSheet("""
-                  QLabel {
-                        background: #4CAF50;
-                        border-radius: 5px;
-                    }
-                """)
+            self.mqtt_client=gesture_transport.create_subscriber(self.transport, **self.subscriber_options)
+            self.mqtt_client.set_target_focus(self.in_ppt)
+            self.mqtt_client.state_changed.connect(self.mqtt_state_callback)
             self.mqtt_client.signal.connect(self.gesture_callback)
+            print(f"等待连接{self.mqtt_client.display_name}...")
+            self.labels.set_text(self.ui.label1, f"正在连接{self.mqtt_client.display_name}...")
+            self.mqtt_client.start()
+        else:
+            self.labels.set_text(self.ui.label1, "程序已在运行中")
+    #连接状态回调（经信号在主线程执行，各传输方式的状态相同）
+    def mqtt_state_callback(self, state):
+        match state:
+            case "connecting":
+                self.labels.set_text(self.ui.label1, f"正在连接{self.mqtt_client.display_name}...")
+            case "retrying":
+                self.labels.set_text(self.ui.label1, "连接失败，正在重试...")
+            case "failed":
+                self.labels.set_text(self.ui.label1, "程序启动失败！连接超时！") # 连接超时
+                # 允许再次点击启动
+                self.mqtt_client = None
+                del self.monitoring_started
+            case "connected":
+                print(f"成功连接到{self.mqtt_client.endpoint()}")
+                self.labels.set_text(self.ui.label1, "程序已启动！")
+                self.labels.set_state(self.ui.label1, 'active', True)
+                self.labels.set_text(self.ui.label2, "🟢 程序已启动！正在检测手势中")
+                if not self.in_ppt:  # 重连时不覆盖焦点状态
+                    self.labels.set_text(self.ui.label3, "🎈 程序已启动！等待焦点移动至ppt窗口")
+                self.labels.set_state(self.ui.label2, 'active', True)
+    #手势检测回调函数（动作交给执行线程，界面线程只更新文字）
+    def gesture_callback(self, event_type, trace=None):
+        if trace is not None:
+            trace['dispatched'] = time.monotonic()
+        # 一次查表：焦点不在配置的程序中时分发表为空，未配置的手势同样查不到
+        entry = self.dispatch_table.get(event_type)
+        if entry is not None:
+            action, label = entry
+            if action in ActionExecutor.ABSOLUTE:
+                # 绝对动作的参数是目标值（如页码），没有参数时不能猜一个默认值
+                print(f"⚠️ 命令 {event_type} 缺少参数，已忽略")
+                if gesture_trace.RECORDER is not None:
+                    gesture_trace.RECORDER.record_dispatch(event_type, 'missing_argument', action)
+                return
+            self._submit(event_type, action, trace)
+            self.labels.set_text(self.ui.label2, label)
+        elif ':' in event_type:
+            self._dispatch_with_argument(event_type, trace)
+        elif gesture_trace.RECORDER is not None:
+            gesture_trace.RECORDER.record_dispatch(event_type, 'unmapped')
+    def _dispatch_with_argument(self, event_type, trace):
+        """带参数的命令（"1:10"、"6:12"）：查同一张分发表，参数作为 times 整批提交"""
+        try:
+            command, argument = gesture_protocol.split_command(event_type)
+        except ValueError:
+            command, argument = None, 0
+        entry = self.dispatch_table.get(command)
+        if entry is None or argument < 1:
+            if gesture_trace.RECORDER is not None:
+                gesture_trace.RECORDER.record_dispatch(event_type, 'unmapped')
+            return
+        action, label = entry
+        if action in ActionExecutor.ABSOLUTE:
+            self._submit(event_type, action, trace, argument)
+            self.labels.set_text(self.ui.label2, f"{label} {argument}")
         else:
-            self.ui.label1.setText("程序已在运行中")
-    #手势检测回调函数
-    def gesture_callback(self, event_type):
-        if self.in_ppt:
-            match event_type:
-                #向上翻
-                case "0":
-                    self.script.up_sliding()
-                    self.ui.label2.setText(f"🟢 向上翻页！")
-                #向下翻
-                case "1":
-                    self.script.down_sliding()
-                    self.ui.label2.setText(f"🟢 向下翻页！")
-                #放大一点
-                case "2":
-                    self.script.zoom_in()
-                    self.ui.label2.setText(f"🟢 放大！")
-                #缩小一点
-                case "3":
-                    self.script.zoom_out()
-                    self.ui.label2.setText(f"🟢 缩小！")
-                case "4":    
-                    self.script.Left_sliding()
-                    self.ui.label2.setText(f"🟢 左键")
-                case "5":
-                    self.script.Right_sliding()
-                    self.ui.label2.setText(f"🟢 右键")
+            times = min(argument, gesture_profiles.MAX_REPEAT)
+            self._submit(event_type, action, trace, times)
+            self.labels.set_text(self.ui.label2, f"{label} ×{times}")
+    def _submit(self, event_type, action, trace, times=1):
+        """交给执行器；启用轨迹记录时记下实际采取的动作（入队、合并、抵消或丢弃）"""
+        outcome = self.executor.submit(action, trace, times)
+        if gesture_trace.RECORDER is not None:
+            gesture_trace.RECORDER.record_dispatch(event_type, outcome or 'dropped', action)
     #析构函数
     def closeEvent(self, event):
         """程序关闭时的清理工作"""
@@ -192,14 +241,19 @@ class Client_UI(QWidget):
                 self.detector.stop_monitoring()
                 print("✅ 焦点监控已停止")
             
+            # 停止动作执行线程
+            if hasattr(self, 'executor') and self.executor:
+                self.executor.stop()
+
             # 清理其他资源
             if hasattr(self, 'script'):
                 del self.script
             if hasattr(self, 'mqtt_client') and self.mqtt_client:
-                print("🔄 正在断开MQTT连接...")
-                self.mqtt_client.disconnect()
-                print("✅ MQTT连接已断开")
-                pass
+                print("🔄 正在断开手势连接...")
+                self.mqtt_client.stop()
+                print("✅ 手势连接已断开")
+            # 写完尚未落盘的手势轨迹
+            gesture_trace.disable()
             print("🔚 程序资源清理完成")
             
         except Exception as e:
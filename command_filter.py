@@ -0,0 +1,152 @@
+import threading
+import time
+
+from gesture_protocol import split_command
+
+
+class TokenBucket():
+    """
+    令牌桶限速：rate 为每秒补充的令牌数，burst 为桶容量，初始为满。
+
+    构造函数参数：
+    rate: 每秒补充的令牌数
+    burst: 桶容量
+    """
+
+    def __init__(self, rate, burst=5):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """取一个令牌，返回是否成功"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._time) * self.rate)
+            self._time = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CommandFilter():
+    """
+    手势命令过滤器，位于 on_message 和 signal.emit 之间，在网络线程中丢弃抖动产生的重复命令。
+
+    - 去抖窗口：每个命令可单独设置窗口（秒），窗口内的重复命令被抑制
+    - 前沿/后沿：'leading' 立即放行窗口内的第一条，之后的抑制；
+                 'trailing' 等到窗口内不再有新命令时才放行最后一条
+    - 令牌桶：所有命令共享，rate 为每秒补充的令牌数，burst 为桶容量；rate 为 None 时不限速
+    - 带参数的命令（"1:10"）按基础命令（"1"）查找窗口和去抖，参数不同也算同一命令；
+      后沿模式放行的是窗口内最后一条（连同它的参数）
+
+    构造函数参数：
+    emit: 放行命令时调用的函数 emit(command, trace)，如 Mqtt_Subscriber.signal.emit
+    debounce: 默认去抖窗口（秒），0 表示不去抖
+    windows: {基础命令: 去抖窗口}，覆盖默认值
+    edge: 'leading' 或 'trailing'
+    rate: 令牌桶速率（条/秒）
+    burst: 令牌桶容量
+    """
+
+    def __init__(self, emit, debounce=0.5, windows=None, edge='leading', rate=None, burst=5):
+        if edge not in ('leading', 'trailing'):
+            raise ValueError(f"未知的去抖模式: {edge}")
+        self.emit = emit
+        self.debounce = debounce
+        self.windows = dict(windows or {})
+        self.edge = edge
+        self.rate = rate
+        self.burst = burst
+        self._bucket = TokenBucket(rate, burst) if rate is not None else None
+        self._last_passed = {}  # 基础命令 -> 上次放行时间（前沿模式）
+        self._timers = {}  # 基础命令 -> 待触发的后沿定时器
+        self._lock = threading.Lock()
+        self.passed = 0  # 放行的命令数
+        self.suppressed = 0  # 被去抖抑制的命令数
+        self.rate_limited = 0  # 被令牌桶拒绝的命令数
+
+    @staticmethod
+    def _key(command):
+        """去抖状态按基础命令记录；参数无法解析时退回原命令，过滤器本身不抛异常"""
+        try:
+            return split_command(command)[0]
+        except ValueError:
+            return command
+
+    def window_for(self, command):
+        """获取命令的去抖窗口，带参数的命令使用基础命令的窗口"""
+        return self.windows.get(self._key(command), self.debounce)
+
+    def submit(self, command, trace=None):
+        """提交一条命令，返回是否已立即放行（后沿模式总是返回 False）
+
+        Args:
+            command: 命令字符
+            trace: 延迟统计用的 trace（见 latency_metrics），原样交给 emit
+        """
+        key = self._key(command)
+        window = self.windows.get(key, self.debounce)
+        if window <= 0:
+            return self._pass(command, trace)
+        if self.edge == 'trailing':
+            self._schedule_trailing(key, command, window, trace)
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_passed.get(key)
+            if last is not None and now - last < window:
+                self.suppressed += 1
+                return False
+            self._last_passed[key] = now
+        return self._pass(command, trace)
+
+    def _schedule_trailing(self, key, command, window, trace=None):
+        """后沿模式：重置该基础命令的定时器，窗口内再无新命令时才放行"""
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is not None:
+                timer.cancel()
+                self.suppressed += 1
+            timer = threading.Timer(window, self._fire_trailing, args=(key, command, trace))
+            timer.daemon = True
+            self._timers[key] = timer
+        timer.start()
+
+    def _fire_trailing(self, key, command, trace=None):
+        with self._lock:
+            self._timers.pop(key, None)
+        self._pass(command, trace)
+
+    def _take_token(self):
+        """从令牌桶取一个令牌，未启用限速时总是成功"""
+        return self._bucket is None or self._bucket.take()
+
+    def _pass(self, command, trace=None):
+        if not self._take_token():
+            self.rate_limited += 1
+            return False
+        self.passed += 1
+        if trace is not None:
+            trace['emitted'] = time.monotonic()
+        self.emit(command, trace)
+        return True
+
+    def cancel_pending(self):
+        """取消所有尚未触发的后沿定时器"""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+    def stats(self):
+        """放行/抑制计数"""
+        return {
+            'passed': self.passed,
+            'suppressed': self.suppressed,
+            'rate_limited': self.rate_limited,
+        }
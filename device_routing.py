@@ -0,0 +1,200 @@
+"""
+多设备手势路由。
+
+多个手势设备（翻页戒指、遥控笔、摄像头……）各自向 gesture/<设备>/control 发布，
+订阅端用通配符 gesture/+/control 一次订阅，按主题路由到设备策略：
+- enabled:  是否接受该设备的手势
+- mapping:  {设备命令: 程序命令}，None 表示原样使用；给定时未列出的命令被丢弃
+- rate/burst: 该设备独立的令牌桶限速，rate 为 None 时不限速
+- priority: 优先级，高优先级设备最近 priority_hold 秒内有手势时，低优先级设备的手势被丢弃
+
+主题 → 设备的路由表预先按已配置的设备生成，未知设备首次出现时按默认策略加入，
+之后每条消息的路由都是一次字典查找，与设备数量无关。
+每个设备有独立的序号窗口（各设备的序号互不相关）和计数。
+
+配置文件（JSON）示例：
+    {
+        "topic": "gesture/+/control",
+        "priority_hold": 1.0,
+        "devices": {
+            "ring":   {"priority": 2},
+            "camera": {"priority": 0, "rate": 2, "mapping": {"0": "0", "1": "1"}}
+        },
+        "default": {"enabled": false}
+    }
+"""
+import json
+import threading
+import time
+
+from paho.mqtt.client import topic_matches_sub
+
+from command_filter import TokenBucket
+from gesture_protocol import SequenceWindow
+
+DEFAULT_TOPIC = "gesture/+/control"
+
+
+class DevicePolicy():
+    """
+    单个设备的策略。
+
+    构造函数参数：
+    enabled: 是否接受该设备的手势
+    mapping: {设备命令: 程序命令}，None 表示原样使用
+    rate: 令牌桶速率（条/秒），None 表示不限速
+    burst: 令牌桶容量
+    priority: 优先级，数值越大越优先
+    """
+
+    def __init__(self, enabled=True, mapping=None, rate=None, burst=5, priority=0):
+        self.enabled = enabled
+        self.mapping = dict(mapping) if mapping is not None else None
+        self.rate = rate
+        self.burst = burst
+        self.priority = priority
+
+    @classmethod
+    def from_dict(cls, options):
+        return cls(**options)
+
+
+class DeviceRoute():
+    """路由表中的一项：设备名、策略以及该设备的限速器、序号窗口和计数"""
+
+    def __init__(self, device, policy):
+        self.device = device
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate, policy.burst) if policy.rate is not None else None
+        self.sequence_window = SequenceWindow()
+        self.received = 0  # 收到的消息数
+        self.accepted = 0  # 通过设备策略的命令数
+        self.disabled = 0  # 设备被禁用而丢弃的数量
+        self.unmapped = 0  # 不在命令映射中的数量
+        self.rate_limited = 0  # 被设备令牌桶拒绝的数量
+        self.preempted = 0  # 被更高优先级设备抢占的数量
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'accepted': self.accepted,
+            'disabled': self.disabled,
+            'unmapped': self.unmapped,
+            'rate_limited': self.rate_limited,
+            'preempted': self.preempted,
+            'duplicate': self.sequence_window.duplicates,
+        }
+
+
+class DeviceRouter():
+    """
+    主题 → 设备路由器。
+
+    构造函数参数：
+    topic_filter: 订阅的通配符主题，设备名取自第一个 '+' 所在的层级
+    devices: {设备名: DevicePolicy}
+    default_policy: 未配置设备的策略，None 表示丢弃未知设备
+    priority_hold: 高优先级设备的手势在该时长（秒）内压制低优先级设备
+    max_routes: 路由表上限，防止大量随机主题撑大路由表；表满后新设备的消息计入 unrouted 并丢弃
+    """
+
+    def __init__(self, topic_filter=DEFAULT_TOPIC, devices=None, default_policy=None, priority_hold=1.0,
+                 max_routes=256):
+        self.topic_filter = topic_filter
+        levels = topic_filter.split('/')
+        self._device_level = levels.index('+') if '+' in levels else None
+        self.default_policy = default_policy
+        self.priority_hold = priority_hold
+        self.max_routes = max_routes
+        self.unrouted = 0  # 不匹配或未知设备被丢弃的消息数
+        self._routes = {}  # 主题 -> DeviceRoute，运行中只读或整体追加
+        self._lock = threading.Lock()
+        self._active_priority = None  # 最近一次被接受的手势的优先级
+        self._active_until = 0.0
+        for device, policy in (devices or {}).items():
+            self._routes[self.topic_for(device)] = DeviceRoute(device, policy)
+
+    def topic_for(self, device):
+        """设备对应的具体主题"""
+        if self._device_level is None:
+            return self.topic_filter
+        levels = self.topic_filter.split('/')
+        levels[self._device_level] = device
+        return '/'.join(levels)
+
+    def route(self, topic):
+        """查找主题对应的路由，未知且无默认策略或路由表已满时返回 None"""
+        route = self._routes.get(topic)
+        if route is not None:
+            return route
+        return self._add_route(topic)
+
+    def _add_route(self, topic):
+        """未知主题：首次出现时按默认策略建立路由（之后直接命中路由表）"""
+        if self.default_policy is None or not topic_matches_sub(self.topic_filter, topic):
+            self.unrouted += 1
+            return None
+        levels = topic.split('/')
+        device = levels[self._device_level] if self._device_level is not None else topic
+        with self._lock:
+            route = self._routes.get(topic)
+            if route is None:
+                if len(self._routes) >= self.max_routes:
+                    # 不能每条消息临时建一个路由：新的令牌桶总是满的，限速和去重都会失效
+                    self.unrouted += 1
+                    return None
+                route = DeviceRoute(device, self.default_policy)
+                # 复制后整体替换，网络线程无锁读取时看到的总是完整的字典
+                routes = dict(self._routes)
+                routes[topic] = route
+                self._routes = routes
+        return route
+
+    def admit(self, route, command):
+        """按设备策略处理一条命令，返回映射后的命令，被丢弃时返回 None（在网络线程中调用）"""
+        route.received += 1
+        policy = route.policy
+        if not policy.enabled:
+            route.disabled += 1
+            return None
+        if policy.mapping is not None:
+            command = policy.mapping.get(command)
+            if command is None:
+                route.unmapped += 1
+                return None
+        now = time.monotonic()
+        if (self._active_priority is not None and policy.priority < self._active_priority
+                and now < self._active_until):
+            route.preempted += 1
+            return None
+        if route.bucket is not None and not route.bucket.take():
+            route.rate_limited += 1
+            return None
+        # 能走到这里说明没有被压制：本设备成为当前的优先级持有者
+        self._active_priority = policy.priority
+        self._active_until = now + self.priority_hold
+        route.accepted += 1
+        return command
+
+    def duplicates(self):
+        """各设备序号窗口拒绝的重复消息总数"""
+        return sum(route.sequence_window.duplicates for route in self._routes.values())
+
+    def stats(self):
+        """每个设备的计数"""
+        stats = {route.device: route.stats() for route in self._routes.values()}
+        stats['_unrouted'] = self.unrouted
+        return stats
+
+
+def load_router(path):
+    """从 JSON 配置文件创建 DeviceRouter"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    default = config.get('default')
+    return DeviceRouter(
+        topic_filter=config.get('topic', DEFAULT_TOPIC),
+        devices={name: DevicePolicy.from_dict(options) for name, options in config.get('devices', {}).items()},
+        default_policy=DevicePolicy.from_dict(default) if default is not None else None,
+        priority_hold=config.get('priority_hold', 1.0),
+    )
@@ -0,0 +1,298 @@
+"""
+端到端基准：进程内 MQTT 代理替身 + Mqtt_Subscriber + Client_UI 的手势分发路径 + 记录型输入后端。
+
+发布端按设定速率发布合成手势，经真实的 TCP/MQTT、on_message、Qt 信号、gesture_callback
+和 ActionExecutor 注入到 RecordingBackend，不需要外部代理、显示器或 PowerPoint。
+结果为 JSON（每个速率一行），便于在不同提交之间比较：
+    python benchmark.py e2e --rates 10,50,200 --duration 5 --output e2e.jsonl
+"""
+import contextlib
+import io
+import itertools
+import logging
+import os
+import random
+import subprocess
+import threading
+import time
+
+import latency_metrics
+
+class _SampleRecorder(latency_metrics.LatencyRecorder):
+    """在分阶段直方图之外保留端到端原始样本（发布 → 注入完成）"""
+
+    def __init__(self):
+        super().__init__()
+        self.e2e = []
+
+    def finish(self, trace):
+        super().finish(trace)
+        if 'published' in trace:
+            self.e2e.append(trace['received_wall'] - trace['published'] + trace['finished'] - trace['received'])
+
+
+def _percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))]
+
+
+def git_revision():
+    """当前提交的短哈希，不在 git 仓库中时返回 None"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def synthetic_commands(pattern, count, seed=0):
+    """生成合成手势序列
+
+    Args:
+        pattern: 'cycle' 依次循环 0~5；'same' 全部为 "1"（触发合并）；'random' 随机
+        count: 手势数
+        seed: 随机种子
+    """
+    if pattern == 'cycle':
+        return [str(i % 6) for i in range(count)]
+    if pattern == 'same':
+        return ["1"] * count
+    rng = random.Random(seed)
+    return [str(rng.randrange(6)) for _ in range(count)]
+
+
+class GesturePipeline():
+    """
+    完整的手势处理管线，全部在本进程内运行。
+
+    构造函数参数：
+    command_filter: 传给 Mqtt_Subscriber 的过滤参数，默认不去抖以测量管线本身的容量
+    max_command_age: 过期阈值（秒），None 表示不检查
+    profiles: gesture_profiles.ProfileSet，None 时使用默认配置（只有 PowerPoint）
+    subscriber_options: 其余传给 Mqtt_Subscriber 的关键字参数
+    """
+
+    def __init__(self, command_filter=None, max_command_age=1.0, profiles=None, **subscriber_options):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtWidgets import QApplication
+        from broker_stub import BrokerStub
+        from client_do import Client_UI
+        from input_backend import RecordingBackend
+        from Subscriber import Mqtt_Subscriber
+
+        self.app = QApplication.instance() or QApplication([])
+        self.broker = BrokerStub().start()
+        self.ui = Client_UI(backend=RecordingBackend(), profiles=profiles)
+        self.ui.load_automation()  # 不显示窗口，直接创建执行线程
+        self.ui.switch_profile("POWERPNT.EXE")  # 假定焦点在 PowerPoint 中
+        self.injected = 0  # 注入的命令数（合并的批次按次数计）
+        for command, action in list(self.ui.executor.actions.items()):
+            self.ui.executor.actions[command] = self._counting(action)
+        self.subscriber = Mqtt_Subscriber(
+            broker="127.0.0.1", port=self.broker.port,
+            command_filter=command_filter if command_filter is not None else {'debounce': 0},
+            max_command_age=max_command_age, client_id="e2e_harness", **subscriber_options
+        )
+        self.subscriber.signal.connect(self.ui.gesture_callback)
+        self.dispatched = 0  # 到达 gesture_callback 的命令数
+        self.subscriber.signal.connect(self._count_dispatch)
+        self.recorder = _SampleRecorder()
+        latency_metrics.RECORDER = self.recorder
+
+    def _counting(self, action):
+        def run(times=1):
+            action(times)
+            self.injected += times
+        return run
+
+    def _count_dispatch(self, command, trace):
+        self.dispatched += 1
+
+    def settled(self, count):
+        """已发布的前 count 条是否都已被 on_message 处理完，且放行的都已到达 gesture_callback"""
+        subscriber = self.subscriber
+        filter_stats = subscriber.command_filter
+        handled = (filter_stats.passed + filter_stats.suppressed + filter_stats.rate_limited + subscriber.gated
+                   + subscriber.stale_dropped + subscriber.invalid_dropped + subscriber.sequence_window.duplicates)
+        return handled >= count and self.dispatched >= filter_stats.passed
+
+    def start(self, timeout=5):
+        """连接代理并等待订阅完成"""
+        self.subscriber.start()
+        deadline = time.monotonic() + timeout
+        while self.subscriber.state != "connected":
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"连接代理替身超时，状态: {self.subscriber.state}")
+            self.app.processEvents()
+            time.sleep(0.005)
+        return self
+
+    def run_until(self, done, timeout=None):
+        """运行 Qt 事件循环，直到 done() 为真或超时"""
+        from PySide6.QtCore import QEventLoop, QTimer
+
+        loop = QEventLoop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        watcher = QTimer()
+        watcher.timeout.connect(
+            lambda: (done() or (deadline is not None and time.monotonic() > deadline)) and loop.quit()
+        )
+        watcher.start(20)
+        with contextlib.redirect_stdout(io.StringIO()):  # 屏蔽每条命令的打印
+            loop.exec()
+        watcher.stop()
+
+    def reset_counters(self):
+        """清零各环节计数，便于同一条管线依次测量多个速率"""
+        subscriber = self.subscriber
+        subscriber.command_filter.passed = subscriber.command_filter.suppressed = 0
+        subscriber.command_filter.rate_limited = 0
+        subscriber.stale_dropped = subscriber.invalid_dropped = subscriber.sequence_window.duplicates = 0
+        subscriber.gated = 0
+        executor = self.ui.executor
+        executor.submitted = executor.coalesced = executor.cancelled = executor.dropped = executor.executed = 0
+        self.injected = self.dispatched = 0
+        self.recorder = _SampleRecorder()
+        latency_metrics.RECORDER = self.recorder
+
+    def close(self):
+        self.subscriber.disconnect()
+        self.ui.executor.stop()
+        self.broker.stop()
+        if latency_metrics.RECORDER is self.recorder:
+            latency_metrics.RECORDER = None
+
+
+def publish_schedule(port, topic, schedule, qos=1):
+    """按计划发布，节拍按绝对时间计算，不随发布耗时漂移
+
+    Args:
+        port: 代理端口
+        topic: 主题
+        schedule: [(相对开始的秒数, make_payload)]，make_payload() 在发送时调用并返回载荷
+        qos: 发布 QoS
+    """
+    import paho.mqtt.client as mqtt
+
+    publisher = mqtt.Client(client_id="e2e_publisher", callback_api_version=mqtt.CallbackAPIVersion.VERSION2)
+    publisher.connect("127.0.0.1", port)
+    publisher.loop_start()
+    start = time.monotonic()
+    for offset, make_payload in schedule:
+        delay = start + offset - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        publisher.publish(topic, make_payload(), qos=qos)
+    publisher.loop_stop()
+    publisher.disconnect()
+
+
+def payload_factory(command, payload_format, sequences, argument=None):
+    """生成 make_payload：发送时才取时间戳"""
+    from gesture_protocol import encode_binary, encode_text
+
+    if payload_format == 'binary':
+        return lambda: encode_binary(command, next(sequences), time.time(), argument)
+    if payload_format == 'json':
+        return lambda: encode_text(command, time.time(), argument)
+    return lambda: encode_text(command, argument=argument)
+
+
+def drive(pipeline, schedule, qos=1, settle=2.0):
+    """在后台线程发布 schedule，主线程运行事件循环直到管线排空，返回计数
+
+    Args:
+        pipeline: 已 start 的 GesturePipeline
+        schedule: 见 publish_schedule
+        qos: 发布 QoS
+        settle: 发布结束后等待管线排空的最长时间（秒）
+    """
+    pipeline.reset_counters()
+    sent = len(schedule)
+    thread = threading.Thread(target=publish_schedule, daemon=True,
+                              args=(pipeline.broker.port, pipeline.subscriber.topic, schedule, qos))
+    started = time.monotonic()
+    thread.start()
+    executor = pipeline.ui.executor
+    subscriber = pipeline.subscriber
+    filter_stats = subscriber.command_filter
+
+    def drained():
+        return not thread.is_alive() and pipeline.settled(sent) and executor.queue_depth()[0] == 0
+
+    duration = schedule[-1][0] if schedule else 0
+    pipeline.run_until(drained, timeout=duration + settle + 5)
+    time.sleep(0.05)  # 等待执行线程完成最后一批
+    elapsed = time.monotonic() - started
+
+    e2e = pipeline.recorder.e2e
+    executor_stats = executor.stats()
+    drops = {
+        'suppressed': filter_stats.suppressed,
+        'rate_limited': filter_stats.rate_limited,
+        'stale': subscriber.stale_dropped,
+        'duplicate': subscriber.sequence_window.duplicates,
+        'invalid': subscriber.invalid_dropped,
+        'gated': subscriber.gated,  # on_message 中因焦点不在 PPT 丢弃
+        'unfocused': pipeline.dispatched - executor_stats['submitted'],  # gesture_callback 因焦点不在 PPT 忽略
+        'queue_overflow': executor_stats['dropped'],
+        'cancelled': executor_stats['cancelled'],
+    }
+    return {
+        'sent': sent,
+        'delivered': filter_stats.passed,
+        'injected': pipeline.injected,
+        'batches': executor_stats['executed'],
+        'coalesced': executor_stats['coalesced'],
+        'throughput_per_s': round(pipeline.injected / elapsed, 2),
+        'e2e_p50_ms': None if not e2e else round(_percentile(e2e, 50) * 1000, 3),
+        'e2e_p99_ms': None if not e2e else round(_percentile(e2e, 99) * 1000, 3),
+        'e2e_max_ms': None if not e2e else round(max(e2e) * 1000, 3),
+        'drops': drops,
+        # 既未注入也未计入任何丢弃原因的命令（如网络层丢失）
+        'lost': max(0, sent - pipeline.injected - sum(drops.values())),
+    }
+
+
+def run_stream(pipeline, rate, duration, pattern='cycle', payload_format='binary', qos=1, seed=0,
+               settle=2.0, sequences=None):
+    """以给定速率发布 duration 秒的合成手势，返回结果字典
+
+    Args:
+        pipeline: 已 start 的 GesturePipeline
+        rate: 每秒手势数
+        duration: 发布时长（秒）
+        pattern: 手势序列，见 synthetic_commands
+        payload_format: 'text'、'json' 或 'binary'；text 不带时间戳，没有端到端延迟
+        qos: 发布 QoS
+        settle: 发布结束后等待管线排空的最长时间（秒）
+        sequences: 二进制格式的序号迭代器，同一管线多次运行时需沿用
+    """
+    sequences = sequences or itertools.count()
+    commands = synthetic_commands(pattern, max(1, int(rate * duration)), seed)
+    schedule = [(index / rate, payload_factory(command, payload_format, sequences))
+                for index, command in enumerate(commands)]
+    result = {
+        'revision': git_revision(),
+        'rate': rate,
+        'pattern': pattern,
+        'format': payload_format,
+        'qos': qos,
+    }
+    result.update(drive(pipeline, schedule, qos, settle))
+    return result
+
+
+def run_suite(rates, duration, pattern='cycle', payload_format='binary', qos=1, command_filter=None,
+              max_command_age=1.0, seed=0):
+    """依次测量多个速率，返回结果列表"""
+    logging.getLogger().setLevel(logging.WARNING)
+    pipeline = GesturePipeline(command_filter=command_filter, max_command_age=max_command_age).start()
+    sequences = itertools.count()
+    try:
+        return [run_stream(pipeline, rate, duration, pattern, payload_format, qos, seed, sequences=sequences)
+                for rate in rates]
+    finally:
+        pipeline.close()
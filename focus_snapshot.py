@@ -0,0 +1,179 @@
+"""
+最新焦点窗口信息的共享内存快照（单写多读，seqlock）。
+
+监测循环每次焦点变化时原地覆盖同一块固定布局的内存，读取方直接解析，
+不经过队列、不序列化、不加锁：
+- 写入：序号 +1（变为奇数）→ 写字段 → 序号 +1（变为偶数）
+- 读取：读序号，为奇数或读完字段后序号变化则说明读到了写到一半的数据，让出 CPU 后重试；
+  最多重试 MAX_READ_ATTEMPTS 次，仍不一致时（如写入方在写入中途被终止，序号停在奇数）
+  返回上一次一致的快照，不会卡住调用方（界面线程）
+序号未变化时直接返回上一次解析出的字典，常见情况下一次读取只解析 8 字节。
+
+布局（小端）：
+    序号 u64 | 更新时间 f64 | hwnd u64 | pid u32 | 进程名ID u32 |
+    标题长度 u16 | 标题 UTF-8 (TITLE_SIZE) | 类名长度 u16 | 类名 UTF-8 (CLASS_SIZE) |
+    进程名表：NAME_SLOTS 个槽，每槽 ID u32 | 长度 u16 | 名称 UTF-8 (NAME_SIZE)
+进程名按出现顺序分配递增ID，写入 ID % NAME_SLOTS 号槽；ID 不复用，
+读取方按 ID 缓存进程名，同一进程的后续读取不再解码名称。
+
+线程模式使用进程内的 bytearray；进程模式使用 multiprocessing.shared_memory，
+子进程按名称 attach。
+"""
+import struct
+import time
+from multiprocessing import shared_memory
+
+TITLE_SIZE = 512
+CLASS_SIZE = 128
+NAME_SLOTS = 64
+NAME_SIZE = 64
+MAX_READ_ATTEMPTS = 64  # 一次 read() 最多尝试的次数
+
+_SEQUENCE = struct.Struct('<Q')
+_FIELDS = struct.Struct(f'<dQIIH{TITLE_SIZE}sH{CLASS_SIZE}s')
+_NAME_SLOT = struct.Struct(f'<IH{NAME_SIZE}s')
+_FIELDS_OFFSET = _SEQUENCE.size
+_NAMES_OFFSET = _FIELDS_OFFSET + _FIELDS.size
+SNAPSHOT_SIZE = _NAMES_OFFSET + NAME_SLOTS * _NAME_SLOT.size
+
+
+def _truncate(text, size):
+    """UTF-8 编码并按字符边界截断到 size 字节以内"""
+    data = text.encode('utf-8')
+    if len(data) <= size:
+        return data
+    return data[:size].decode('utf-8', 'ignore').encode('utf-8')
+
+
+class FocusSnapshot():
+    """
+    焦点窗口信息快照。
+
+    构造函数参数：
+    buffer: 可写缓冲区（bytearray 或 SharedMemory.buf），长度至少 SNAPSHOT_SIZE
+    shm: 对应的 SharedMemory 对象（进程模式），用于 close/unlink
+
+    使用示例：
+        snapshot = FocusSnapshot.create(shared=True)   # 主进程
+        child = FocusSnapshot.attach(snapshot.name)    # 子进程
+        child.write(window_info)
+        snapshot.read()
+    """
+
+    def __init__(self, buffer, shm=None):
+        self._buffer = memoryview(buffer)
+        self._shm = shm
+        # 写入方状态：进程名 -> ID
+        self._name_ids = {}
+        self._next_name_id = 1
+        # 读取方状态
+        self._names = {}  # ID -> 进程名
+        self._last_sequence = 0
+        self._last_info = None
+        self.retries = 0  # 读到写入中数据而重试的次数
+        self.stale_reads = 0  # 重试用尽、返回上一次快照的次数
+
+    @classmethod
+    def create(cls, shared=False):
+        """创建快照：shared 为 True 时使用共享内存，供子进程写入"""
+        if shared:
+            shm = shared_memory.SharedMemory(create=True, size=SNAPSHOT_SIZE)
+            shm.buf[:SNAPSHOT_SIZE] = bytes(SNAPSHOT_SIZE)
+            return cls(shm.buf, shm)
+        return cls(bytearray(SNAPSHOT_SIZE))
+
+    @classmethod
+    def attach(cls, name):
+        """在子进程中按名称连接共享内存"""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm.buf, shm)
+
+    @property
+    def name(self):
+        """共享内存名称，非共享快照为 None"""
+        return self._shm.name if self._shm is not None else None
+
+    def sequence(self):
+        """当前序号，0 表示尚未写入过"""
+        return _SEQUENCE.unpack_from(self._buffer, 0)[0]
+
+    def _name_id(self, process_name):
+        """写入方：获取进程名ID，新名称写入名称表槽位（须在序号为奇数时调用）"""
+        name_id = self._name_ids.get(process_name)
+        if name_id is None:
+            name_id = self._next_name_id
+            self._next_name_id += 1
+            data = _truncate(process_name, NAME_SIZE)
+            _NAME_SLOT.pack_into(self._buffer, _NAMES_OFFSET + (name_id % NAME_SLOTS) * _NAME_SLOT.size,
+                                 name_id, len(data), data)
+            if len(self._name_ids) >= NAME_SLOTS:
+                self._name_ids.clear()  # 槽位将被覆盖，旧名称以后按新ID重新写入
+            self._name_ids[process_name] = name_id
+        return name_id
+
+    def write(self, window_info):
+        """写入方（只能有一个）：原地覆盖快照"""
+        title = _truncate(window_info['window_title'], TITLE_SIZE)
+        class_name = _truncate(window_info['class_name'], CLASS_SIZE)
+        buffer = self._buffer
+        sequence = _SEQUENCE.unpack_from(buffer, 0)[0]
+        _SEQUENCE.pack_into(buffer, 0, sequence + 1)  # 奇数：写入中
+        name_id = self._name_id(window_info['process_name'])
+        _FIELDS.pack_into(buffer, _FIELDS_OFFSET, time.time(), window_info['window_handle'] or 0,
+                          window_info['process_id'] or 0, name_id, len(title), title, len(class_name), class_name)
+        _SEQUENCE.pack_into(buffer, 0, sequence + 2)
+
+    def read(self):
+        """读取方：返回窗口信息字典，尚未写入时返回 None
+
+        返回的字典在快照更新前会被重复返回，调用方不应修改它。
+        重试 MAX_READ_ATTEMPTS 次仍读不到一致的数据时返回上一次一致的快照（从未读到过则为 None）。
+        """
+        buffer = self._buffer
+        for attempt in range(MAX_READ_ATTEMPTS):
+            if attempt:
+                self.retries += 1
+                time.sleep(0)  # 让出 CPU，写入方（同进程的监测线程）才能写完
+            sequence = _SEQUENCE.unpack_from(buffer, 0)[0]
+            if sequence == self._last_sequence:
+                return self._last_info
+            if sequence & 1:
+                continue
+            (updated, hwnd, pid, name_id, title_length, title, class_length,
+             class_name) = _FIELDS.unpack_from(buffer, _FIELDS_OFFSET)
+            process_name = self._names.get(name_id)
+            if process_name is None:
+                slot_id, name_length, name = _NAME_SLOT.unpack_from(
+                    buffer, _NAMES_OFFSET + (name_id % NAME_SLOTS) * _NAME_SLOT.size
+                )
+                process_name = name[:name_length].decode('utf-8', 'replace') if slot_id == name_id else None
+            if _SEQUENCE.unpack_from(buffer, 0)[0] != sequence or process_name is None:
+                continue
+            if len(self._names) >= 4 * NAME_SLOTS:
+                self._names.clear()
+            self._names[name_id] = process_name
+            info = {
+                'window_handle': hwnd,
+                'window_title': title[:title_length].decode('utf-8', 'replace'),
+                'class_name': class_name[:class_length].decode('utf-8', 'replace'),
+                'process_id': pid,
+                'process_name': process_name,
+                'updated': updated,
+            }
+            self._last_sequence = sequence
+            self._last_info = info
+            return info
+        self.stale_reads += 1
+        return self._last_info
+
+    def close(self, unlink=False):
+        """释放共享内存；创建方传 unlink=True 删除共享内存"""
+        self._buffer.release()
+        if self._shm is not None:
+            self._shm.close()
+            if unlink:
+                try:
+                    self._shm.unlink()
+                except FileNotFoundError:
+                    pass
+            self._shm = None
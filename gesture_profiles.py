@@ -0,0 +1,179 @@
+"""
+按前台程序切换的手势配置。
+
+每个配置对应一组进程名（PowerPoint、PDF 阅读器、浏览器……），把手势命令 "0"~"6"
+映射到动作。加载时每个配置编译一次，得到 {命令: (动作键, 标签文字)} 的扁平分发表，
+动作注册到执行器；焦点进入/离开这些程序时 Client_UI 整体替换当前分发表，
+收到手势只需一次查表，不再逐个匹配命令字符串，也不再检查焦点。
+
+动作写法：
+- script 的方法名："up_sliding"、"down_sliding"、"zoom_in"、"zoom_out"、"Left_sliding"、"Right_sliding"、
+  "goto_slide"
+- ["press", 键]：按键，如 ["press", "pagedown"]
+- ["hotkey", 键, 键, ...]：组合键，如 ["hotkey", "ctrl", "+"]
+- ["scroll", 滚动量]：先把光标移回目标区域再滚动，如 ["scroll", -500]
+按键名与 pyautogui 相同。
+
+配置文件（JSON）示例：
+    {
+        "powerpoint": {
+            "processes": ["POWERPNT.EXE"],
+            "title": "powerpoint",
+            "gestures": {"0": "up_sliding", "1": "down_sliding", "2": "zoom_in",
+                         "3": "zoom_out", "4": "Left_sliding", "5": "Right_sliding"}
+        },
+        "pdf": {
+            "processes": ["Acrobat.exe", "AcroRd32.exe", "SumatraPDF.exe"],
+            "title": "PDF阅读器",
+            "gestures": {"0": ["press", "pageup"], "1": ["press", "pagedown"],
+                         "2": ["hotkey", "ctrl", "+"], "3": ["hotkey", "ctrl", "-"]},
+            "labels": {"0": "🟢 上一页", "1": "🟢 下一页"}
+        }
+    }
+未配置的手势在该程序中被忽略。
+
+带参数的命令（"1:10"、"6:12"）使用同一张分发表：参数作为动作的 times 传入，
+即重复次数/缩放步数，goto_slide 则为页码。重复次数超过 MAX_REPEAT 时截断。
+"""
+import functools
+import json
+
+from gesture_protocol import OPCODE_COMMANDS
+
+# script 方法对应的界面提示（沿用原有文字）
+ACTION_LABELS = {
+    'up_sliding': "🟢 向上翻页！",
+    'down_sliding': "🟢 向下翻页！",
+    'zoom_in': "🟢 放大！",
+    'zoom_out': "🟢 缩小！",
+    'Left_sliding': "🟢 左键",
+    'Right_sliding': "🟢 右键",
+    'goto_slide': "🟢 跳转到页",
+}
+
+# 带参数命令的重复次数上限，防止错误的参数注入成百上千次按键
+MAX_REPEAT = 50
+
+# 未提供配置文件时的默认配置：与原有行为相同，只在 PowerPoint 中生效
+POWERPOINT = {
+    'processes': ["POWERPNT.EXE"],
+    'title': "powerpoint",
+    'gestures': {"0": "up_sliding", "1": "down_sliding", "2": "zoom_in",
+                 "3": "zoom_out", "4": "Left_sliding", "5": "Right_sliding", "6": "goto_slide"},
+}
+
+
+def action_key(spec):
+    """动作在执行器中的键：相同的动作在各配置间共用，连续的相同动作会被合并"""
+    if isinstance(spec, str):
+        return spec
+    return ' '.join(str(part) for part in spec)
+
+
+def resolve_action(spec, actuator):
+    """把动作写法解析为接收重复次数 times 的可调用对象
+
+    Args:
+        spec: 动作写法，见模块说明
+        actuator: script 对象
+    """
+    if isinstance(spec, str):
+        method = getattr(actuator, spec, None)
+        if spec.startswith('_') or not callable(method):
+            raise ValueError(f"未知动作: {spec}")
+        return method
+    kind, *arguments = spec
+    if kind == 'press' and len(arguments) == 1:
+        return functools.partial(actuator.press_key, arguments[0])
+    if kind == 'hotkey' and arguments:
+        return functools.partial(actuator.hotkey, tuple(arguments))
+    if kind == 'scroll' and len(arguments) == 1:
+        return functools.partial(actuator.scroll, int(arguments[0]))
+    raise ValueError(f"无法解析的动作: {spec!r}")
+
+
+class GestureProfile():
+    """
+    单个程序的手势配置。
+
+    构造函数参数：
+    name: 配置名
+    processes: 生效的进程名列表（不区分大小写）
+    gestures: {手势命令: 动作写法}
+    title: 界面上显示的程序名，默认为配置名
+    labels: {手势命令: 界面提示}，默认按动作生成
+    """
+
+    def __init__(self, name, processes, gestures, title=None, labels=None):
+        unknown = set(gestures) - set(OPCODE_COMMANDS)
+        if unknown:
+            raise ValueError(f"配置 {name} 中有未知手势: {sorted(unknown)}")
+        self.name = name
+        self.processes = tuple(process.upper() for process in processes)
+        self.gestures = dict(gestures)
+        self.title = title or name
+        self.labels = dict(labels or {})
+        self.table = None  # 编译后的分发表
+
+    @classmethod
+    def from_dict(cls, name, options):
+        return cls(name, **options)
+
+    def compile(self, actuator, actions):
+        """编译为 {命令: (动作键, 标签文字)} 的分发表，并把用到的动作注册到 actions
+
+        Args:
+            actuator: script 对象
+            actions: 执行器的动作表 {动作键: 可调用对象}
+        """
+        table = {}
+        for command in OPCODE_COMMANDS:
+            spec = self.gestures.get(command)
+            if spec is None:
+                continue
+            key = action_key(spec)
+            if key not in actions:
+                actions[key] = resolve_action(spec, actuator)
+            table[command] = (key, self.labels.get(command) or ACTION_LABELS.get(key) or f"🟢 {key}")
+        self.table = table
+        return table
+
+
+class ProfileSet():
+    """全部手势配置，按进程名索引"""
+
+    def __init__(self, profiles):
+        self.profiles = list(profiles)
+        self._by_process = {}
+        for profile in self.profiles:
+            for process in profile.processes:
+                if process in self._by_process:
+                    raise ValueError(f"进程 {process} 同时出现在配置 {self._by_process[process].name} 和 {profile.name} 中")
+                self._by_process[process] = profile
+
+    def processes(self):
+        """需要监听焦点的全部进程名"""
+        return list(self._by_process)
+
+    def for_process(self, process_name):
+        """进程对应的配置，不在任何配置中时返回 None"""
+        if not process_name:
+            return None
+        return self._by_process.get(process_name.upper())
+
+    def compile(self, actuator, actions):
+        """编译全部配置（创建执行器时调用一次）"""
+        for profile in self.profiles:
+            profile.compile(actuator, actions)
+
+
+def default_profiles():
+    """默认配置：只有 PowerPoint"""
+    return ProfileSet([GestureProfile.from_dict('powerpoint', POWERPOINT)])
+
+
+def load_profiles(path):
+    """从 JSON 配置文件创建 ProfileSet"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    return ProfileSet(GestureProfile.from_dict(name, options) for name, options in config.items())
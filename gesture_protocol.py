@@ -0,0 +1,206 @@
+"""
+手势消息格式解析。
+
+支持三种载荷：
+- 旧格式：单个命令字符，如 "1"；带参数时为 "命令:参数"，如 "1:10"
+- 带时间戳的 JSON：{"cmd": "1", "ts": 1712345678.123, "arg": 10}，ts 为发布端的 time.time()，arg 可省略；
+  cmd 必须是 OPCODE_COMMANDS 中的命令
+- 二进制格式（版本1，大端）：
+      版本字节 0xA1 | 操作码 u8 | 标志 u8 | 序号 u32 | 时间戳 u64(微秒) | [参数 i32]
+  标志第0位表示带参数。版本字节不在 ASCII 范围内，可与文本格式直接区分。
+
+参数的含义由命令决定：翻页/左右为重复次数，放大/缩小为幅度（步数），
+"6"（跳转）为目标页码。参数在订阅端并入命令字符串（"1:10"）后经过滤器和 Qt 信号，
+不带参数的命令与原来完全相同。
+"""
+import json
+import math
+import struct
+from collections import namedtuple
+
+# 解码结果：timestamp 为秒（无则 None），sequence/argument 仅二进制格式提供
+GestureMessage = namedtuple('GestureMessage', 'command timestamp sequence argument')
+
+BINARY_VERSION = 0xA1
+FLAG_HAS_ARGUMENT = 0x01
+_HEADER = struct.Struct('!BBBIQ')
+_ARGUMENT = struct.Struct('!i')
+ARGUMENT_MIN = -2 ** 31
+ARGUMENT_MAX = 2 ** 31 - 1
+
+# 操作码 -> 命令，预先建表，解码时一次下标查找；"6" 为跳转到第 N 页（参数为页码）
+OPCODE_COMMANDS = ("0", "1", "2", "3", "4", "5", "6")
+COMMAND_OPCODES = {command: opcode for opcode, command in enumerate(OPCODE_COMMANDS)}
+
+
+def decode_payload(payload):
+    """解析 MQTT 载荷
+
+    Args:
+        payload: bytes 载荷
+    Returns:
+        GestureMessage，无法解析时返回 None
+    """
+    if payload and payload[0] == BINARY_VERSION:
+        return _decode_binary(payload)
+    try:
+        text = payload.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    if not text.startswith('{'):
+        if ':' not in text:
+            return GestureMessage(text, None, None, None)
+        try:
+            command, argument = split_command(text)
+        except ValueError:
+            return None
+        return GestureMessage(command, None, None, argument)
+    try:
+        message = json.loads(text)
+        command = str(message['cmd'])
+        if command not in COMMAND_OPCODES:
+            # JSON 格式的命令与二进制格式取值相同；参数只能放在 arg 中，"1:x" 之类一律无效
+            return None
+        timestamp = message.get('ts')
+        argument = message.get('arg')
+        if timestamp is not None:
+            timestamp = float(timestamp)
+            if not math.isfinite(timestamp):
+                return None
+        if argument is not None:
+            # int(1e999) 抛 OverflowError，int(nan) 抛 ValueError
+            argument = _check_argument(int(argument))
+        return GestureMessage(command, timestamp, None, argument)
+    except (ValueError, KeyError, TypeError, OverflowError, RecursionError):
+        return None
+
+
+def split_command(command):
+    """把 "1:10" 拆成 ("1", 10)，不带参数时返回 (command, None)；参数不是 i32 整数时抛出 ValueError"""
+    base, separator, argument = command.partition(':')
+    if not separator:
+        return command, None
+    return base, _check_argument(int(argument))
+
+
+def _check_argument(argument):
+    """参数与二进制格式一样限制在 i32 范围内，三种格式解析结果一致"""
+    if not ARGUMENT_MIN <= argument <= ARGUMENT_MAX:
+        raise ValueError(f"参数超出范围: {argument}")
+    return argument
+
+
+def join_command(command, argument):
+    """split_command 的逆操作"""
+    return command if argument is None else f"{command}:{argument}"
+
+
+def _decode_binary(payload):
+    if len(payload) < _HEADER.size:
+        return None
+    _, opcode, flags, sequence, timestamp_us = _HEADER.unpack_from(payload)
+    if opcode >= len(OPCODE_COMMANDS):
+        return None
+    argument = None
+    if flags & FLAG_HAS_ARGUMENT:
+        if len(payload) < _HEADER.size + _ARGUMENT.size:
+            return None
+        argument = _ARGUMENT.unpack_from(payload, _HEADER.size)[0]
+    return GestureMessage(
+        OPCODE_COMMANDS[opcode],
+        timestamp_us / 1e6 if timestamp_us else None,
+        sequence,
+        argument
+    )
+
+
+def encode_text(command, timestamp=None, argument=None):
+    """生成文本载荷，给定 timestamp 时使用 JSON 格式"""
+    if timestamp is None:
+        return join_command(command, argument).encode('utf-8')
+    message = {'cmd': command, 'ts': timestamp}
+    if argument is not None:
+        message['arg'] = argument
+    return json.dumps(message).encode('utf-8')
+
+
+def encode_binary(command, sequence, timestamp=None, argument=None):
+    """生成二进制载荷
+
+    Args:
+        command: 命令字符，如 "1"
+        sequence: 发布端递增的序号（u32，回绕）
+        timestamp: 发布时间 time.time()，None 表示不带时间戳
+        argument: 可选的整数参数
+    """
+    flags = FLAG_HAS_ARGUMENT if argument is not None else 0
+    timestamp_us = int(timestamp * 1e6) if timestamp else 0
+    header = _HEADER.pack(BINARY_VERSION, COMMAND_OPCODES[command], flags,
+                          sequence & 0xFFFFFFFF, timestamp_us)
+    if argument is None:
+        return header
+    return header + _ARGUMENT.pack(argument)
+
+
+class SequenceWindow():
+    """
+    基于位图的滑动窗口去重（类似 IPsec 防重放窗口）。
+
+    记录最近 size 个序号是否已收到：重复的序号、比窗口更旧的序号都会被拒绝，
+    窗口内尚未收到的乱序序号仍然接受。序号按 u32 回绕比较。
+
+    发布端重启后序号从头开始，新序号落后于窗口，需要识别出来并从该序号重新开始：
+    - 带时间戳时，落后的序号若比已收到的所有消息都新，就是重启（重发和乱序的旧消息时间戳不会更新）
+    - 不带时间戳时，落后超过 reset_gap（默认等于窗口大小，即已无法判断是否重复）视为重启
+    """
+
+    def __init__(self, size=64, reset_gap=None):
+        self.size = size
+        self.reset_gap = size if reset_gap is None else reset_gap
+        self.highest = None
+        self.newest_timestamp = None  # 已接受消息中最新的发布时间戳
+        self.bitmap = 0  # 第 i 位表示 highest - i 已收到
+        self.duplicates = 0  # 被拒绝的重复/过旧序号数
+        self.restarts = 0  # 识别出的发布端重启次数
+
+    def accept(self, sequence, timestamp=None):
+        """返回该序号是否为首次收到
+
+        Args:
+            sequence: 消息序号
+            timestamp: 消息的发布时间戳（秒），None 表示不带时间戳
+        """
+        if self.highest is None:
+            self._reset(sequence, timestamp)
+            return True
+        ahead = (sequence - self.highest) & 0xFFFFFFFF
+        if ahead and ahead < 0x80000000:
+            # 更新的序号：窗口前移
+            self.bitmap = ((self.bitmap << ahead) | 1) & ((1 << self.size) - 1) if ahead < self.size else 1
+            self.highest = sequence
+            self._observe(timestamp)
+            return True
+        behind = (self.highest - sequence) & 0xFFFFFFFF
+        if timestamp is not None and self.newest_timestamp is not None:
+            restarted = timestamp > self.newest_timestamp
+        else:
+            restarted = behind >= self.reset_gap
+        if restarted:
+            self.restarts += 1
+            self._reset(sequence, timestamp)
+            return True
+        if behind >= self.size or self.bitmap >> behind & 1:
+            self.duplicates += 1
+            return False
+        self.bitmap |= 1 << behind
+        self._observe(timestamp)
+        return True
+
+    def _reset(self, sequence, timestamp):
+        self.highest = sequence
+        self.bitmap = 1
+        self.newest_timestamp = timestamp
+
+    def _observe(self, timestamp):
+        if timestamp is not None and (self.newest_timestamp is None or timestamp > self.newest_timestamp):
+            self.newest_timestamp = timestamp
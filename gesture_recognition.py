@@ -0,0 +1,437 @@
+"""
+在本机从原始传感器数据识别手势（IMU / 弯曲传感器手套），输出与 gesture_callback 相同的命令 "0"~"5"。
+
+管线：
+- 采样帧（每帧 channels 个数值）写入预分配的 NumPy 环形缓冲区 SampleRing，
+  每帧写两份（i 和 i + capacity），任意时刻最近 capacity 帧都是一段连续内存，取窗口不复制
+- 每 hop 帧对最近 window 帧计算窗口特征（window_features，全部按通道向量化）：
+      均值 | 标准差 | 峰值（最大值 - 均值） | 谷值（均值 - 最小值） | 峰谷次序（谷的位置 - 峰的位置）/ 窗口长度
+- 分类器把特征映射为命令：
+      ThresholdClassifier  阈值规则：取峰、谷都超过阈值且幅度最大的通道，按峰谷先后判断方向
+      TemplateClassifier   模板匹配：标准化后的最近类中心，可用录制数据 fit，含"静止"类，
+                           离所有类中心都远的窗口（手势只进入了一部分）不输出
+- 同一手势会落在连续多个窗口中，检测到一次后 refractory 帧内不再输出
+
+离线（录制文件回放）时 push_many 用 sliding_window_view 一次取出整段数据的全部窗口，
+特征和分类都是整批矩阵运算，不逐帧循环。准确率和吞吐用 python benchmark.py recognition 测量。
+
+录制文件为 CSV：第一行是列名，各通道一列，可选的 label 列在手势持续期间的每一帧上
+填写命令（"0"~"5"），其余帧留空。
+"""
+import csv
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from gesture_protocol import OPCODE_COMMANDS
+
+# 默认通道：三轴加速度（m/s²）+ 三轴角速度（rad/s）
+CHANNELS = ('ax', 'ay', 'az', 'gx', 'gy', 'gz')
+# 每个通道的特征个数，见 window_features
+FEATURES_PER_CHANNEL = 5
+
+# 默认阈值规则：{命令: (通道序号, 方向)}，方向 +1 表示先出现峰、后出现谷
+# 上下翻页为绕 y 轴挥动，放大缩小为绕 z 轴转腕，左右为绕 x 轴挥动
+DEFAULT_RULES = {
+    "0": (4, 1), "1": (4, -1),
+    "2": (5, 1), "3": (5, -1),
+    "4": (3, -1), "5": (3, 1),
+}
+# 各通道的触发阈值（峰、谷都须超过），加速度通道不参与判断
+DEFAULT_THRESHOLDS = (np.inf, np.inf, np.inf, 1.0, 1.0, 1.0)
+
+NO_GESTURE = -1  # 分类结果中"没有手势"的编号
+
+
+def window_features(windows):
+    """计算窗口特征
+
+    Args:
+        windows: 形状 (..., 帧数, 通道数) 的数组，可以是一个窗口或一批窗口
+
+    Returns:
+        形状 (..., 通道数 * FEATURES_PER_CHANNEL) 的 float32 数组，按特征分段排列
+    """
+    windows = np.asarray(windows, dtype=np.float32)
+    length = windows.shape[-2]
+    mean = windows.mean(axis=-2)
+    std = windows.std(axis=-2)
+    peak = windows.max(axis=-2) - mean
+    trough = mean - windows.min(axis=-2)
+    order = (windows.argmin(axis=-2) - windows.argmax(axis=-2)).astype(np.float32) / length
+    return np.concatenate((mean, std, peak, trough, order), axis=-1)
+
+
+class SampleRing():
+    """
+    预分配的采样环形缓冲区。
+
+    构造函数参数：
+    capacity: 保留的帧数（即窗口长度）
+    channels: 通道数
+    dtype: 数据类型，默认 float32
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float32):
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((2 * capacity, channels), dtype=dtype)
+        self._position = 0  # 下一帧写入位置，范围 [0, capacity)
+        self.count = 0  # 累计写入的帧数
+
+    def append(self, frame):
+        """写入一帧"""
+        position = self._position
+        self._data[position] = frame
+        self._data[position + self.capacity] = frame
+        self._position = position + 1 if position + 1 < self.capacity else 0
+        self.count += 1
+
+    def extend(self, frames):
+        """写入多帧（形状 (帧数, 通道数)）"""
+        capacity = self.capacity
+        total = len(frames)
+        if total >= capacity:
+            frames = frames[-capacity:]
+        position = (self._position + total - len(frames)) % capacity
+        head = min(len(frames), capacity - position)
+        self._data[position:position + head] = frames[:head]
+        self._data[position + capacity:position + capacity + head] = frames[:head]
+        rest = len(frames) - head
+        if rest:
+            self._data[:rest] = frames[head:]
+            self._data[capacity:capacity + rest] = frames[head:]
+        self._position = (position + len(frames)) % capacity
+        self.count += total
+
+    def latest(self, length=None):
+        """最近 length 帧（从旧到新，连续内存的视图，不复制）；写入不足时只返回已有的帧"""
+        length = min(self.capacity if length is None else length, self.count, self.capacity)
+        end = self._position + self.capacity
+        return self._data[end - length:end]
+
+
+class ThresholdClassifier():
+    """
+    阈值规则分类器，不需要训练数据。
+
+    各通道的幅度取 min(峰值, 谷值) / 阈值（一次完整的来回挥动峰、谷都明显），
+    幅度最大且不小于 1 的通道决定手势，峰谷次序决定方向。
+
+    构造函数参数：
+    rules: {命令: (通道序号, 方向)}，默认 DEFAULT_RULES
+    thresholds: 各通道阈值（标量或序列），默认 DEFAULT_THRESHOLDS
+    channels: 通道数，默认 len(CHANNELS)
+    """
+
+    def __init__(self, rules=None, thresholds=DEFAULT_THRESHOLDS, channels=len(CHANNELS)):
+        self.channels = channels
+        self.thresholds = np.broadcast_to(np.asarray(thresholds, dtype=np.float32), (channels,)).copy()
+        # (通道, 方向) -> 命令编号，方向下标 0 为 -1、1 为 +1
+        self._table = np.full((channels, 2), NO_GESTURE, dtype=np.int8)
+        for command, (channel, direction) in (rules or DEFAULT_RULES).items():
+            self._table[channel, 1 if direction > 0 else 0] = OPCODE_COMMANDS.index(command)
+
+    def classify_many(self, features):
+        """特征 (窗口数, 特征数) -> 命令编号 (窗口数,)，NO_GESTURE 表示没有手势"""
+        channels = self.channels
+        peak = features[:, 2 * channels:3 * channels]
+        trough = features[:, 3 * channels:4 * channels]
+        order = features[:, 4 * channels:5 * channels]
+        strength = np.minimum(peak, trough) / self.thresholds
+        dominant = strength.argmax(axis=1)
+        rows = np.arange(len(features))
+        codes = self._table[dominant, (order[rows, dominant] > 0).astype(np.intp)]
+        codes[strength[rows, dominant] < 1.0] = NO_GESTURE
+        return codes
+
+
+class TemplateClassifier():
+    """
+    模板（最近类中心）分类器。
+
+    特征按 scale 标准化后取欧氏距离最近的类中心；训练数据中的静止窗口单独成为一类
+    （编号 NO_GESTURE），因此不需要额外的运动门限。
+
+    构造函数参数：
+    centroids: 类中心 (类数, 特征数)，已标准化
+    codes: 各类中心对应的命令编号（NO_GESTURE 为静止）
+    scale: 各特征的标准化系数 (特征数,)
+    max_distance: 与最近类中心的距离超过该值时视为没有手势，None 表示不限制
+    """
+
+    def __init__(self, centroids, codes, scale, max_distance=None):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.max_distance = max_distance
+
+    @classmethod
+    def fit(cls, features, codes, max_distance='auto'):
+        """由带标签的窗口特征计算各类中心
+
+        手势刚进入或即将离开窗口时的特征离所有类中心都很远，靠 max_distance 拒绝，
+        否则会被判为某个手势并在 refractory 内挡住随后正确的检测。
+
+        Args:
+            features: (窗口数, 特征数)
+            codes: 各窗口的命令编号，NO_GESTURE 为静止窗口
+            max_distance: 见构造函数；'auto' 取训练窗口到自身类中心距离的 99 百分位的 1.25 倍
+        """
+        features = np.asarray(features, dtype=np.float32)
+        codes = np.asarray(codes)
+        scale = features.std(axis=0)
+        scale[scale < 1e-6] = 1.0
+        classes = np.unique(codes)
+        centroids = np.stack([features[codes == code].mean(axis=0) for code in classes]) / scale
+        if max_distance == 'auto':
+            own = centroids[np.searchsorted(classes, codes)]
+            distances = np.sqrt(((features / scale - own) ** 2).sum(axis=1))
+            max_distance = 1.25 * float(np.percentile(distances, 99))
+        return cls(centroids, classes, scale, max_distance)
+
+    @classmethod
+    def from_recording(cls, samples, labels, window=50, hop=5, max_distance='auto'):
+        """用录制数据训练：按 window_labels 给每个窗口打标签，只含手势一部分的窗口不参与"""
+        ends = np.arange(window, len(samples) + 1, hop)
+        windows = sliding_window_view(np.asarray(samples, dtype=np.float32), window, axis=0)[ends - window]
+        features = window_features(windows.transpose(0, 2, 1))
+        codes = window_labels(labels, ends, window)
+        keep = [index for index, code in enumerate(codes) if code is not None]
+        return cls.fit(features[keep], [codes[index] for index in keep], max_distance)
+
+    def classify_many(self, features):
+        """特征 (窗口数, 特征数) -> 命令编号 (窗口数,)"""
+        scaled = features / self.scale
+        distances = ((scaled[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        nearest = distances.argmin(axis=1)
+        codes = self.codes[nearest]
+        if self.max_distance is not None:
+            codes[distances[np.arange(len(features)), nearest] > self.max_distance ** 2] = NO_GESTURE
+        return codes
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, codes=self.codes, scale=self.scale,
+                 max_distance=np.nan if self.max_distance is None else self.max_distance)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            max_distance = float(data['max_distance'])
+            return cls(data['centroids'], data['codes'], data['scale'],
+                       None if np.isnan(max_distance) else max_distance)
+
+
+class GestureRecognizer():
+    """
+    流式手势识别器。
+
+    构造函数参数：
+    classifier: 分类器（ThresholdClassifier 或 TemplateClassifier）
+    window: 窗口长度（帧）
+    hop: 每隔多少帧分类一次
+    channels: 通道数
+    refractory: 检测到手势后多少帧内不再输出，默认等于窗口长度
+
+    使用示例：
+        recognizer = GestureRecognizer(ThresholdClassifier(), window=50, hop=5)
+        command = recognizer.push(frame)           # 实时：逐帧，返回命令或 None
+        detections = recognizer.push_many(frames)  # 离线：整段，返回 [(帧序号, 命令)]
+    """
+
+    def __init__(self, classifier, window=50, hop=5, channels=len(CHANNELS), refractory=None):
+        self.classifier = classifier
+        self.window = window
+        self.hop = hop
+        self.channels = channels
+        self.refractory = window if refractory is None else refractory
+        self.ring = SampleRing(window, channels)
+        self._quiet_until = 0  # 在该帧序号之前不输出
+        self.windows = 0  # 已分类的窗口数
+
+    def reset(self):
+        """清空缓冲区（如传感器重新连接）"""
+        self.ring = SampleRing(self.window, self.channels)
+        self._quiet_until = 0
+
+    def push(self, frame):
+        """写入一帧，产生手势时返回命令，否则返回 None"""
+        ring = self.ring
+        ring.append(frame)
+        count = ring.count
+        if count % self.hop or count < self.window or count < self._quiet_until:
+            return None
+        self.windows += 1
+        code = self.classifier.classify_many(window_features(ring.latest())[None, :])[0]
+        if code == NO_GESTURE:
+            return None
+        self._quiet_until = count + self.refractory
+        return OPCODE_COMMANDS[code]
+
+    def push_many(self, frames, chunk=8192):
+        """写入多帧（形状 (帧数, 通道数)），返回 [(窗口结束处的帧序号, 命令)]
+
+        每 chunk 帧为一批：取出批内全部待分类窗口，一次计算特征并分类。
+        """
+        frames = np.asarray(frames, dtype=np.float32)
+        detections = []
+        for begin in range(0, len(frames), chunk):
+            detections.extend(self._push_chunk(frames[begin:begin + chunk]))
+        return detections
+
+    def _push_chunk(self, frames):
+        ring = self.ring
+        window, hop = self.window, self.hop
+        history = ring.latest(window - 1)
+        first = ring.count - len(history)  # data[0] 的帧序号
+        data = np.concatenate((history, frames)) if len(history) else frames
+        # 待分类窗口的结束位置（不含）：本批新写入、hop 的整数倍、前面已有完整窗口
+        lowest = max(ring.count + 1, window)
+        ends = np.arange(-(-lowest // hop) * hop, ring.count + len(frames) + 1, hop)
+        ring.extend(frames)
+        if not len(ends):
+            return []
+        views = sliding_window_view(data, window, axis=0)  # (起点数, 通道数, 窗口长度)，不复制
+        windows = views[ends - window - first].transpose(0, 2, 1)
+        self.windows += len(ends)
+        codes = self.classifier.classify_many(window_features(windows))
+        detections = []
+        for index in np.flatnonzero(codes != NO_GESTURE):
+            end = int(ends[index])
+            if end < self._quiet_until:
+                continue
+            self._quiet_until = end + self.refractory
+            detections.append((end, OPCODE_COMMANDS[codes[index]]))
+        return detections
+
+
+def load_recording(path, channels=CHANNELS):
+    """读取录制文件
+
+    Returns:
+        (samples, labels)：samples 为 (帧数, 通道数) 的 float32 数组；
+        labels 为各帧的命令编号，没有 label 列或未标注的帧为 NO_GESTURE
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [header.index(name) for name in channels]
+        label_column = header.index('label') if 'label' in header else None
+        rows = list(reader)
+    samples = np.array([[row[column] for column in columns] for row in rows], dtype=np.float32)
+    labels = np.full(len(rows), NO_GESTURE, dtype=np.int8)
+    if label_column is not None:
+        for index, row in enumerate(rows):
+            if len(row) > label_column and row[label_column]:
+                labels[index] = OPCODE_COMMANDS.index(row[label_column])
+    return samples, labels
+
+
+def save_recording(path, samples, labels=None, channels=CHANNELS):
+    """写入录制文件（格式见模块说明）"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(channels) + (['label'] if labels is not None else []))
+        for index, frame in enumerate(samples):
+            row = [f"{value:.5g}" for value in frame]
+            if labels is not None:
+                row.append(OPCODE_COMMANDS[labels[index]] if labels[index] != NO_GESTURE else '')
+            writer.writerow(row)
+
+
+def label_events(labels):
+    """把逐帧标签转为手势事件 [(开始帧, 结束帧(不含), 命令编号)]"""
+    labels = np.asarray(labels)
+    changes = np.flatnonzero(np.diff(labels, prepend=NO_GESTURE, append=NO_GESTURE))
+    events = []
+    for start, end in zip(changes[:-1], changes[1:]):
+        if labels[start] != NO_GESTURE:
+            events.append((int(start), int(end), int(labels[start])))
+    return events
+
+
+def window_labels(labels, ends, window):
+    """训练用的窗口标签：完整包含一个手势的窗口为该手势，不含任何手势帧的为 NO_GESTURE，
+    只含手势一部分的窗口为 None（不参与训练）"""
+    result = []
+    events = label_events(labels)
+    for end in ends:
+        start = end - window
+        overlapping = [event for event in events if event[0] < end and event[1] > start]
+        if not overlapping:
+            result.append(NO_GESTURE)
+        elif len(overlapping) == 1 and overlapping[0][0] >= start and overlapping[0][1] <= end:
+            result.append(overlapping[0][2])
+        else:
+            result.append(None)
+    return result
+
+
+def evaluate(detections, labels, tolerance=50):
+    """按录制文件的标注评估识别结果
+
+    每个手势事件取 [开始帧, 结束帧 + tolerance) 内的第一个检测：命令相同为正确，否则为误判；
+    没有检测为漏检；不属于任何事件的检测为误报。
+
+    Args:
+        detections: push_many 的结果
+        labels: 逐帧标签
+        tolerance: 手势结束后允许的检测延迟（帧）
+    """
+    events = label_events(labels)
+    used = set()
+    correct = wrong = missed = 0
+    delays = []
+    for start, end, code in events:
+        match = next((index for index, (at, _) in enumerate(detections)
+                      if index not in used and start < at < end + tolerance), None)
+        if match is None:
+            missed += 1
+            continue
+        used.add(match)
+        at, command = detections[match]
+        if command == OPCODE_COMMANDS[code]:
+            correct += 1
+            delays.append(at - end)
+        else:
+            wrong += 1
+    return {
+        'events': len(events),
+        'correct': correct,
+        'wrong': wrong,
+        'missed': missed,
+        'false_positive': len(detections) - len(used),
+        'accuracy': correct / len(events) if events else None,
+        'mean_delay_frames': float(np.mean(delays)) if delays else None,
+    }
+
+
+def synthetic_recording(gestures=100, rate=100, noise=0.05, seed=0):
+    """生成模拟的 IMU 录制数据，用于没有硬件时的离线基准
+
+    每个手势是按 DEFAULT_RULES 在对应角速度通道上的一次完整来回（正弦一个周期），
+    持续约 0.3 秒，幅度随机，并在另一角速度通道上有少量串扰；手势之间随机静止 0.4~1.0 秒。
+
+    Returns:
+        (samples, labels)，同 load_recording
+    """
+    rng = np.random.default_rng(seed)
+    commands = rng.integers(0, 6, gestures)
+    pieces, labels = [], []
+    for code in commands:
+        rest = int(rate * rng.uniform(0.4, 1.0))
+        pieces.append(np.zeros((rest, len(CHANNELS)), dtype=np.float32))
+        labels.append(np.full(rest, NO_GESTURE, dtype=np.int8))
+        length = int(rate * rng.uniform(0.25, 0.35))
+        channel, direction = DEFAULT_RULES[OPCODE_COMMANDS[code]]
+        wave = np.sin(np.linspace(0, 2 * np.pi, length, dtype=np.float32)) * rng.uniform(2.0, 4.0) * direction
+        motion = np.zeros((length, len(CHANNELS)), dtype=np.float32)
+        motion[:, channel] = wave
+        motion[:, 3 + (channel - 3 + 1) % 3] = 0.2 * wave[::-1]
+        motion[:, :3] = 0.5 * wave[:, None] * rng.uniform(-1, 1, 3)  # 挥动时加速度计的变化
+        pieces.append(motion)
+        labels.append(np.full(length, code, dtype=np.int8))
+    samples = np.concatenate(pieces)
+    samples += rng.normal(0, noise, samples.shape).astype(np.float32)
+    samples[:, 2] += 9.81  # 重力
+    return samples, np.concatenate(labels)
@@ -0,0 +1,299 @@
+"""
+手势轨迹记录与回放。
+
+记录：每条命令追加一行到轨迹文件（制表符分隔，便于直接查看）：
+    相对时间(秒)  命令  焦点(1/0/-)  处理结果  迟到(ms或-)  序号(或-)  焦点进程(或-)  动作(或-)
+一条手势最多有两行：
+- 网络线程收到时（record），处理结果为 passed / suppressed / pending / rate_limited / stale /
+  duplicate / invalid / unrouted / device_dropped（多设备路由）/ gated（焦点不在目标程序）
+- 放行的命令到达 Client_UI.gesture_callback 后（record_dispatch），记录实际采取的动作，处理结果为
+  queued（进入执行队列）/ coalesced（并入队尾的相同动作）/ cancelled（与相反动作抵消）/
+  overflow（入队并挤掉最早一条）/ dropped（队列满被丢弃）/ unmapped（当前配置中没有该手势）/
+  missing_argument（绝对动作如跳转没有带参数）
+焦点进程为收到时焦点所在的已配置程序（如 POWERPNT.EXE），回放时按它切换手势配置。
+record() 只把一个元组放进内存队列，写文件在后台线程中批量进行，不阻塞网络线程。
+默认关闭：RECORDER 为 None 时 on_message 只多一次 None 判断。
+v1 轨迹（没有最后两列）仍可读取和回放，焦点进程按 POWERPNT.EXE 处理。
+
+回放：按原始间隔（或 N 倍速、最快速度）把轨迹重新发布到进程内的完整管线
+（代理替身 + Mqtt_Subscriber + Client_UI 分发 + 记录型输入后端），输出 JSON 结果：
+    python gesture_trace.py replay presenter.trace --speed 1
+    python gesture_trace.py replay presenter.trace --speed 10
+    python gesture_trace.py replay presenter.trace --speed max
+    python gesture_trace.py replay presenter.trace --profiles profiles.json   # 记录时用了自定义手势配置
+    python gesture_trace.py summary presenter.trace
+"""
+import argparse
+import collections
+import json
+import threading
+import time
+from collections import deque, namedtuple
+
+FORMAT_HEADER = "# gesture-trace v2"
+
+TraceRecord = namedtuple('TraceRecord', 'offset command focus outcome lateness_ms sequence process action')
+
+# gesture_callback 记录的处理结果，其余为网络线程的记录
+DISPATCH_OUTCOMES = frozenset({'queued', 'coalesced', 'cancelled', 'overflow', 'dropped', 'unmapped',
+                               'missing_argument'})
+# v1 轨迹没有焦点进程
+DEFAULT_PROCESS = "POWERPNT.EXE"
+
+RECORDER = None  # 全局记录器，None 表示未启用
+
+
+class TraceRecorder():
+    """
+    追加写入的手势轨迹记录器。
+
+    构造函数参数：
+    path: 轨迹文件路径，已存在时追加（每次启动写一行新的文件头）
+    flush_interval: 后台线程写文件的间隔（秒）
+    focus_provider: 返回焦点所在的已配置程序进程名（不在任何已配置程序中时返回 None）的可调用对象，
+                    focus_provider 为 None 时焦点和进程都记为 '-'
+    """
+
+    def __init__(self, path, flush_interval=1.0, focus_provider=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.focus_provider = focus_provider
+        self.started = time.monotonic()
+        self.recorded = 0
+        self._buffer = deque()
+        self._stop_event = threading.Event()
+        self._file = open(path, 'a', encoding='utf-8', buffering=64 * 1024)
+        self._file.write(f"{FORMAT_HEADER} start={time.time():.6f}\n")
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def record(self, command, outcome, lateness=None, sequence=None):
+        """记录一条命令（在网络线程中调用，只入队不写文件）
+
+        Args:
+            command: 命令字符，无法解析的载荷为 None
+            outcome: 处理结果
+            lateness: 相对发布时间戳的迟到（秒），无时间戳为 None
+            sequence: 二进制格式的序号
+        """
+        self._append(command, outcome, lateness, sequence, None)
+
+    def record_dispatch(self, command, outcome, action=None):
+        """记录放行的命令在 gesture_callback 中的去向（在界面线程中调用）
+
+        Args:
+            command: 命令字符串（可带参数，如 "1:10"）
+            outcome: 见 DISPATCH_OUTCOMES
+            action: 分发到的动作名，unmapped 时为 None
+        """
+        self._append(command, outcome, None, None, action)
+
+    def _append(self, command, outcome, lateness, sequence, action):
+        focus_provider = self.focus_provider
+        process = None if focus_provider is None else focus_provider()
+        focus = None if focus_provider is None else process is not None
+        self._buffer.append((time.monotonic() - self.started, command, focus, outcome, lateness, sequence,
+                             process, action))
+        self.recorded += 1
+
+    def _write_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        buffer = self._buffer
+        if not buffer:
+            return
+        lines = []
+        while buffer:
+            offset, command, focus, outcome, lateness, sequence, process, action = buffer.popleft()
+            lines.append(
+                f"{offset:.6f}\t{command or '?'}\t{'-' if focus is None else int(focus)}\t{outcome}\t"
+                f"{'-' if lateness is None else f'{lateness * 1000:.1f}'}\t{'-' if sequence is None else sequence}\t"
+                f"{process or '-'}\t{action or '-'}\n"
+            )
+        self._file.write(''.join(lines))
+        self._file.flush()
+
+    def close(self):
+        """写完剩余记录并关闭文件"""
+        self._stop_event.set()
+        self._writer.join(timeout=5)
+        self._file.close()
+
+
+def enable(path, flush_interval=1.0, focus_provider=None):
+    """启用轨迹记录"""
+    global RECORDER
+    if RECORDER is None:
+        RECORDER = TraceRecorder(path, flush_interval, focus_provider)
+    return RECORDER
+
+
+def disable():
+    """停止轨迹记录"""
+    global RECORDER
+    if RECORDER is not None:
+        RECORDER.close()
+        RECORDER = None
+
+
+def read_trace(path):
+    """读取轨迹文件；文件中有多次启动时，各段按顺序拼接，时间接续前一段"""
+    records = []
+    base = 0.0
+    last = 0.0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('#'):
+                base = last
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) == 6:
+                fields += ['-', '-']  # v1
+            if len(fields) != 8:
+                continue
+            offset, command, focus, outcome, lateness, sequence, process, action = fields
+            last = base + float(offset)
+            records.append(TraceRecord(
+                last,
+                None if command == '?' else command,
+                None if focus == '-' else focus == '1',
+                outcome,
+                None if lateness == '-' else float(lateness),
+                None if sequence == '-' else int(sequence),
+                None if process == '-' else process,
+                None if action == '-' else action,
+            ))
+    return records
+
+
+def summarize(records):
+    """按处理结果、命令和执行的动作统计轨迹"""
+    received = [record for record in records if record.outcome not in DISPATCH_OUTCOMES]
+    dispatched = [record for record in records if record.outcome in DISPATCH_OUTCOMES]
+    return {
+        'records': len(received),
+        'duration_s': round(records[-1].offset - records[0].offset, 3) if records else 0.0,
+        'outcomes': dict(collections.Counter(record.outcome for record in received)),
+        'commands': dict(collections.Counter(record.command for record in received)),
+        'unfocused': sum(1 for record in received if record.focus is False),
+        'processes': dict(collections.Counter(record.process for record in received if record.process)),
+        'dispatch': dict(collections.Counter(record.outcome for record in dispatched)),
+        'actions': dict(collections.Counter(record.action for record in dispatched if record.action)),
+    }
+
+
+def replay_schedule(records, speed, pipeline):
+    """把轨迹转换为 e2e_harness.publish_schedule 使用的发布计划
+
+    载荷尽量还原原始消息：有序号的用二进制格式并沿用原序号（重现去重），
+    有迟到时间的把时间戳回拨同样的量（重现过期丢弃），其余用旧文本格式。
+    焦点或焦点进程变化时，先等之前发出的命令都到达 gesture_callback，再切换到记录的进程的分发表，
+    这样高倍速回放时每条命令仍按记录时的焦点和手势配置处理。
+    gesture_callback 的记录（DISPATCH_OUTCOMES）不是消息，不发布。
+
+    Args:
+        records: read_trace 的结果
+        speed: 倍速，None 表示不等待、以最快速度发送
+        pipeline: 回放用的 e2e_harness.GesturePipeline
+    """
+    from gesture_protocol import COMMAND_OPCODES, encode_binary, encode_text, split_command
+
+    ui = pipeline.ui
+    schedule = []
+    records = [record for record in records if record.outcome not in DISPATCH_OUTCOMES]
+    origin = records[0].offset if records else 0.0
+    focused_process = [None]  # 最近一次切换到的进程，第一条带焦点的记录总会切换一次
+    for index, record in enumerate(records):
+        offset = 0.0 if speed is None else (record.offset - origin) / speed
+
+        def make_payload(record=record, index=index):
+            process = (record.process or DEFAULT_PROCESS) if record.focus else None
+            if record.focus is not None and process != focused_process[0]:
+                deadline = time.monotonic() + 2
+                while not pipeline.settled(index) and time.monotonic() < deadline:
+                    time.sleep(0.001)
+                ui.switch_profile(process)
+                focused_process[0] = process
+                pipeline.subscriber.set_target_focus(record.focus)
+            try:
+                command, argument = split_command(record.command or '')
+            except ValueError:
+                command, argument = None, None
+            if command not in COMMAND_OPCODES:
+                return (record.command or '').encode('utf-8') or b'\xff'
+            lateness = (record.lateness_ms or 0.0) / 1000
+            if record.sequence is not None:
+                return encode_binary(command, record.sequence, time.time() - lateness, argument)
+            if record.lateness_ms is not None:
+                return encode_text(command, time.time() - lateness, argument)
+            return encode_text(command, argument=argument)
+
+        schedule.append((offset, make_payload))
+    return schedule
+
+
+def replay(path, speed=1.0, command_filter=None, max_command_age=1.0, qos=1, profiles=None):
+    """回放轨迹文件，返回原始轨迹统计和回放结果
+
+    Args:
+        path: 轨迹文件
+        speed: 倍速，None 表示最快速度
+        command_filter: 回放时的过滤参数，默认与程序相同（0.5 秒去抖）
+        max_command_age: 过期阈值（秒）
+        qos: 发布 QoS
+        profiles: 记录时使用的手势配置（gesture_profiles.ProfileSet），None 时使用默认配置
+    """
+    import logging
+    from e2e_harness import GesturePipeline, drive, git_revision
+
+    records = read_trace(path)
+    logging.getLogger().setLevel(logging.WARNING)
+    pipeline = GesturePipeline(command_filter=command_filter if command_filter is not None else {'debounce': 0.5},
+                               max_command_age=max_command_age, profiles=profiles).start()
+    try:
+        result = {
+            'revision': git_revision(),
+            'trace': path,
+            'speed': 'max' if speed is None else speed,
+            'recorded': summarize(records),
+        }
+        result.update(drive(pipeline, replay_schedule(records, speed, pipeline), qos))
+        return result
+    finally:
+        pipeline.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="手势轨迹回放工具")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = subparsers.add_parser('replay', help="回放轨迹到进程内管线")
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--speed', default='1', help="倍速，如 1、10，或 max 表示最快速度")
+    replay_parser.add_argument('--debounce', type=float, default=0.5, help="去抖窗口（秒）")
+    replay_parser.add_argument('--max-age', type=float, default=1.0, help="过期阈值（秒）")
+    replay_parser.add_argument('--repeat', type=int, default=1, help="重复回放次数（压力测试）")
+    replay_parser.add_argument('--profiles', metavar='PATH', help="记录时使用的手势配置（JSON），见 gesture_profiles.py")
+
+    summary_parser = subparsers.add_parser('summary', help="统计轨迹内容")
+    summary_parser.add_argument('path')
+
+    args = parser.parse_args()
+    if args.command == 'summary':
+        print(json.dumps(summarize(read_trace(args.path)), ensure_ascii=False))
+        return
+    speed = None if args.speed == 'max' else float(args.speed)
+    profiles = None
+    if args.profiles:
+        import gesture_profiles
+        profiles = gesture_profiles.load_profiles(args.profiles)
+    for _ in range(args.repeat):
+        print(json.dumps(replay(args.path, speed, {'debounce': args.debounce}, args.max_age, profiles=profiles),
+                         ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
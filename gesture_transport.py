@@ -0,0 +1,306 @@
+"""
+手势传输方式的公共部分。
+
+各传输方式（MQTT、串口……）只负责收到一条载荷，之后的处理完全相同，在 Gesture_Subscriber 中：
+    焦点门控 -> 解码 -> 序号去重 -> 过期检查 -> 多设备路由 -> 命令过滤 -> signal(命令, trace)
+界面只连接 signal 和 state_changed，换用传输方式不需要修改分发路径。
+
+- mqtt:    Subscriber.Mqtt_Subscriber，经本机或局域网上的 MQTT 代理（原有方式）
+- serial:  serial_transport.Serial_Subscriber，手势设备直接接在串口/USB 上，不需要代理
+- udp:     lan_transport.Udp_Subscriber，同一局域网内设备直接发 UDP 数据报
+- zmq:     lan_transport.Zmq_Subscriber，同一局域网内经 ZeroMQ PUSH/PULL 或 PUB/SUB 直连
+
+用 create_subscriber(name, **options) 按名称创建，模块在创建时才导入
+（MQTT 依赖 paho，串口依赖 pyserial，ZeroMQ 依赖 pyzmq）。
+除 MQTT 外的传输方式都基于 Threaded_Subscriber：一个接收线程，断开后按相同的退避策略重新打开。
+"""
+import importlib
+import logging
+import random
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+from command_filter import CommandFilter
+from gesture_protocol import SequenceWindow, decode_payload, join_command
+import latency_metrics
+import gesture_trace
+
+# 连接状态
+STATE_IDLE = "idle"
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_RETRYING = "retrying"
+STATE_FAILED = "failed"
+
+# 传输方式名称 -> (模块, 类名)
+TRANSPORTS = {
+    'mqtt': ('Subscriber', 'Mqtt_Subscriber'),
+    'serial': ('serial_transport', 'Serial_Subscriber'),
+    'udp': ('lan_transport', 'Udp_Subscriber'),
+    'zmq': ('lan_transport', 'Zmq_Subscriber'),
+}
+
+
+class Gesture_Subscriber(QObject):
+    """
+    手势接收端基类。
+
+    子类在自己的线程中收到载荷后调用 handle_payload（或已解码时调用 handle_message），
+    并通过 _set_state 报告连接状态；start() 和 stop() 由子类实现。
+    （不使用 disconnect 这个名字：PySide6 中 Python 子类继承来的同名方法会被 QObject.disconnect 遮住）
+
+    构造函数参数：
+    command_filter: 传入 CommandFilter 的关键字参数（debounce、windows、edge、rate、burst），
+                    默认按 action_interval 对每个命令去抖
+    max_command_age: 带发布时间戳的命令超过该时长（秒）即视为过期并丢弃，None 表示不检查
+    connect_timeout: 首次连接的总超时（秒），超时后状态变为 failed
+    retry_interval: 重连退避的初始间隔（秒），每次失败翻倍
+    max_retry_interval: 重连退避的最大间隔（秒）
+    logger_name: 日志名称
+    """
+    signal = Signal(str, object)  # (命令, trace)，trace 仅在启用 latency_metrics 时非 None
+    state_changed = Signal(str)  # 连接状态变化
+    display_name = "手势设备"  # 界面上显示的连接对象
+
+    def __init__(self, command_filter=None, max_command_age=1.0, connect_timeout=10, retry_interval=0.5,
+                 max_retry_interval=30, logger_name="GestureTransport"):
+        super().__init__()
+        self.logger = logging.getLogger(logger_name)
+        self.connect_timeout = connect_timeout
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.state = STATE_IDLE
+        self.router = None  # device_routing.DeviceRouter，只有 MQTT 按主题路由
+
+        # 防止过快连操作：在接收线程中过滤，抑制的命令不会产生跨线程信号
+        self.action_interval = 0.5  # 最小操作问隔(秒)
+        filter_options = {'debounce': self.action_interval}
+        filter_options.update(command_filter or {})
+        self.command_filter = CommandFilter(self.signal.emit, **filter_options)
+
+        # 过期命令：断线重连后重发的积压手势不再执行
+        self.max_command_age = max_command_age
+        self.stale_dropped = 0  # 因过期被丢弃的命令数
+        self.invalid_dropped = 0  # 无法解析的载荷数
+        # 二进制格式带序号：重发和乱序重发的重复消息在这里丢弃
+        self.sequence_window = SequenceWindow()
+
+        # 焦点门控：由界面线程通过 set_target_focus 更新，接收线程只读；None 表示未知，不门控
+        self.target_focused = None
+        self.gated = 0  # 焦点不在目标程序而直接丢弃的消息数
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.logger.info(f"连接状态: {state}")
+            self.state_changed.emit(state)
+
+    def _retry_delay(self, attempt):
+        """带抖动的指数退避：取 [delay/2, delay] 内的随机值，避免多个客户端同时重连"""
+        delay = min(self.max_retry_interval, self.retry_interval * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def endpoint(self):
+        """连接对象的描述，用于界面和日志"""
+        return self.display_name
+
+    def set_target_focus(self, focused):
+        """更新焦点是否在目标程序中（在界面线程中调用）
+
+        离焦期间收到的手势在 handle_payload 开头直接丢弃，不解码、不发跨线程信号。
+        """
+        if focused == self.target_focused:
+            return
+        self.target_focused = focused
+        self._focus_changed(focused)
+
+    def _focus_changed(self, focused):
+        """焦点变化后的额外处理，子类按需覆盖（如 MQTT 暂停订阅）"""
+
+    def handle_payload(self, payload, route=None):
+        """处理收到的一条载荷（在接收线程中调用）
+
+        Args:
+            payload: 载荷字节，格式见 gesture_protocol
+            route: 多设备路由结果，没有路由时为 None
+        """
+        recorder = gesture_trace.RECORDER
+        if self.target_focused is False:
+            self.gated += 1
+            if recorder is not None:
+                message = decode_payload(payload)
+                recorder.record(message.command if message else None, 'gated')
+            return
+        trace = latency_metrics.new_trace()
+        message = decode_payload(payload)
+        if message is None:
+            self.invalid_dropped += 1
+            if recorder is not None:
+                recorder.record(None, 'invalid')
+            return
+        try:
+            self.handle_message(message, route, trace)
+        except Exception as e:
+            # 单条消息处理失败只丢弃这条，不能让异常进入网络线程导致断线重连或消息反复重发
+            self.invalid_dropped += 1
+            self.logger.error(f"处理命令失败，已丢弃: {message.command}: {e}")
+            if recorder is not None:
+                recorder.record(message.command, 'invalid')
+
+    def handle_message(self, message, route=None, trace=None):
+        """处理已解码的消息：去重、过期检查、路由、过滤，放行的命令经 signal 发给界面线程"""
+        recorder = gesture_trace.RECORDER
+        command, timestamp, sequence, argument = message
+        lateness = None if timestamp is None else time.time() - timestamp
+        # 每个设备的序号各自独立，多设备时按设备去重
+        sequence_window = route.sequence_window if route is not None else self.sequence_window
+        if sequence is not None and not sequence_window.accept(sequence, timestamp):
+            if recorder is not None:
+                recorder.record(command, 'duplicate', lateness, sequence)
+            return
+        if lateness is not None and self.max_command_age is not None:
+            if lateness > self.max_command_age:
+                self.stale_dropped += 1
+                self.logger.warning(f"丢弃过期命令: {command}，迟到 {lateness * 1000:.0f}ms")
+                if recorder is not None:
+                    recorder.record(command, 'stale', lateness, sequence)
+                return
+        if route is not None:
+            command = self.router.admit(route, command)
+            if command is None:
+                if recorder is not None:
+                    recorder.record(message.command, 'device_dropped', lateness, sequence)
+                return
+        if argument is not None:
+            # 参数并入命令字符串（"1:10"），经过滤器和信号原样交给界面线程
+            command = join_command(command, argument)
+        if trace is not None and timestamp is not None:
+            trace['published'] = timestamp
+            trace['received_wall'] = time.time()
+        command_filter = self.command_filter
+        rate_limited = command_filter.rate_limited
+        if command_filter.submit(command, trace):
+            print(f"收到命令: {command}")
+            outcome = 'passed'
+        elif command_filter.rate_limited != rate_limited:
+            outcome = 'rate_limited'
+        else:
+            outcome = 'pending' if command_filter.edge == 'trailing' else 'suppressed'
+        if recorder is not None:
+            recorder.record(command, outcome, lateness, sequence)
+
+    def get_filter_stats(self):
+        """获取命令过滤的放行/抑制/过期/重复计数"""
+        stats = self.command_filter.stats()
+        stats['stale'] = self.stale_dropped
+        stats['duplicate'] = self.sequence_window.duplicates
+        if self.router is not None:
+            stats['duplicate'] += self.router.duplicates()
+        stats['invalid'] = self.invalid_dropped
+        stats['gated'] = self.gated
+        return stats
+
+
+class Threaded_Subscriber(Gesture_Subscriber):
+    """
+    在独立接收线程中运行的接收端：打开 -> 循环接收 -> 出错后按退避策略重新打开，
+    首次打开超过 connect_timeout 仍未成功则 failed 并退出线程。
+
+    子类实现 _open()、_receive()（最多等待 read_timeout 秒，没有数据时返回 None）和 _close()；
+    stop() 先调用 _interrupt() 让阻塞中的 _receive() 返回，再等待线程退出。
+    收到的数据默认作为一条载荷交给 handle_payload，字节流传输覆盖 _handle() 自行分帧。
+
+    构造函数参数：
+    read_timeout: 单次接收的最长等待（秒），也是 stop() 的最长响应时间
+    options: 其余传给 Gesture_Subscriber 的关键字参数
+    """
+
+    def __init__(self, read_timeout=0.2, **options):
+        super().__init__(**options)
+        self.read_timeout = read_timeout
+        self.connected = False
+        self.received = 0  # _receive() 返回的数据块数
+        self.reconnect_count = 0  # 断开后重新打开的次数
+        self._receiver_thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """非阻塞地启动接收线程，进度见 state_changed"""
+        if self._receiver_thread is not None and self._receiver_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._receiver_thread = threading.Thread(target=self._receiver_loop, name=type(self).__name__,
+                                                 daemon=True)
+        self._receiver_thread.start()
+
+    def _receiver_loop(self):
+        started = time.monotonic()
+        ever_connected = False
+        attempt = 0
+        while not self._stop_event.is_set():
+            self._set_state(STATE_CONNECTING)
+            try:
+                self._open()
+                if ever_connected:
+                    self.reconnect_count += 1
+                self.connected = ever_connected = True
+                attempt = 0
+                self._set_state(STATE_CONNECTED)
+                while not self._stop_event.is_set():
+                    data = self._receive()
+                    if data is not None:
+                        self.received += 1
+                        self._handle(data)
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    self.logger.error(f"接收异常: {e}")
+            finally:
+                self.connected = False
+                self._close()
+            if self._stop_event.is_set():
+                break
+            if not ever_connected and time.monotonic() - started >= self.connect_timeout:
+                self.logger.error(f"无法打开 {self.endpoint()}")
+                self._set_state(STATE_FAILED)
+                return
+            delay = self._retry_delay(attempt)
+            attempt += 1
+            self.logger.warning(f"{delay:.2f}秒后重试（第{attempt}次）")
+            self._set_state(STATE_RETRYING)
+            self._stop_event.wait(delay)
+        self._set_state(STATE_IDLE)
+
+    def _handle(self, data):
+        self.handle_payload(data)
+
+    def _interrupt(self):
+        """让阻塞中的 _receive() 尽快返回，子类按需覆盖"""
+
+    def stop(self):
+        """停止接收线程并关闭连接"""
+        self.command_filter.cancel_pending()
+        self._stop_event.set()
+        self._interrupt()
+        if self._receiver_thread is not None and self._receiver_thread is not threading.current_thread():
+            self._receiver_thread.join(timeout=2)
+        self._receiver_thread = None
+
+
+def load_transport(name):
+    """导入并返回传输方式对应的类"""
+    entry = TRANSPORTS.get(name)
+    if entry is None:
+        raise ValueError(f"未知的传输方式: {name}")
+    module, class_name = entry
+    return getattr(importlib.import_module(module), class_name)
+
+
+def create_subscriber(name='mqtt', **options):
+    """按名称创建手势接收端
+
+    Args:
+        name: TRANSPORTS 中的名称：'mqtt'、'serial'、'udp' 或 'zmq'
+        options: 传给对应类构造函数的关键字参数
+    """
+    return load_transport(name)(**options)
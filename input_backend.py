@@ -0,0 +1,568 @@
+"""
+script 使用的输入后端。
+
+所有后端提供相同的方法：size()、position()、move_to(x, y, duration)、click()、
+scroll(clicks)、hotkey(*keys, presses)、press(key, presses)，其中 press 的 key 也可以是
+依次按下的按键名列表，presses 次重复一次注入。按键名沿用 pyautogui 的命名
+（'ctrl'、'left'、'+' ……），滚动量的含义与 pyautogui 在同一平台上相同，
+换用后端不需要修改 script。
+
+- pyautogui:  原有实现，跨平台
+- sendinput:  Windows，直接调用 SendInput，一个动作的全部事件一次注入
+- xtest:      Linux X11，python-xlib 的 XTest 扩展，一个动作的全部事件只同步一次
+- uinput:     Linux 内核虚拟输入设备（python-evdev），不依赖显示服务器，需要 /dev/uinput 写权限
+- recording:  只记录调用的伪造后端，用于测试和基准
+
+用 create_backend(name) 按名称创建，'auto' 选择当前平台最快的可用后端。
+各后端在本机上的动作延迟可用 python benchmark.py input-backends 测量。
+"""
+import os
+import sys
+import time
+
+# Windows 滚轮增量在消息中是有符号16位数，单个事件超过这个范围会回绕成反方向
+WHEEL_DELTA_MAX = 32767
+
+
+def _wheel_chunks(clicks):
+    """把滚动量拆成每段绝对值不超过 WHEEL_DELTA_MAX 的若干段，总和不变、方向一致"""
+    sign = 1 if clicks > 0 else -1
+    remaining = abs(clicks)
+    while remaining > WHEEL_DELTA_MAX:
+        yield sign * WHEEL_DELTA_MAX
+        remaining -= WHEEL_DELTA_MAX
+    yield sign * remaining
+
+
+class PyAutoGUIBackend():
+    """
+    基于 pyautogui 的输入后端。
+
+    所有调用都传 _pause=False，跳过 pyautogui.PAUSE 在每次调用后附加的固定休眠。
+    """
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def size(self):
+        return self.pyautogui.size()
+
+    def position(self):
+        return self.pyautogui.position()
+
+    def move_to(self, x, y, duration=0):
+        self.pyautogui.moveTo(x, y, duration=duration, _pause=False)
+
+    def click(self):
+        self.pyautogui.click(_pause=False)
+
+    def scroll(self, clicks):
+        # pyautogui 在 Windows 上把 clicks 原样作为一次滚轮增量，过大时分段发送
+        for chunk in _wheel_chunks(clicks):
+            self.pyautogui.scroll(chunk, _pause=False)
+
+    def hotkey(self, *keys, presses=1):
+        for _ in range(presses):
+            self.pyautogui.hotkey(*keys, _pause=False)
+
+    def press(self, key, presses=1):
+        self.pyautogui.press(key, presses=presses, _pause=False)
+
+
+class RecordingBackend():
+    """
+    记录所有调用的伪造输入后端，用于测试和基准。
+
+    构造函数参数：
+    screen_size: 伪造的屏幕尺寸
+    pause: 每次调用后的模拟休眠（秒），设为0.1可模拟 pyautogui 默认的 PAUSE
+    """
+
+    def __init__(self, screen_size=(1920, 1080), pause=0.0):
+        self.screen_size = screen_size
+        self.pause = pause
+        self.cursor = (screen_size[0] // 2, screen_size[1] // 2)
+        self.calls = []  # (方法名, 参数, perf_counter时间戳)
+
+    def _record(self, name, *args):
+        self.calls.append((name, args, time.perf_counter()))
+        if self.pause:
+            time.sleep(self.pause)
+
+    def size(self):
+        return self.screen_size
+
+    def position(self):
+        return self.cursor
+
+    def move_to(self, x, y, duration=0):
+        if duration:
+            time.sleep(duration)  # 模拟光标动画
+        self.cursor = (int(x), int(y))
+        self._record('move_to', x, y, duration)
+
+    def click(self):
+        self._record('click')
+
+    def scroll(self, clicks):
+        self._record('scroll', clicks)
+
+    def hotkey(self, *keys, presses=1):
+        self._record('hotkey', *keys, presses)
+
+    def press(self, key, presses=1):
+        self._record('press', key, presses)
+
+
+class SendInputBackend():
+    """
+    Windows SendInput 输入后端。
+
+    每个动作的全部按键/鼠标事件组成一个 INPUT 数组，一次 SendInput 调用注入，
+    不经过 pyautogui 的参数检查、failsafe 和 PAUSE。
+    字符按键的虚拟键码和所需修饰键由 VkKeyScanW 按当前键盘布局查询（与 pyautogui 相同）。
+    """
+
+    INPUT_MOUSE = 0
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_WHEEL = 0x0800
+    SM_CXSCREEN = 0
+    SM_CYSCREEN = 1
+    # 修饰键位（VkKeyScanW 高字节）→ 虚拟键码，按下顺序 alt、ctrl、shift
+    MODIFIERS = ((4, 0x12), (2, 0x11), (1, 0x10))
+    KEYS = {
+        'ctrl': 0x11, 'ctrlleft': 0xA2, 'ctrlright': 0xA3,
+        'shift': 0x10, 'shiftleft': 0xA0, 'shiftright': 0xA1,
+        'alt': 0x12, 'altleft': 0xA4, 'altright': 0xA5,
+        'win': 0x5B, 'winleft': 0x5B, 'winright': 0x5C,
+        'enter': 0x0D, 'return': 0x0D, 'esc': 0x1B, 'escape': 0x1B, 'space': 0x20, 'tab': 0x09,
+        'backspace': 0x08, 'delete': 0x2E, 'del': 0x2E, 'insert': 0x2D,
+        'home': 0x24, 'end': 0x23, 'pageup': 0x21, 'pgup': 0x21, 'pagedown': 0x22, 'pgdn': 0x22,
+        'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28,
+        'add': 0x6B, 'subtract': 0x6D,
+        **{f'f{i}': 0x6F + i for i in range(1, 13)},
+    }
+    # 需要 KEYEVENTF_EXTENDEDKEY 的键：方向键、编辑键、右侧修饰键
+    EXTENDED = {0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2D, 0x2E, 0x5B, 0x5C, 0xA3, 0xA5}
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        ULONG_PTR = ctypes.c_size_t
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ULONG_PTR)]
+
+        class HARDWAREINPUT(ctypes.Structure):
+            _fields_ = [('uMsg', wintypes.DWORD), ('wParamL', wintypes.WORD), ('wParamH', wintypes.WORD)]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [('mi', MOUSEINPUT), ('ki', KEYBDINPUT), ('hi', HARDWAREINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('u', _INPUTUNION)]
+
+        self._ctypes = ctypes
+        self._INPUT = INPUT
+        self._point = wintypes.POINT()
+        self.user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self.user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+        self.user32.SendInput.restype = wintypes.UINT
+        self.user32.VkKeyScanW.argtypes = (wintypes.WCHAR,)
+        self.user32.VkKeyScanW.restype = ctypes.c_short
+        self._key_cache = {}  # 按键名 -> (修饰键位, 虚拟键码)
+
+    def _key(self, key):
+        cached = self._key_cache.get(key)
+        if cached is None:
+            vk = self.KEYS.get(key.lower()) if len(key) > 1 else None
+            if vk is not None:
+                cached = (0, vk)
+            elif len(key) == 1:
+                scan = self.user32.VkKeyScanW(key)
+                if scan == -1:
+                    raise ValueError(f"当前键盘布局无法输入按键: {key!r}")
+                cached = divmod(scan & 0xFFFF, 0x100)
+            else:
+                raise ValueError(f"未知按键: {key!r}")
+            self._key_cache[key] = cached
+        return cached
+
+    def _keyboard(self, vk, up=False):
+        flags = self.KEYEVENTF_KEYUP if up else 0
+        if vk in self.EXTENDED:
+            flags |= self.KEYEVENTF_EXTENDEDKEY
+        event = self._INPUT(type=self.INPUT_KEYBOARD)
+        event.u.ki.wVk = vk
+        event.u.ki.dwFlags = flags
+        return event
+
+    def _mouse(self, flags, data=0):
+        event = self._INPUT(type=self.INPUT_MOUSE)
+        event.u.mi.dwFlags = flags
+        event.u.mi.mouseData = data & 0xFFFFFFFF
+        return event
+
+    def _key_down(self, key):
+        """按下一个键；字符键需要的修饰键只包住按下事件（与 pyautogui 相同）"""
+        mods, vk = self._key(key)
+        events = [self._keyboard(mod_vk) for bit, mod_vk in self.MODIFIERS if mods & bit]
+        events.append(self._keyboard(vk))
+        events.extend(self._keyboard(mod_vk, up=True) for bit, mod_vk in reversed(self.MODIFIERS) if mods & bit)
+        return events
+
+    def _send(self, events):
+        count = len(events)
+        inputs = (self._INPUT * count)(*events)
+        sent = self.user32.SendInput(count, inputs, self._ctypes.sizeof(self._INPUT))
+        if sent != count:
+            raise self._ctypes.WinError(self._ctypes.get_last_error())
+
+    def size(self):
+        return self.user32.GetSystemMetrics(self.SM_CXSCREEN), self.user32.GetSystemMetrics(self.SM_CYSCREEN)
+
+    def position(self):
+        self.user32.GetCursorPos(self._ctypes.byref(self._point))
+        return self._point.x, self._point.y
+
+    def move_to(self, x, y, duration=0):
+        if duration:
+            _animate(self, x, y, duration, lambda x, y: self.user32.SetCursorPos(int(x), int(y)))
+        self.user32.SetCursorPos(int(x), int(y))
+
+    def click(self):
+        self._send([self._mouse(self.MOUSEEVENTF_LEFTDOWN), self._mouse(self.MOUSEEVENTF_LEFTUP)])
+
+    def scroll(self, clicks):
+        # 与 pyautogui 在 Windows 上相同：clicks 直接作为滚轮增量（120 为一格）；
+        # 超出16位范围的增量拆成多个滚轮事件，仍在同一次 SendInput 中注入
+        self._send([self._mouse(self.MOUSEEVENTF_WHEEL, chunk) for chunk in _wheel_chunks(clicks)])
+
+    def hotkey(self, *keys, presses=1):
+        events = []
+        for key in keys:
+            events.extend(self._key_down(key))
+        events.extend(self._keyboard(self._key(key)[1], up=True) for key in reversed(keys))
+        self._send(events * presses)
+
+    def press(self, key, presses=1):
+        events = []
+        for name in _key_list(key):
+            events.extend(self._key_down(name))
+            events.append(self._keyboard(self._key(name)[1], up=True))
+        self._send(events * presses)
+
+
+class XTestBackend():
+    """
+    X11 XTest 输入后端（python-xlib，pyautogui 在 Linux 上也依赖它）。
+
+    一个动作的全部事件先写入请求缓冲区，最后只 sync 一次。
+    需要 shift 才能输入的字符（如 '+'）会自动包上 shift。
+
+    构造函数参数：
+    display_name: X 显示名，默认取 DISPLAY 环境变量
+    """
+
+    KEYSYMS = {
+        'ctrl': 'Control_L', 'ctrlleft': 'Control_L', 'ctrlright': 'Control_R',
+        'shift': 'Shift_L', 'shiftleft': 'Shift_L', 'shiftright': 'Shift_R',
+        'alt': 'Alt_L', 'altleft': 'Alt_L', 'altright': 'Alt_R',
+        'win': 'Super_L', 'winleft': 'Super_L', 'winright': 'Super_R',
+        'enter': 'Return', 'return': 'Return', 'esc': 'Escape', 'escape': 'Escape', 'space': 'space',
+        'tab': 'Tab', 'backspace': 'BackSpace', 'delete': 'Delete', 'del': 'Delete', 'insert': 'Insert',
+        'home': 'Home', 'end': 'End', 'pageup': 'Prior', 'pgup': 'Prior', 'pagedown': 'Next', 'pgdn': 'Next',
+        'left': 'Left', 'up': 'Up', 'right': 'Right', 'down': 'Down',
+        'add': 'KP_Add', 'subtract': 'KP_Subtract',
+        '+': 'plus', '-': 'minus', '=': 'equal', ' ': 'space', ',': 'comma', '.': 'period',
+    }
+
+    def __init__(self, display_name=None):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+
+        self._X = X
+        self._XK = XK
+        self._fake_input = xtest.fake_input
+        self._display = display.Display(display_name)
+        if not self._display.query_extension('XTEST'):
+            raise OSError("X 服务器不支持 XTEST 扩展")
+        self._root = self._display.screen().root
+        self._shift = self._display.keysym_to_keycode(XK.string_to_keysym('Shift_L'))
+        self._key_cache = {}  # 按键名 -> (键码, 是否需要 shift)
+
+    def _key(self, key):
+        cached = self._key_cache.get(key)
+        if cached is None:
+            name = self.KEYSYMS.get(key.lower() if len(key) > 1 else key, key)
+            keysym = self._XK.string_to_keysym(name)
+            if keysym == 0 and len(name) > 1:
+                keysym = self._XK.string_to_keysym(name.capitalize())  # 'f5' -> 'F5'
+            keycode = self._display.keysym_to_keycode(keysym) if keysym else 0
+            if not keycode:
+                raise ValueError(f"未知按键: {key!r}")
+            needs_shift = self._display.keycode_to_keysym(keycode, 0) != keysym
+            cached = (keycode, needs_shift)
+            self._key_cache[key] = cached
+        return cached
+
+    def _key_event(self, key, up=False):
+        keycode, needs_shift = self._key(key)
+        X = self._X
+        if up:
+            self._fake_input(self._display, X.KeyRelease, keycode)
+            return
+        if needs_shift:
+            self._fake_input(self._display, X.KeyPress, self._shift)
+        self._fake_input(self._display, X.KeyPress, keycode)
+        if needs_shift:
+            self._fake_input(self._display, X.KeyRelease, self._shift)
+
+    def size(self):
+        screen = self._display.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+
+    def position(self):
+        pointer = self._root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def _warp(self, x, y):
+        self._fake_input(self._display, self._X.MotionNotify, x=int(x), y=int(y))
+        self._display.sync()
+
+    def move_to(self, x, y, duration=0):
+        if duration:
+            _animate(self, x, y, duration, self._warp)
+        self._warp(x, y)
+
+    def click(self):
+        self._fake_input(self._display, self._X.ButtonPress, 1)
+        self._fake_input(self._display, self._X.ButtonRelease, 1)
+        self._display.sync()
+
+    def scroll(self, clicks):
+        # 与 pyautogui 在 X11 上相同：每个 click 是一次滚轮按钮（4 向上，5 向下）
+        button = 4 if clicks > 0 else 5
+        for _ in range(abs(clicks)):
+            self._fake_input(self._display, self._X.ButtonPress, button)
+            self._fake_input(self._display, self._X.ButtonRelease, button)
+        self._display.sync()
+
+    def hotkey(self, *keys, presses=1):
+        for _ in range(presses):
+            for key in keys:
+                self._key_event(key)
+            for key in reversed(keys):
+                self._key_event(key, up=True)
+        self._display.sync()
+
+    def press(self, key, presses=1):
+        keys = _key_list(key)
+        for _ in range(presses):
+            for name in keys:
+                self._key_event(name)
+                self._key_event(name, up=True)
+        self._display.sync()
+
+
+class UinputBackend():
+    """
+    Linux uinput 虚拟设备输入后端（python-evdev），X11 和 Wayland 下都可用。
+
+    创建一个虚拟键盘和一个绝对坐标指针设备，一个动作（含 presses 次重复）的全部键盘事件写完后只发送一次 SYN；
+    只有点击把按下和抬起分成两帧。
+    uinput 无法读取真实光标位置，position() 返回本后端最后一次移动到的位置（初始为屏幕中央）。
+    字符按键按美式键盘布局映射。
+
+    构造函数参数：
+    screen_size: 屏幕尺寸，None 时尝试用 python-xlib 查询，失败则为 1920x1080
+    """
+
+    KEYS = {
+        'ctrl': 'KEY_LEFTCTRL', 'ctrlleft': 'KEY_LEFTCTRL', 'ctrlright': 'KEY_RIGHTCTRL',
+        'shift': 'KEY_LEFTSHIFT', 'shiftleft': 'KEY_LEFTSHIFT', 'shiftright': 'KEY_RIGHTSHIFT',
+        'alt': 'KEY_LEFTALT', 'altleft': 'KEY_LEFTALT', 'altright': 'KEY_RIGHTALT',
+        'win': 'KEY_LEFTMETA', 'winleft': 'KEY_LEFTMETA', 'winright': 'KEY_RIGHTMETA',
+        'enter': 'KEY_ENTER', 'return': 'KEY_ENTER', 'esc': 'KEY_ESC', 'escape': 'KEY_ESC', 'space': 'KEY_SPACE',
+        'tab': 'KEY_TAB', 'backspace': 'KEY_BACKSPACE', 'delete': 'KEY_DELETE', 'del': 'KEY_DELETE',
+        'insert': 'KEY_INSERT', 'home': 'KEY_HOME', 'end': 'KEY_END',
+        'pageup': 'KEY_PAGEUP', 'pgup': 'KEY_PAGEUP', 'pagedown': 'KEY_PAGEDOWN', 'pgdn': 'KEY_PAGEDOWN',
+        'left': 'KEY_LEFT', 'up': 'KEY_UP', 'right': 'KEY_RIGHT', 'down': 'KEY_DOWN',
+        'add': 'KEY_KPPLUS', 'subtract': 'KEY_KPMINUS',
+        '-': 'KEY_MINUS', '=': 'KEY_EQUAL', ' ': 'KEY_SPACE', ',': 'KEY_COMMA', '.': 'KEY_DOT',
+        '/': 'KEY_SLASH', ';': 'KEY_SEMICOLON',
+        **{f'f{i}': f'KEY_F{i}' for i in range(1, 13)},
+    }
+    # 美式布局下需要 shift 的字符 -> 对应的未按 shift 字符
+    SHIFTED = {'+': '=', '_': '-', '<': ',', '>': '.', '?': '/', ':': ';'}
+
+    def __init__(self, screen_size=None):
+        from evdev import AbsInfo, UInput, ecodes
+
+        self._ecodes = ecodes
+        self.screen_size = screen_size or _x11_screen_size() or (1920, 1080)
+        key_codes = sorted({getattr(ecodes, name) for name in self.KEYS.values()}
+                           | {getattr(ecodes, f'KEY_{c}') for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'})
+        self._keyboard = UInput({ecodes.EV_KEY: key_codes}, name="ppt-client-keyboard")
+        width, height = self.screen_size
+        self._pointer = UInput({
+            ecodes.EV_KEY: [ecodes.BTN_LEFT],
+            ecodes.EV_REL: [ecodes.REL_WHEEL],
+            ecodes.EV_ABS: [(ecodes.ABS_X, AbsInfo(0, 0, width - 1, 0, 0, 0)),
+                            (ecodes.ABS_Y, AbsInfo(0, 0, height - 1, 0, 0, 0))],
+        }, name="ppt-client-pointer")
+        self.cursor = (width // 2, height // 2)
+        self._key_cache = {}  # 按键名 -> (键码, 是否需要 shift)
+
+    def _key(self, key):
+        cached = self._key_cache.get(key)
+        if cached is None:
+            ecodes = self._ecodes
+            base = self.SHIFTED.get(key, key)
+            name = self.KEYS.get(base.lower() if len(base) > 1 else base)
+            if name is None and len(base) == 1 and base.isalnum():
+                name = f'KEY_{base.upper()}'
+            if name is None:
+                raise ValueError(f"未知按键: {key!r}")
+            cached = (getattr(ecodes, name), key in self.SHIFTED or (len(key) == 1 and key.isupper()))
+            self._key_cache[key] = cached
+        return cached
+
+    def _key_event(self, key, up=False):
+        code, needs_shift = self._key(key)
+        ecodes = self._ecodes
+        if up:
+            self._keyboard.write(ecodes.EV_KEY, code, 0)
+            return
+        if needs_shift:
+            self._keyboard.write(ecodes.EV_KEY, ecodes.KEY_LEFTSHIFT, 1)
+        self._keyboard.write(ecodes.EV_KEY, code, 1)
+        if needs_shift:
+            self._keyboard.write(ecodes.EV_KEY, ecodes.KEY_LEFTSHIFT, 0)
+
+    def size(self):
+        return self.screen_size
+
+    def position(self):
+        return self.cursor
+
+    def _warp(self, x, y):
+        ecodes = self._ecodes
+        self._pointer.write(ecodes.EV_ABS, ecodes.ABS_X, int(x))
+        self._pointer.write(ecodes.EV_ABS, ecodes.ABS_Y, int(y))
+        self._pointer.syn()
+        self.cursor = (int(x), int(y))
+
+    def move_to(self, x, y, duration=0):
+        if duration:
+            _animate(self, x, y, duration, self._warp)
+        self._warp(x, y)
+
+    def click(self):
+        ecodes = self._ecodes
+        self._pointer.write(ecodes.EV_KEY, ecodes.BTN_LEFT, 1)
+        self._pointer.syn()  # 按下和抬起分成两帧，否则部分程序识别不到点击
+        self._pointer.write(ecodes.EV_KEY, ecodes.BTN_LEFT, 0)
+        self._pointer.syn()
+
+    def scroll(self, clicks):
+        # 与 pyautogui 在 Linux 上相同：clicks 为滚轮格数，正数向上
+        self._pointer.write(self._ecodes.EV_REL, self._ecodes.REL_WHEEL, clicks)
+        self._pointer.syn()
+
+    def hotkey(self, *keys, presses=1):
+        # 整批事件写完后只发送一次 SYN；键盘事件在一帧内按顺序逐个处理，不会像点击那样被合并
+        for _ in range(presses):
+            for key in keys:
+                self._key_event(key)
+            for key in reversed(keys):
+                self._key_event(key, up=True)
+        self._keyboard.syn()
+
+    def press(self, key, presses=1):
+        keys = _key_list(key)
+        for _ in range(presses):
+            for name in keys:
+                self._key_event(name)
+                self._key_event(name, up=True)
+        self._keyboard.syn()
+
+    def close(self):
+        self._keyboard.close()
+        self._pointer.close()
+
+
+def _key_list(key):
+    """press 的 key 可以是单个按键名，也可以是依次按下的按键名列表（与 pyautogui 相同）"""
+    return [key] if isinstance(key, str) else list(key)
+
+
+def _animate(backend, x, y, duration, warp, step=0.01):
+    """光标动画：从当前位置线性移动到 (x, y)，每 step 秒一帧（最后一帧由调用方完成）"""
+    start_x, start_y = backend.position()
+    steps = max(1, int(duration / step))
+    for i in range(1, steps):
+        warp(start_x + (x - start_x) * i / steps, start_y + (y - start_y) * i / steps)
+        time.sleep(duration / steps)
+
+
+def _x11_screen_size():
+    """通过 python-xlib 查询屏幕尺寸，不可用时返回 None"""
+    if not os.environ.get('DISPLAY'):
+        return None
+    try:
+        from Xlib import display
+        screen = display.Display().screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+    except Exception:
+        return None
+
+
+BACKENDS = {
+    'pyautogui': PyAutoGUIBackend,
+    'sendinput': SendInputBackend,
+    'xtest': XTestBackend,
+    'uinput': UinputBackend,
+    'recording': RecordingBackend,
+}
+
+
+def default_backend_name():
+    """根据当前平台选择最快的可用后端"""
+    if sys.platform == 'win32':
+        return 'sendinput'
+    if os.environ.get('DISPLAY'):
+        try:
+            import Xlib  # noqa: F401
+            return 'xtest'
+        except ImportError:
+            pass
+    return 'pyautogui'
+
+
+def create_backend(name=None, **options):
+    """按名称创建输入后端
+
+    Args:
+        name: 'auto'、'pyautogui'、'sendinput'、'xtest'、'uinput' 或 'recording'；None 为 pyautogui（原有行为）
+        options: 传给后端构造函数的关键字参数，如 uinput 的 screen_size
+    """
+    if name is None:
+        name = 'pyautogui'
+    elif name == 'auto':
+        name = default_backend_name()
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"未知的输入后端: {name}")
+    return backend_class(**options)
@@ -0,0 +1,130 @@
+"""
+局域网直连的手势传输：手势设备和电脑在同一网段时不经过 MQTT 代理，省去代理转发和排队。
+
+- udp:  Udp_Subscriber，本机监听 UDP 端口，一个数据报为一条载荷；无连接、无重传，
+        丢失的手势不会补发（手势本来就以最新为准），重复的由二进制格式的序号去重
+- zmq:  Zmq_Subscriber（pyzmq），'pull' 模式本机 bind，设备用 PUSH 连接过来；
+        'sub' 模式本机连接设备的 PUB 端点，接收全部消息。ZeroMQ 自动重连，设备可以晚于本机启动
+载荷与 MQTT 消息相同（gesture_protocol 的文本、JSON 或二进制格式），收到后走同一条处理路径。
+
+两者都没有认证，只应在可信的局域网中使用；默认监听所有网卡，只在本机使用时请绑定 127.0.0.1。
+"""
+import socket
+
+from gesture_transport import Threaded_Subscriber
+
+UDP_HOST = "0.0.0.0"
+UDP_PORT = 5005
+ZMQ_ENDPOINT = "tcp://*:5556"
+MAX_DATAGRAM = 2048
+UDP_RECEIVE_BUFFER = 1 << 20  # 接收缓冲区（字节），接收线程来不及处理时先存在内核中
+
+
+class Udp_Subscriber(Threaded_Subscriber):
+    """
+    UDP 手势接收端。
+
+    构造函数参数：
+    host: 监听地址，默认所有网卡
+    port: 监听端口，0 表示由系统分配（打开后写回 self.port）
+    receive_buffer: SO_RCVBUF 大小（字节），实际值受系统上限（Linux 为 net.core.rmem_max）约束；
+                    缓冲区满时新到的数据报被内核丢弃
+    options: 其余传给 Threaded_Subscriber 的关键字参数
+    """
+    display_name = "UDP"
+
+    def __init__(self, host=UDP_HOST, port=UDP_PORT, receive_buffer=UDP_RECEIVE_BUFFER, **options):
+        super().__init__(logger_name=f"UdpClient.{port}", **options)
+        self.host = host
+        self.port = port
+        self.receive_buffer = receive_buffer
+        self._socket = None
+
+    def endpoint(self):
+        return f"{self.display_name} {self.host}:{self.port}"
+
+    def _open(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            if self.receive_buffer:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+            sock.bind((self.host, self.port))
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.read_timeout)
+        self.port = sock.getsockname()[1]  # port=0 时为系统分配的端口
+        self._socket = sock
+
+    def _receive(self):
+        try:
+            return self._socket.recv(MAX_DATAGRAM)
+        except socket.timeout:
+            return None
+
+    def _close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class Zmq_Subscriber(Threaded_Subscriber):
+    """
+    ZeroMQ 手势接收端。
+
+    构造函数参数：
+    endpoint: ZeroMQ 端点；'pull' 模式为本机 bind 的地址（如 tcp://*:5556），
+              'sub' 模式为设备 PUB 端点（如 tcp://192.168.1.20:5556）
+    mode: 'pull' 或 'sub'
+    options: 其余传给 Threaded_Subscriber 的关键字参数
+    """
+    display_name = "ZeroMQ"
+
+    def __init__(self, endpoint=ZMQ_ENDPOINT, mode='pull', **options):
+        if mode not in ('pull', 'sub'):
+            raise ValueError(f"未知的 ZeroMQ 模式: {mode}")
+        super().__init__(logger_name=f"ZmqClient.{endpoint}", **options)
+        self.address = endpoint
+        self.mode = mode
+        self._context = None
+        self._socket = None
+        self._poller = None
+
+    def endpoint(self):
+        return f"{self.display_name} {self.mode} {self.address}"
+
+    def _open(self):
+        import zmq
+        self._context = zmq.Context.instance()
+        if self.mode == 'pull':
+            sock = self._context.socket(zmq.PULL)
+            sock.setsockopt(zmq.LINGER, 0)
+            sock.bind(self.address)
+            self.address = sock.getsockopt_string(zmq.LAST_ENDPOINT)  # tcp://*:0 时为实际端口
+        else:
+            sock = self._context.socket(zmq.SUB)
+            sock.setsockopt(zmq.LINGER, 0)
+            sock.setsockopt(zmq.SUBSCRIBE, b'')
+            sock.connect(self.address)
+        self._socket = sock
+        self._poller = zmq.Poller()
+        self._poller.register(sock, zmq.POLLIN)
+        self._timeout_ms = int(self.read_timeout * 1000)
+        self._noblock = zmq.NOBLOCK
+        self._again = zmq.Again
+
+    def _receive(self):
+        # 连续到达时直接取，队列为空才等待
+        try:
+            return self._socket.recv(self._noblock)
+        except self._again:
+            pass
+        if not self._poller.poll(self._timeout_ms):
+            return None
+        return self._socket.recv(self._noblock)
+
+    def _close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            self._poller = None
@@ -0,0 +1,166 @@
+"""
+手势各阶段延迟统计。
+
+每个手势携带一个 trace 字典，各阶段写入 time.monotonic() 时间戳，动作执行完后
+汇总到各阶段的直方图：
+- broker:  发布端时间戳 → on_message 收到（仅消息带时间戳时，按墙钟计算）
+- receive: on_message 收到 → signal.emit（解码、去重、过滤）
+- signal:  signal.emit → gesture_callback（Qt 跨线程信号）
+- queue:   提交到 ActionExecutor → 开始执行
+- inject:  script 动作执行耗时
+- total:   on_message 收到 → 动作执行完
+
+默认关闭：RECORDER 为 None，热路径上只有一次 None 判断，不创建 trace。
+启用：latency_metrics.enable(port=9464, dump_interval=60)
+"""
+import bisect
+import logging
+import threading
+import time
+
+STAGES = ('broker', 'receive', 'signal', 'queue', 'inject', 'total')
+
+# 直方图桶上界（秒）：10µs 到 10s，每个数量级 5 个桶
+BUCKETS = tuple(m * 10 ** e for e in range(-5, 1) for m in (1, 2, 3, 5, 7)) + (10.0,)
+
+RECORDER = None  # 全局记录器，None 表示未启用
+
+
+class LatencyHistogram():
+    """固定桶直方图，百分位按桶上界估计"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个为溢出桶
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class LatencyRecorder():
+    """
+    各阶段延迟记录器。
+
+    构造函数参数：
+    prometheus: 是否同时写入 prometheus_client 的 Histogram（需要已安装 prometheus-client）
+    """
+
+    def __init__(self, prometheus=False):
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self._lock = threading.Lock()
+        self._prometheus = None
+        self._dump_timer = None
+        self.logger = logging.getLogger("LatencyMetrics")
+        if prometheus:
+            try:
+                from prometheus_client import Histogram
+                self._prometheus = Histogram(
+                    'ppt_gesture_stage_seconds', "手势各阶段延迟", ['stage'], buckets=BUCKETS
+                )
+            except ImportError:
+                self.logger.warning("未安装 prometheus-client，不导出 Prometheus 指标")
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self.histograms[stage].observe(seconds)
+        if self._prometheus is not None:
+            self._prometheus.labels(stage).observe(seconds)
+
+    def finish(self, trace):
+        """动作执行完后，根据 trace 中的时间戳计算各阶段延迟"""
+        if 'published' in trace:
+            self.observe('broker', max(0.0, trace['received_wall'] - trace['published']))
+        received = trace['received']
+        for stage, start, end in (('receive', received, trace.get('emitted')),
+                                  ('signal', trace.get('emitted'), trace.get('dispatched')),
+                                  ('queue', trace.get('queued'), trace.get('started')),
+                                  ('inject', trace.get('started'), trace.get('finished')),
+                                  ('total', received, trace.get('finished'))):
+            if start is not None and end is not None:
+                self.observe(stage, end - start)
+
+    def summary(self):
+        """各阶段 p50/p95/p99（毫秒）"""
+        with self._lock:
+            return {
+                stage: {
+                    'count': histogram.count,
+                    'p50_ms': histogram.percentile(50) * 1000,
+                    'p95_ms': histogram.percentile(95) * 1000,
+                    'p99_ms': histogram.percentile(99) * 1000,
+                }
+                for stage, histogram in self.histograms.items()
+            }
+
+    def dump(self):
+        """把汇总写入日志"""
+        for stage, values in self.summary().items():
+            if values['count']:
+                self.logger.info(f"{stage}: n={values['count']} p50={values['p50_ms']:.2f}ms "
+                                 f"p95={values['p95_ms']:.2f}ms p99={values['p99_ms']:.2f}ms")
+
+    def start_periodic_dump(self, interval):
+        """每 interval 秒输出一次汇总"""
+        def tick():
+            self.dump()
+            self.start_periodic_dump(interval)
+        self._dump_timer = threading.Timer(interval, tick)
+        self._dump_timer.daemon = True
+        self._dump_timer.start()
+
+    def stop(self):
+        if self._dump_timer is not None:
+            self._dump_timer.cancel()
+            self._dump_timer = None
+
+
+def new_trace():
+    """创建一个手势的 trace，记录收到时间；未启用统计时返回 None
+
+    消息带发布时间戳时，调用方再写入 'published' 和 'received_wall'（time.time()）。
+    """
+    if RECORDER is None:
+        return None
+    return {'received': time.monotonic()}
+
+
+def enable(port=None, dump_interval=None, host='127.0.0.1'):
+    """启用延迟统计
+
+    Args:
+        port: 本地 Prometheus 端点端口，None 表示不启动
+        dump_interval: 定期输出汇总的间隔（秒），None 表示不输出
+        host: Prometheus 端点监听地址，默认只监听本机
+    """
+    global RECORDER
+    if RECORDER is None:
+        RECORDER = LatencyRecorder(prometheus=port is not None)
+        if port is not None and RECORDER._prometheus is not None:
+            from prometheus_client import start_http_server
+            start_http_server(port, addr=host)
+        if dump_interval:
+            RECORDER.start_periodic_dump(dump_interval)
+    return RECORDER
+
+
+def disable():
+    """关闭延迟统计"""
+    global RECORDER
+    if RECORDER is not None:
+        RECORDER.stop()
+        RECORDER = None
@@ -1,14 +1,9 @@
 import sys
-import client_do
-import qdarkstyle
+import argparse
 import os
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon
-import paho.mqtt.client as mqtt
-import pyautogui
-import time
-from Subscriber import Mqtt_Subscriber
-from PySide6.QtCore import QThread, Signal
+import startup_profile
+# 其余模块在解析参数后再导入：--profile-startup 需要在导入前开始计时，
+# MQTT（paho）和键鼠自动化（pyautogui）在窗口显示后才由 Client_UI 在后台加载
 
 
 """
@@ -23,7 +18,54 @@ from PySide6.QtCore import QThread, Signal
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    # 延迟统计默认关闭，需要排查卡顿时再开启
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency-metrics', type=float, metavar='SECONDS',
+                        help="开启分阶段延迟统计，每隔 SECONDS 秒输出一次汇总")
+    parser.add_argument('--metrics-port', type=int, help="在本机该端口提供 Prometheus 指标")
+    parser.add_argument('--devices', metavar='PATH', help="多设备路由配置（JSON），见 device_routing.py")
+    parser.add_argument('--pause-unfocused', choices=('unsubscribe', 'qos0'),
+                        help="焦点不在PPT时暂停投递：取消订阅，或降为 QoS 0")
+    parser.add_argument('--trace', metavar='PATH', help="把收到的每条手势和执行的动作记录到轨迹文件，供 gesture_trace.py 回放")
+    parser.add_argument('--transport', choices=('mqtt', 'serial', 'udp', 'zmq'), default='mqtt',
+                        help="手势传输方式：经 MQTT 代理（默认）；设备直接接在串口上，见 serial_transport.py；"
+                             "或同一局域网内经 UDP/ZeroMQ 直连（无认证，仅限可信网络），见 lan_transport.py")
+    parser.add_argument('--serial-port', metavar='PORT', help="串口名，如 COM3 或 /dev/ttyACM0（--transport serial）")
+    parser.add_argument('--baudrate', type=int, default=115200, help="串口波特率")
+    parser.add_argument('--listen', metavar='HOST:PORT', help="UDP 监听地址，默认 0.0.0.0:5005（--transport udp）")
+    parser.add_argument('--zmq-endpoint', metavar='ENDPOINT',
+                        help="ZeroMQ 端点：pull 模式为本机 bind 地址，默认 tcp://*:5556；sub 模式为设备的 PUB 地址")
+    parser.add_argument('--zmq-mode', choices=('pull', 'sub'), default='pull', help="ZeroMQ 接收方式")
+    parser.add_argument('--recognize', metavar='MODEL',
+                        help="串口发来原始采样时在本机识别手势：threshold 使用阈值规则，"
+                             "或 TemplateClassifier 保存的 .npz 模板文件，见 gesture_recognition.py")
+    parser.add_argument('--profiles', metavar='PATH', help="按程序切换的手势配置（JSON），见 gesture_profiles.py")
+    parser.add_argument('--input-backend', choices=('auto', 'pyautogui', 'sendinput', 'xtest', 'uinput'),
+                        help="键鼠输入后端，默认 pyautogui；auto 选择本平台最快的可用后端，"
+                             "可先用 python benchmark.py input-backends 比较")
+    parser.add_argument('--ui-stats', type=float, metavar='SECONDS',
+                        help="每隔 SECONDS 秒输出一次界面更新请求速率与实际重绘速率")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="输出各模块导入和启动阶段的耗时，后台预加载完成后退出")
+    args, qt_args = parser.parse_known_args()
+    if args.transport == 'serial' and not args.serial_port:
+        parser.error("--transport serial 需要 --serial-port")
+    if args.transport == 'zmq' and args.zmq_mode == 'sub' and not args.zmq_endpoint:
+        parser.error("--zmq-mode sub 需要 --zmq-endpoint")
+    if args.profile_startup:
+        startup_profile.enable()
+    with startup_profile.phase("导入界面模块"):
+        from PySide6.QtWidgets import QApplication
+        from PySide6.QtGui import QIcon
+        import client_do
+    if args.latency_metrics or args.metrics_port:
+        import latency_metrics
+        latency_metrics.enable(port=args.metrics_port, dump_interval=args.latency_metrics)
+    if args.trace:
+        import gesture_trace
+        gesture_trace.enable(args.trace)
+    with startup_profile.phase("创建QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
     def get_resource_path(relative_path):
         """获取资源文件的绝对路径"""
         if hasattr(sys, '_MEIPASS'):
@@ -35,8 +77,45 @@ if __name__ == '__main__':
     # 使用动态路径设置图标
     icon_path = get_resource_path("photograph/logo.jpg")
     # 设置应用程序图标
-    app.setWindowIcon(QIcon(icon_path))
-    app.setStyleSheet(qdarkstyle.load_stylesheet())
-    my_ui=client_do.Client_UI()
+    with startup_profile.phase("加载图标和样式表"):
+        app.setWindowIcon(QIcon(icon_path))
+        import qdarkstyle
+        # 直接指定 PySide6，避免 qtpy 逐个探测已安装的 Qt 绑定
+        app.setStyleSheet(qdarkstyle.load_stylesheet(qt_api='pyside6'))
+    if args.transport == 'serial':
+        subscriber_options = {'port': args.serial_port, 'baudrate': args.baudrate}
+        if args.recognize:
+            import gesture_recognition
+            classifier = (gesture_recognition.ThresholdClassifier() if args.recognize == 'threshold'
+                          else gesture_recognition.TemplateClassifier.load(args.recognize))
+            subscriber_options['recognizer'] = gesture_recognition.GestureRecognizer(classifier)
+    elif args.transport == 'udp':
+        subscriber_options = {}
+        if args.listen:
+            host, _, port = args.listen.rpartition(':')
+            subscriber_options = {'host': host or '0.0.0.0', 'port': int(port)}
+    elif args.transport == 'zmq':
+        subscriber_options = {'mode': args.zmq_mode}
+        if args.zmq_endpoint:
+            subscriber_options['endpoint'] = args.zmq_endpoint
+    else:
+        subscriber_options = {'pause_when_unfocused': args.pause_unfocused}
+        if args.devices:
+            import device_routing
+            subscriber_options['devices'] = device_routing.load_router(args.devices)
+    profiles = None
+    if args.profiles:
+        import gesture_profiles
+        profiles = gesture_profiles.load_profiles(args.profiles)
+    with startup_profile.phase("创建主窗口"):
+        my_ui=client_do.Client_UI(backend=args.input_backend, subscriber_options=subscriber_options,
+                                  profiles=profiles, transport=args.transport)
+    if args.ui_stats:
+        import logging
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        my_ui.labels.start_periodic_report(args.ui_stats)
     my_ui.show()
+    if args.profile_startup:
+        # 后台预加载完成即启动完毕：输出报告后退出
+        my_ui.automation_ready.connect(lambda: (startup_profile.finish(), my_ui.close(), app.quit()))
     app.exec()
\ No newline at end of file
@@ -1,31 +1,75 @@
-import pyautogui
-import pyperclip
-import time
+from input_backend import create_backend
 class script():
-    def __init__(self):
-        self.screen_width, self.screen_height = pyautogui.size()
-        self.duration = 0.2
+    """
+    手势对应的键鼠动作。
+
+    动作执行前只在光标离开目标区域时才把光标移回屏幕中央，否则直接注入按键/滚轮。
+    光标动画按动作单独配置（animations），默认不做动画，直接跳转。
+
+    构造函数参数：
+    backend: 输入后端对象，或 input_backend.create_backend 接受的名称（如 'sendinput'、'auto'）；
+             默认 PyAutoGUIBackend，测试可传入 RecordingBackend
+    target_area: 目标区域 (left, top, right, bottom)，默认屏幕中央80%；
+                 为 None 时每次动作都回到中央（原有行为）
+    animations: {动作名: 动画时长(秒)}，如 {'move_and_click': 0.2}
+
+    各动作的 times 参数表示重复次数，会合并为一次批量注入（滚动量累加、按键 presses=times）；
+    goto_slide 的参数是目标页码。
+    """
+    def __init__(self, backend=None, target_area='default', animations=None):
+        if backend is None or isinstance(backend, str):
+            backend = create_backend(backend)
+        self.backend = backend
+        self.screen_width, self.screen_height = self.backend.size()
+        if target_area == 'default':
+            target_area = (self.screen_width * 0.1, self.screen_height * 0.1,
+                           self.screen_width * 0.9, self.screen_height * 0.9)
+        self.target_area = target_area
+        self.animations = animations or {}
     def move_and_click(self):
-        self.reset()
-        pyautogui.click()
-    def up_sliding(self):
-        self.reset()
-        pyautogui.scroll(-1000)
-    def down_sliding(self):
-        self.reset()
-        pyautogui.scroll(1000)
-    def zoom_in(self):
-        self.reset()
-        pyautogui.hotkey('ctrl','+')
-    def zoom_out(self):
-        self.reset()
-        pyautogui.hotkey('ctrl','-')
-    def Left_sliding(self):
-        self.reset()
-        pyautogui.press('left')
-    def Right_sliding(self):       
-        self.reset()
-        pyautogui.press('right')
-    def reset(self):
-        pyautogui.moveTo(self.screen_width/2, self.screen_height/2, duration=self.duration)
-   
\ No newline at end of file
+        self.reset('move_and_click')
+        self.backend.click()
+    def up_sliding(self, times=1):
+        self.reset('up_sliding')
+        self.backend.scroll(-1000 * times)
+    def down_sliding(self, times=1):
+        self.reset('down_sliding')
+        self.backend.scroll(1000 * times)
+    def zoom_in(self, times=1):
+        self.reset('zoom_in')
+        self.backend.hotkey('ctrl','+', presses=times)
+    def zoom_out(self, times=1):
+        self.reset('zoom_out')
+        self.backend.hotkey('ctrl','-', presses=times)
+    def Left_sliding(self, times=1):
+        self.reset('Left_sliding')
+        self.backend.press('left', presses=times)
+    def Right_sliding(self, times=1):
+        self.reset('Right_sliding')
+        self.backend.press('right', presses=times)
+    def goto_slide(self, number=1):
+        """跳转到第 number 页：放映时输入页码再回车，整串按键一次注入"""
+        self.backend.press(list(str(number)) + ['enter'])
+    def press_key(self, key, times=1):
+        """按键（手势配置中的 ["press", 键]），不移动光标"""
+        self.backend.press(key, presses=times)
+    def hotkey(self, keys, times=1):
+        """组合键（手势配置中的 ["hotkey", ...]），不移动光标"""
+        self.backend.hotkey(*keys, presses=times)
+    def scroll(self, clicks, times=1):
+        """滚动（手势配置中的 ["scroll", 滚动量]）"""
+        self.reset('scroll')
+        self.backend.scroll(clicks * times)
+    def pointer_in_target(self):
+        """光标是否仍在目标区域内"""
+        if self.target_area is None:
+            return False
+        x, y = self.backend.position()
+        left, top, right, bottom = self.target_area
+        return left <= x <= right and top <= y <= bottom
+    def reset(self, action=None):
+        """光标离开目标区域时移回屏幕中央，动画时长由该动作的策略决定"""
+        if self.pointer_in_target():
+            return
+        duration = self.animations.get(action, 0)
+        self.backend.move_to(self.screen_width/2, self.screen_height/2, duration=duration)
@@ -0,0 +1,197 @@
+"""
+串口/USB 手势传输：手势设备直接接在本机上，不经过 MQTT 代理。
+
+帧格式（字节流中逐帧排列）：
+    同步头 0xA5 0x5A | 长度 u8 | 载荷 (长度字节) | CRC-16/CCITT-FALSE u16（大端，覆盖长度和载荷）
+载荷与 MQTT 消息相同（gesture_protocol 的文本、JSON 或二进制格式），收到后走同一条处理路径；
+另有采样帧，供本机识别手势（gesture_recognition）：
+    版本字节 0xB1 | 通道数 u8 | 各通道采样值 f32（大端）
+
+接收线程（gesture_transport.Threaded_Subscriber）按 pyserial 缓冲区中已有的字节数读取，
+没有数据时最多阻塞 read_timeout 秒，界面线程不会被阻塞。同步头、长度或校验出错时从下一个字节重新寻找同步头，
+错误的帧计入 crc_errors，跳过的字节计入 dropped_bytes。
+串口断开（如拔出 USB）后按与 MQTT 相同的退避策略重新打开。
+
+在 Linux 上可以用伪终端对代替真实设备：
+    master, slave = os.openpty()
+    subscriber = Serial_Subscriber(os.ttyname(slave))
+    os.write(master, encode_frame(encode_binary("1", 0)))
+"""
+import binascii
+import struct
+
+from gesture_protocol import GestureMessage
+from gesture_transport import Threaded_Subscriber
+import latency_metrics
+
+SYNC = b'\xA5\x5A'
+MAX_PAYLOAD = 255
+SAMPLE_VERSION = 0xB1
+
+_LENGTH = struct.Struct('>B')
+_CRC = struct.Struct('>H')
+_SAMPLE_HEADER = struct.Struct('>BB')
+
+
+def crc16(data):
+    """CRC-16/CCITT-FALSE（多项式 0x1021，初值 0xFFFF），binascii 的 C 实现"""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(payload):
+    """把一条载荷封装为串口帧"""
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"载荷过长: {len(payload)} 字节")
+    body = _LENGTH.pack(len(payload)) + payload
+    return SYNC + body + _CRC.pack(crc16(body))
+
+
+def encode_samples(frame):
+    """把一帧采样值封装为采样载荷（再用 encode_frame 成帧）"""
+    return _SAMPLE_HEADER.pack(SAMPLE_VERSION, len(frame)) + struct.pack(f'>{len(frame)}f', *frame)
+
+
+def decode_samples(payload):
+    """解析采样载荷，返回采样值元组，格式不符时返回 None"""
+    if len(payload) < _SAMPLE_HEADER.size or payload[0] != SAMPLE_VERSION:
+        return None
+    channels = payload[1]
+    if len(payload) != _SAMPLE_HEADER.size + 4 * channels:
+        return None
+    return struct.unpack_from(f'>{channels}f', payload, _SAMPLE_HEADER.size)
+
+
+class FrameDecoder():
+    """
+    串口字节流 -> 载荷。
+
+    feed() 可以传入任意切分的字节块，不完整的帧保留到下一次。
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.frames = 0  # 校验通过的帧数
+        self.crc_errors = 0  # 长度或校验不符的帧数
+        self.dropped_bytes = 0  # 重新同步时跳过的字节数
+
+    def feed(self, data):
+        """写入收到的字节，返回其中完整且校验通过的载荷列表"""
+        buffer = self._buffer
+        buffer += data
+        payloads = []
+        start = 0
+        while True:
+            sync = buffer.find(SYNC, start)
+            if sync < 0:
+                # 末尾可能是半个同步头，保留一个字节
+                keep = 1 if buffer.endswith(SYNC[:1]) else 0
+                self.dropped_bytes += len(buffer) - start - keep
+                start = len(buffer) - keep
+                break
+            self.dropped_bytes += sync - start
+            if sync + 3 > len(buffer):
+                start = sync
+                break
+            length = buffer[sync + 2]
+            end = sync + 3 + length + _CRC.size
+            if end > len(buffer):
+                start = sync
+                break
+            body = bytes(buffer[sync + 2:sync + 3 + length])
+            if _CRC.unpack_from(buffer, end - _CRC.size)[0] == crc16(body):
+                payloads.append(body[1:])
+                self.frames += 1
+                start = end
+            else:
+                # 跳过这个同步头，从下一个字节重新寻找，避免一次误同步吞掉后面的正常帧
+                self.crc_errors += 1
+                self.dropped_bytes += 1
+                start = sync + 1
+        del buffer[:start]
+        return payloads
+
+
+class Serial_Subscriber(Threaded_Subscriber):
+    """
+    串口手势接收端，信号和状态与 Mqtt_Subscriber 相同。
+
+    构造函数参数：
+    port: 串口名（'COM3'、'/dev/ttyACM0'）或 pyserial 支持的 URL（如 'loop://'）
+    baudrate: 波特率
+    recognizer: gesture_recognition.GestureRecognizer，给定时把采样帧交给它识别，
+                识别出的命令走与设备发来的命令相同的处理路径
+    options: 其余传给 Threaded_Subscriber 的关键字参数（read_timeout、command_filter、max_command_age……）
+    """
+    display_name = "串口"
+
+    def __init__(self, port, baudrate=115200, recognizer=None, **options):
+        super().__init__(logger_name=f"SerialClient.{port}", **options)
+        self.port = port
+        self.baudrate = baudrate
+        self.recognizer = recognizer
+        self.decoder = FrameDecoder()
+        self.recognized = 0  # 由采样识别出的手势数
+        self._serial = None
+
+    def endpoint(self):
+        return f"{self.display_name} {self.port}（{self.baudrate} baud）"
+
+    def _open(self):
+        import serial
+        self.logger.info(f"打开串口: {self.port} @ {self.baudrate}")
+        self._serial = serial.serial_for_url(self.port, baudrate=self.baudrate, timeout=self.read_timeout)
+        self.decoder = FrameDecoder()  # 丢弃断开前不完整的帧
+
+    def _receive(self):
+        link = self._serial
+        return link.read(link.in_waiting or 1) or None
+
+    def _close(self):
+        if self._serial is not None:
+            self._serial.close()
+            self._serial = None
+
+    def _interrupt(self):
+        link = self._serial
+        if link is not None and hasattr(link, 'cancel_read'):
+            try:
+                link.cancel_read()
+            except Exception:
+                pass
+
+    def _handle(self, data):
+        for payload in self.decoder.feed(data):
+            if payload and payload[0] == SAMPLE_VERSION:
+                self._handle_samples(payload)
+            else:
+                self.handle_payload(payload)
+
+    def _handle_samples(self, payload):
+        """采样帧交给识别器；离焦时照常写入缓冲区，只丢弃识别结果"""
+        recognizer = self.recognizer
+        if recognizer is None:
+            return
+        frame = decode_samples(payload)
+        if frame is None or len(frame) != recognizer.channels:
+            self.invalid_dropped += 1
+            return
+        command = recognizer.push(frame)
+        if command is None:
+            return
+        self.recognized += 1
+        if self.target_focused is False:
+            self.gated += 1
+            return
+        self.handle_message(GestureMessage(command, None, None, None), trace=latency_metrics.new_trace())
+
+    def get_link_stats(self):
+        """获取串口链路计数"""
+        decoder = self.decoder
+        return {
+            'state': self.state,
+            'frames': decoder.frames,
+            'crc_errors': decoder.crc_errors,
+            'dropped_bytes': decoder.dropped_bytes,
+            'reconnects': self.reconnect_count,
+            'recognized': self.recognized,
+        }
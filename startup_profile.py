@@ -0,0 +1,126 @@
+"""
+启动耗时分析（python main.py --profile-startup）。
+
+- 导入耗时：替换 builtins.__import__，记录每个首次导入的模块的累计耗时和自身耗时
+  （自身耗时 = 累计耗时 - 其中嵌套导入的模块耗时），类似 python -X importtime，
+  但打包后的程序也能使用
+- 阶段耗时：main.py 用 phase() 包住各启动阶段，用 mark() 记录时间点（如首帧绘制）
+
+默认关闭：PROFILER 为 None 时 phase() 返回空上下文，mark() 直接返回。
+"""
+import builtins
+import contextlib
+import sys
+import threading
+import time
+
+PROFILER = None  # 全局分析器，None 表示未启用
+
+
+class StartupProfiler():
+    """
+    启动耗时记录器。
+
+    所有时间都相对于创建时刻（秒）。导入记录按线程分别维护嵌套栈，
+    后台线程中的预加载导入同样会被记录。
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = []  # (模块名, 开始, 累计耗时, 自身耗时, 嵌套深度, 线程名)
+        self.phases = []  # (阶段名, 开始, 耗时)
+        self.marks = []  # (时间点名, 时间)
+        self._local = threading.local()
+        self._original_import = None
+
+    def install(self):
+        """开始记录导入"""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        """停止记录导入"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # 已导入的模块和相对导入只是一次字典查找，不记录
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # 嵌套导入的累计耗时
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.imports.append((name, start - self.started, elapsed, elapsed - children, len(stack),
+                                 threading.current_thread().name))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """记录一个启动阶段的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.started, time.perf_counter() - start))
+
+    def mark(self, name):
+        """记录一个时间点"""
+        self.marks.append((name, time.perf_counter() - self.started))
+
+    def report(self, top=25):
+        """生成文字报告：各阶段、时间点，以及累计耗时最多的 top 个导入"""
+        lines = ["⏱ 启动阶段（开始时间 / 耗时，毫秒）:"]
+        for name, start, elapsed in sorted(self.phases, key=lambda phase: phase[1]):
+            lines.append(f"  {start * 1000:9.1f}  {elapsed * 1000:9.1f}  {name}")
+        if self.marks:
+            lines.append("⏱ 时间点（毫秒）:")
+            for name, at in self.marks:
+                lines.append(f"  {at * 1000:9.1f}  {name}")
+        total = sum(record[2] for record in self.imports if record[4] == 0)
+        lines.append(f"⏱ 导入耗时最多的模块（共 {len(self.imports)} 个模块，顶层导入合计 {total * 1000:.1f}ms）:")
+        lines.append("  累计(ms)  自身(ms)  开始(ms)  模块")
+        for name, start, elapsed, own, depth, thread in sorted(self.imports, key=lambda record: -record[2])[:top]:
+            where = "" if thread == 'MainThread' else f"  [{thread}]"
+            lines.append(f"  {elapsed * 1000:8.1f}  {own * 1000:8.1f}  {start * 1000:8.1f}  "
+                         f"{'  ' * depth}{name}{where}")
+        return '\n'.join(lines)
+
+
+def enable():
+    """启用启动耗时分析，应在导入重型模块之前调用"""
+    global PROFILER
+    if PROFILER is None:
+        PROFILER = StartupProfiler()
+        PROFILER.install()
+    return PROFILER
+
+
+def phase(name):
+    """记录启动阶段；未启用时返回空上下文"""
+    if PROFILER is None:
+        return contextlib.nullcontext()
+    return PROFILER.phase(name)
+
+
+def mark(name):
+    """记录时间点；未启用时不做任何事"""
+    if PROFILER is not None:
+        PROFILER.mark(name)
+
+
+def finish(top=25):
+    """停止记录并打印报告"""
+    if PROFILER is None:
+        return
+    PROFILER.uninstall()
+    print(PROFILER.report(top))
@@ -0,0 +1,28 @@
+import os
+import sys
+import time
+
+import pytest
+
+# 模块都在仓库根目录；Qt 测试不需要显示器
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qt_app():
+    from PySide6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def wait_until():
+    """轮询等待条件成立，超时返回 False"""
+    def wait(condition, timeout=5.0, interval=0.01):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(interval)
+        return True
+    return wait
@@ -0,0 +1,19 @@
+from action_executor import ActionExecutor
+from gesture_profiles import MAX_REPEAT
+
+
+def test_coalesced_batches_never_exceed_max_repeat():
+    executor = ActionExecutor({"1": print}, max_pending=16)
+    assert executor.submit("1", times=MAX_REPEAT) == 'queued'
+    assert executor.submit("1", times=MAX_REPEAT) == 'queued'
+    assert executor.submit("1", times=MAX_REPEAT - 1) == 'queued'
+    assert executor.submit("1") == 'coalesced'
+    assert executor.submit("1") == 'queued'
+    assert [entry[1] for entry in executor._pending] == [MAX_REPEAT, MAX_REPEAT, MAX_REPEAT, 1]
+
+
+def test_single_submission_is_clamped_but_absolute_targets_are_not():
+    executor = ActionExecutor({"1": print, "6": print}, max_times=10)
+    executor.submit("1", times=1000)
+    executor.submit("6", times=120)
+    assert [entry[:2] for entry in executor._pending] == [["1", 10], ["6", 120]]
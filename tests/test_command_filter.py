@@ -0,0 +1,21 @@
+from command_filter import CommandFilter
+
+
+def test_parameterized_commands_share_the_base_window():
+    emitted = []
+    command_filter = CommandFilter(lambda command, trace: emitted.append(command), debounce=0,
+                                   windows={"1": 10})
+    assert command_filter.window_for("1:10") == 10
+    assert command_filter.submit("1:10")
+    assert not command_filter.submit("1:3")
+    assert emitted == ["1:10"]
+
+
+def test_malformed_argument_falls_back_to_raw_command():
+    emitted = []
+    command_filter = CommandFilter(lambda command, trace: emitted.append(command), debounce=10)
+    assert command_filter.window_for("1:x") == 10
+    assert command_filter.submit("1:x")
+    assert not command_filter.submit("1:x")
+    assert command_filter.submit("1")
+    assert emitted == ["1:x", "1"]
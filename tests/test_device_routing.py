@@ -0,0 +1,23 @@
+from device_routing import DevicePolicy, DeviceRouter
+
+
+def test_unknown_devices_beyond_max_routes_are_unrouted():
+    router = DeviceRouter(default_policy=DevicePolicy(rate=1, burst=1), max_routes=1)
+    first = router.route("gesture/ring/control")
+    assert router.admit(first, "1") == "1"
+    admitted = 0
+    for _ in range(100):
+        route = router.route("gesture/camera/control")
+        if route is not None and router.admit(route, "1") is not None:
+            admitted += 1
+    assert admitted == 0
+    stats = router.stats()
+    assert stats['_unrouted'] == 100
+    assert set(stats) == {"ring", "_unrouted"}
+
+
+def test_known_route_keeps_its_rate_limit():
+    router = DeviceRouter(default_policy=DevicePolicy(rate=1, burst=1), max_routes=1)
+    results = [router.admit(router.route("gesture/ring/control"), "1") for _ in range(100)]
+    assert results.count("1") == 1
+    assert router.stats()["ring"]['rate_limited'] == 99
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import focus_snapshot
+from focus_snapshot import FocusSnapshot, _SEQUENCE
+
+
+def window(process_name, title=''):
+    return {'window_handle': 1, 'window_title': title, 'class_name': 'screenClass', 'process_id': 42,
+            'process_name': process_name}
+
+
+def test_read_returns_latest_write():
+    snapshot = FocusSnapshot.create()
+    assert snapshot.read() is None
+    snapshot.write(window("POWERPNT.EXE", "deck.pptx"))
+    info = snapshot.read()
+    assert (info['process_name'], info['window_title']) == ("POWERPNT.EXE", "deck.pptx")
+    assert snapshot.read() is info  # 序号未变，直接返回上一次的结果
+
+
+def test_writer_killed_mid_write_does_not_hang_reader():
+    snapshot = FocusSnapshot.create()
+    snapshot.write(window("POWERPNT.EXE"))
+    consistent = snapshot.read()
+    # 写入方在序号为奇数时被终止
+    _SEQUENCE.pack_into(snapshot._buffer, 0, snapshot.sequence() + 1)
+    start = time.monotonic()
+    assert snapshot.read() is consistent
+    assert time.monotonic() - start < 0.5
+    assert snapshot.stale_reads == 1
+    assert snapshot.retries == focus_snapshot.MAX_READ_ATTEMPTS - 1
+
+
+def test_never_consistent_returns_none():
+    snapshot = FocusSnapshot.create()
+    _SEQUENCE.pack_into(snapshot._buffer, 0, 1)
+    assert snapshot.read() is None
+
+
+def test_concurrent_reads_are_never_torn():
+    snapshot = FocusSnapshot.create()
+    stop = threading.Event()
+
+    def writer():
+        index = 0
+        while not stop.is_set():
+            snapshot.write(window(f"APP{index % 3}.EXE", f"APP{index % 3}.EXE"))
+            index += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(2000):
+            info = snapshot.read()
+            if info is not None:
+                assert info['window_title'] == info['process_name']
+    finally:
+        stop.set()
+        thread.join()
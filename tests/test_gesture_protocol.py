@@ -0,0 +1,108 @@
+import pytest
+
+from gesture_protocol import SequenceWindow, decode_payload, encode_binary
+
+
+def test_duplicate_and_reordered_sequences():
+    window = SequenceWindow()
+    assert window.accept(6, 1.1)
+    assert window.accept(5, 1.0)  # 窗口内的乱序消息
+    assert not window.accept(6, 1.1)
+    assert not window.accept(5, 1.0)
+    assert window.duplicates == 2
+
+
+def test_publisher_restart_detected_by_timestamp():
+    window = SequenceWindow()
+    for sequence in range(300):
+        assert window.accept(sequence, 1000 + sequence * 0.01)
+    # 重启后序号从 0 开始，时间戳比已收到的都新
+    assert all(window.accept(sequence, 1010 + sequence * 0.01) for sequence in range(221))
+    assert window.restarts == 1
+    assert window.duplicates == 0
+    # 重启前的旧消息重发仍按重复丢弃
+    assert not window.accept(5, 1000.05)
+
+
+def test_restart_after_few_messages_with_timestamp():
+    window = SequenceWindow()
+    for sequence in range(3):
+        window.accept(sequence, 1000 + sequence)
+    assert window.accept(0, 2000)
+    assert window.accept(1, 2001)
+    assert window.restarts == 1
+
+
+def test_publisher_restart_without_timestamp():
+    window = SequenceWindow()
+    for sequence in range(300):
+        window.accept(sequence)
+    assert all(window.accept(sequence) for sequence in range(221))
+    assert window.restarts == 1
+    assert not window.accept(220)
+
+
+@pytest.mark.parametrize('payload', [
+    b'{"cmd": "1", "arg": 1e999}',
+    b'{"cmd": "1", "arg": NaN}',
+    b'{"cmd": "1", "arg": 4294967296}',
+    b'{"cmd": "1", "ts": 1e999}',
+    b'{"cmd": "1", "ts": NaN}',
+    b'{"cmd": "1", "ts": "inf"}',
+    b'{"cmd": "1", "arg": "x"}',
+    b'1:99999999999999999999',
+    b'1:x',
+    b'{"cmd": "1:x"}',
+    b'{"cmd": "1:10"}',
+    b'{"cmd": "9", "ts": 5}',
+    b'{"cmd": "next"}',
+])
+def test_malformed_numbers_are_invalid(payload):
+    assert decode_payload(payload) is None
+
+
+def test_arguments_in_every_format():
+    assert decode_payload(b'1:10') == ("1", None, None, 10)
+    assert decode_payload(b'{"cmd": "6", "ts": 5, "arg": 12}') == ("6", 5.0, None, 12)
+    assert decode_payload(encode_binary("1", 3, None, 10)) == ("1", None, 3, 10)
+
+
+def test_bad_packet_does_not_reopen_the_transport(qt_app, wait_until):
+    import socket
+    from lan_transport import Udp_Subscriber
+
+    subscriber = Udp_Subscriber(host="127.0.0.1", port=0, command_filter={'debounce': 0})
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            sender.sendto(b'{"cmd": "1", "arg": 1e999}', ("127.0.0.1", subscriber.port))
+            assert wait_until(lambda: subscriber.invalid_dropped == 1)
+            sender.sendto(b'{"cmd": "1:x"}', ("127.0.0.1", subscriber.port))
+            assert wait_until(lambda: subscriber.invalid_dropped == 2)
+        assert subscriber.reconnect_count == 0
+        assert subscriber.state == "connected"
+    finally:
+        subscriber.stop()
+
+
+def test_failing_message_is_counted_invalid_without_reconnect(qt_app, wait_until):
+    import socket
+    from lan_transport import Udp_Subscriber
+
+    subscriber = Udp_Subscriber(host="127.0.0.1", port=0, command_filter={'debounce': 0})
+
+    def failing_submit(command, trace=None):
+        raise ValueError(command)
+
+    subscriber.command_filter.submit = failing_submit
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            sender.sendto(b'1', ("127.0.0.1", subscriber.port))
+            assert wait_until(lambda: subscriber.invalid_dropped == 1)
+        assert subscriber.reconnect_count == 0
+        assert subscriber.state == "connected"
+    finally:
+        subscriber.stop()
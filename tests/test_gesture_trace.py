@@ -0,0 +1,41 @@
+import gesture_trace
+from action_executor import ActionExecutor
+
+
+def test_records_dispatched_action_and_process(tmp_path):
+    path = tmp_path / "presenter.trace"
+    focus = ["POWERPNT.EXE"]
+    recorder = gesture_trace.TraceRecorder(str(path), flush_interval=0.01, focus_provider=lambda: focus[0])
+    recorder.record("1", 'passed', 0.002, 7)
+    recorder.record_dispatch("1", 'queued', 'down_sliding')
+    recorder.record_dispatch("9", 'unmapped')
+    focus[0] = None
+    recorder.record("0", 'gated')
+    recorder.close()
+
+    records = gesture_trace.read_trace(str(path))
+    assert [(r.command, r.outcome, r.process, r.action, r.focus) for r in records] == [
+        ("1", 'passed', "POWERPNT.EXE", None, True),
+        ("1", 'queued', "POWERPNT.EXE", 'down_sliding', True),
+        ("9", 'unmapped', "POWERPNT.EXE", None, True),
+        ("0", 'gated', None, None, False),
+    ]
+    summary = gesture_trace.summarize(records)
+    assert summary['records'] == 2
+    assert summary['dispatch'] == {'queued': 1, 'unmapped': 1}
+    assert summary['actions'] == {'down_sliding': 1}
+
+
+def test_reads_v1_traces(tmp_path):
+    path = tmp_path / "old.trace"
+    path.write_text("# gesture-trace v1 start=1\n0.1\t1\t1\tpassed\t-\t-\n", encoding='utf-8')
+    record, = gesture_trace.read_trace(str(path))
+    assert (record.command, record.focus, record.process, record.action) == ("1", True, None, None)
+
+
+def test_executor_reports_what_it_did_with_each_command():
+    executor = ActionExecutor({"up_sliding": print, "down_sliding": print}, max_pending=2)
+    assert executor.submit("down_sliding") == 'queued'
+    assert executor.submit("down_sliding") == 'coalesced'
+    assert executor.submit("up_sliding", times=2) == 'cancelled'
+    assert executor.submit("zoom_in") is None
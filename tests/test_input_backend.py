@@ -0,0 +1,17 @@
+import pytest
+
+from gesture_profiles import MAX_REPEAT
+from input_backend import WHEEL_DELTA_MAX, _wheel_chunks
+
+
+@pytest.mark.parametrize('clicks', [0, 1, -120, WHEEL_DELTA_MAX, -WHEEL_DELTA_MAX - 1,
+                                    1000 * MAX_REPEAT, -1000 * MAX_REPEAT])
+def test_wheel_chunks_stay_in_16_bit_range(clicks):
+    chunks = list(_wheel_chunks(clicks))
+    assert sum(chunks) == clicks
+    assert all(abs(chunk) <= WHEEL_DELTA_MAX for chunk in chunks)
+    assert all(chunk * clicks >= 0 for chunk in chunks)
+
+
+def test_large_scroll_is_split():
+    assert list(_wheel_chunks(-50000)) == [-WHEEL_DELTA_MAX, -50000 + WHEEL_DELTA_MAX]
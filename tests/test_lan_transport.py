@@ -0,0 +1,121 @@
+import socket
+
+import pytest
+from PySide6.QtCore import Qt
+
+from gesture_protocol import encode_binary
+from lan_transport import Udp_Subscriber, Zmq_Subscriber
+
+try:
+    import zmq
+except ImportError:
+    zmq = None
+
+needs_zmq = pytest.mark.skipif(zmq is None, reason="未安装 pyzmq")
+
+
+class UdpLink():
+    def __init__(self, **options):
+        self.subscriber = Udp_Subscriber(host="127.0.0.1", port=0, **options)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, payload):
+        self._socket.sendto(payload, ("127.0.0.1", self.subscriber.port))
+
+    def close(self):
+        self._socket.close()
+
+
+class ZmqPushLink():
+    """设备端 PUSH 连接到本机 bind 的 PULL"""
+
+    def __init__(self, **options):
+        self.subscriber = Zmq_Subscriber("tcp://127.0.0.1:*", mode='pull', **options)
+        self._socket = None
+
+    def send(self, payload):
+        if self._socket is None:
+            self._socket = zmq.Context.instance().socket(zmq.PUSH)
+            self._socket.setsockopt(zmq.LINGER, 0)
+            self._socket.connect(self.subscriber.address)
+        self._socket.send(payload)
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+
+
+class ZmqPubLink():
+    """设备端 PUB bind，本机 SUB 连接过去"""
+
+    def __init__(self, **options):
+        self._socket = zmq.Context.instance().socket(zmq.PUB)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        self._socket.bind("tcp://127.0.0.1:*")
+        self.subscriber = Zmq_Subscriber(self._socket.getsockopt_string(zmq.LAST_ENDPOINT), mode='sub', **options)
+
+    def send(self, payload):
+        self._socket.send(payload)
+
+    def close(self):
+        self._socket.close()
+
+
+@pytest.fixture(params=[pytest.param(UdpLink, id='udp'),
+                        pytest.param(ZmqPushLink, id='zmq-pull', marks=needs_zmq),
+                        pytest.param(ZmqPubLink, id='zmq-sub', marks=needs_zmq)])
+def link(request, qt_app, wait_until):
+    link = request.param(command_filter={'debounce': 0}, max_command_age=None, read_timeout=0.05)
+    link.received = []
+    link.subscriber.signal.connect(lambda command, trace: link.received.append(command), Qt.DirectConnection)
+    link.subscriber.start()
+    assert wait_until(lambda: link.subscriber.state == "connected")
+    yield link
+    link.subscriber.stop()
+    link.close()
+
+
+def deliver(link, wait_until, payload, expected):
+    """SUB 连接建立前 PUB 发出的消息会丢失，重发直到收到为止"""
+    for _ in range(50):
+        link.send(payload)
+        if wait_until(lambda: link.received == expected, timeout=0.1):
+            return True
+    return False
+
+
+def test_signal_fires(link, wait_until):
+    assert deliver(link, wait_until, encode_binary("1", 0), ["1"])
+    link.send(encode_binary("6", 1, None, 12))
+    link.send(b"2")
+    assert wait_until(lambda: link.received == ["1", "6:12", "2"])
+
+
+def test_duplicate_sequences_dropped(link, wait_until):
+    assert deliver(link, wait_until, encode_binary("1", 0), ["1"])
+    duplicates = link.subscriber.sequence_window.duplicates  # 重发到达前的副本也算重复
+    for sequence in (0, 1, 1, 0, 2):
+        link.send(encode_binary("1", sequence))
+    assert wait_until(lambda: link.subscriber.sequence_window.duplicates == duplicates + 3)
+    assert wait_until(lambda: link.received == ["1", "1", "1"])
+
+
+def test_focus_gate_blocks_delivery(link, wait_until):
+    assert deliver(link, wait_until, encode_binary("1", 0), ["1"])
+    link.subscriber.set_target_focus(False)
+    for sequence in (1, 2, 3):
+        link.send(encode_binary("0", sequence))
+    assert wait_until(lambda: link.subscriber.gated == 3)
+    link.subscriber.set_target_focus(True)
+    link.send(encode_binary("2", 4))
+    assert wait_until(lambda: link.received == ["1", "2"])
+
+
+def test_stop_releases_udp_port(qt_app, wait_until):
+    subscriber = Udp_Subscriber(host="127.0.0.1", port=0, read_timeout=0.05)
+    subscriber.start()
+    assert wait_until(lambda: subscriber.state == "connected")
+    subscriber.stop()
+    assert subscriber.state == "idle"
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", subscriber.port))
@@ -0,0 +1,116 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from PySide6.QtCore import Qt
+
+from broker_stub import BrokerStub
+from Subscriber import Mqtt_Subscriber
+
+
+@pytest.fixture
+def broker():
+    broker = BrokerStub().start()
+    yield broker
+    broker.stop()
+
+
+def make_subscriber(broker, client_id):
+    subscriber = Mqtt_Subscriber(broker="127.0.0.1", port=broker.port, client_id=client_id,
+                                 command_filter={'debounce': 0}, max_command_age=None, retry_interval=0.05,
+                                 max_retry_interval=0.2)
+    received = []
+    subscriber.signal.connect(lambda command, trace: received.append(command), Qt.DirectConnection)
+    return subscriber, received
+
+
+def test_gestures_queued_during_outage_arrive_after_restart(qt_app, broker, wait_until):
+    subscriber, received = make_subscriber(broker, "test_outage")
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        broker.stop()
+        assert wait_until(lambda: subscriber.state == "retrying")
+        for command in ("1", "0", "3"):
+            broker.publish(subscriber.topic, command.encode('utf-8'), qos=1)
+        broker.start()
+        assert wait_until(lambda: len(received) >= 3)
+        assert received == ["1", "0", "3"]
+        assert subscriber.get_connection_stats()['reconnects'] == 1
+        assert subscriber.state == "connected"
+    finally:
+        subscriber.stop()
+
+
+def test_subscription_restored_when_broker_loses_session(qt_app, broker, wait_until):
+    subscriber, received = make_subscriber(broker, "test_resubscribe")
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        broker.stop()
+        broker.sessions.clear()  # 不带持久化的代理重启：订阅和排队消息都丢失
+        broker.start()
+        assert wait_until(lambda: subscriber.topic in getattr(broker.sessions.get("test_resubscribe"),
+                                                              'subscriptions', {}))
+        broker.publish(subscriber.topic, b"2", qos=1)
+        assert wait_until(lambda: received == ["2"])
+    finally:
+        subscriber.stop()
+
+
+def test_stale_session_from_previous_run_is_purged(qt_app, broker, wait_until):
+    previous, _ = make_subscriber(broker, "test_purge")
+    previous.start()
+    assert wait_until(lambda: previous.state == "connected")
+    previous.stop()
+    # 上一次运行退出后，代理仍为它的持久会话排队
+    assert wait_until(lambda: broker.sessions["test_purge"].connection is None)
+    for command in ("1", "1", "1"):
+        broker.publish(previous.topic, command.encode('utf-8'), qos=1)
+    assert len(broker.sessions["test_purge"].offline_queue) == 3
+
+    subscriber, received = make_subscriber(broker, "test_purge")
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        broker.publish(subscriber.topic, b"4", qos=1)
+        assert wait_until(lambda: received)
+        assert received == ["4"]
+    finally:
+        subscriber.stop()
+
+
+class LaggingBroker(BrokerStub):
+    """延迟处理断开：清理用的 clean session 还没删掉，真正的连接就到了"""
+
+    def _on_session_offline(self, session):
+        time.sleep(0.05)
+        super()._on_session_offline(session)
+
+
+def test_connect_before_purge_session_is_dropped_still_subscribes(qt_app, wait_until):
+    broker = LaggingBroker().start()
+    subscriber, received = make_subscriber(broker, "test_purge_race")
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        assert wait_until(lambda: subscriber.topic in getattr(broker.sessions.get("test_purge_race"),
+                                                              'subscriptions', {}))
+        broker.publish(subscriber.topic, b"1", qos=1)
+        assert wait_until(lambda: received == ["1"])
+    finally:
+        subscriber.stop()
+        broker.stop()
+
+
+def test_session_present_ignored_until_subscribed_in_this_process(qt_app, broker):
+    subscriber, _ = make_subscriber(broker, "test_session_present")
+    subscribed = []
+    subscriber.client.subscribe = lambda topic, qos=0: subscribed.append((topic, qos))
+    subscriber.on_connect(subscriber.client, None, SimpleNamespace(session_present=True), 0)
+    assert subscribed == [(subscriber.topic, 1)]
+
+    subscriber.on_subscribe(subscriber.client, None, 1, [1])
+    subscriber.on_connect(subscriber.client, None, SimpleNamespace(session_present=True), 0)
+    assert subscribed == [(subscriber.topic, 1)]
+    assert subscriber.state == "connected"
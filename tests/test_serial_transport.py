@@ -0,0 +1,120 @@
+import os
+import tty
+
+import pytest
+from PySide6.QtCore import Qt
+
+from gesture_protocol import encode_binary, encode_text
+from serial_transport import FrameDecoder, Serial_Subscriber, encode_frame, encode_samples, decode_samples
+
+
+def frame(command, sequence=0):
+    return encode_frame(encode_binary(command, sequence))
+
+
+def test_frames_split_across_reads():
+    data = frame("1", 0) + frame("2", 1) + encode_frame(b"3:4")
+    decoder = FrameDecoder()
+    payloads = []
+    for index in range(len(data)):
+        payloads += decoder.feed(data[index:index + 1])
+    assert payloads == [encode_binary("1", 0), encode_binary("2", 1), b"3:4"]
+    assert (decoder.frames, decoder.crc_errors, decoder.dropped_bytes) == (3, 0, 0)
+
+
+def test_junk_between_frames_is_skipped():
+    decoder = FrameDecoder()
+    assert decoder.feed(b"noise" + frame("1") + b"\x00\xA5\x01" + frame("0")) == [
+        encode_binary("1", 0), encode_binary("0", 0)]
+    assert decoder.dropped_bytes == 8
+
+
+def test_resync_after_bad_crc():
+    corrupted = bytearray(frame("1", 0))
+    corrupted[-1] ^= 0xFF
+    decoder = FrameDecoder()
+    assert decoder.feed(bytes(corrupted) + frame("2", 1)) == [encode_binary("2", 1)]
+    assert decoder.crc_errors == 1
+
+
+def test_false_sync_inside_payload_does_not_swallow_next_frame():
+    # 长度字节很大的假同步头：等待更多数据期间，后面的正常帧不能丢
+    decoder = FrameDecoder()
+    assert decoder.feed(b"\xA5\x5A\xF0" + frame("1")) == []
+    assert decoder.feed(bytes(255)) == [encode_binary("1", 0)]
+
+
+def test_sample_payload_round_trip():
+    payload = encode_samples((0.5, -1.0, 2.0))
+    assert decode_samples(payload) == (0.5, -1.0, 2.0)
+    assert decode_samples(payload[:-1]) is None
+
+
+@pytest.fixture
+def pty_pair():
+    master, slave = os.openpty()
+    tty.setraw(master)
+    yield master, os.ttyname(slave)
+    for fd in (master, slave):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def make_subscriber(port, **options):
+    subscriber = Serial_Subscriber(port, command_filter={'debounce': 0}, max_command_age=None,
+                                   read_timeout=0.05, **options)
+    received = []
+    subscriber.signal.connect(lambda command, trace: received.append(command), Qt.DirectConnection)
+    return subscriber, received
+
+
+def test_commands_over_pty(qt_app, pty_pair, wait_until):
+    master, port = pty_pair
+    subscriber, received = make_subscriber(port)
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        data = frame("1", 0) + b"junk" + frame("1", 0) + encode_frame(encode_text("2", argument=3))
+        os.write(master, data[:5])
+        os.write(master, data[5:])
+        assert wait_until(lambda: received == ["1", "2:3"])
+        stats = subscriber.get_link_stats()
+        assert stats['frames'] == 3 and stats['dropped_bytes'] == 4
+        assert subscriber.sequence_window.duplicates == 1
+    finally:
+        subscriber.stop()
+
+
+def test_reopens_after_port_disappears(qt_app, tmp_path, wait_until):
+    # 用符号链接模拟 USB 设备：拔出时链接失效，插回后指向新的伪终端
+    port = str(tmp_path / "ttyGESTURE")
+    master, slave = os.openpty()
+    tty.setraw(master)
+    os.symlink(os.ttyname(slave), port)
+    subscriber, received = make_subscriber(port, retry_interval=0.05, max_retry_interval=0.1)
+    subscriber.start()
+    try:
+        assert wait_until(lambda: subscriber.state == "connected")
+        os.write(master, frame("1", 0))
+        assert wait_until(lambda: received == ["1"])
+
+        os.unlink(port)
+        os.close(master)
+        os.close(slave)
+        assert wait_until(lambda: subscriber.state in ("retrying", "connecting") and not subscriber.connected)
+
+        master, slave = os.openpty()
+        tty.setraw(master)
+        os.symlink(os.ttyname(slave), port)
+        assert wait_until(lambda: subscriber.state == "connected" and subscriber.reconnect_count == 1)
+        os.write(master, frame("0", 1))
+        assert wait_until(lambda: received == ["1", "0"])
+    finally:
+        subscriber.stop()
+        for fd in (master, slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
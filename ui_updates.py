@@ -0,0 +1,138 @@
+"""
+界面状态更新：一次性样式表 + 动态属性 + 按帧合并的标签更新。
+
+- 样式表只在创建窗口时设置一次（Qt 只解析一次），标签的“激活”配色由动态属性
+  active 选择，切换状态只需 setProperty + 重新 polish，不再每次拼接并解析新的 CSS
+- 文字和状态的修改先记下，每帧（FRAME_INTERVAL_MS）最多应用一次：同一帧内的多次
+  修改只保留最后一次，与当前内容相同时不触发重绘。焦点来回切换、手势连发时界面不卡顿
+- 计数：修改请求数、实际应用数、被跟踪控件的实际重绘数
+"""
+import logging
+import time
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+FRAME_INTERVAL_MS = 16
+
+STYLESHEET = """
+QPushButton#Button1 {
+    background: #4CAF50;
+    color: white;
+    border-radius: 5px;
+    font-weight: bold;
+}
+QPushButton#Button1:hover { background: #45a049; }
+QLabel#label1, QLabel#label2, QLabel#label3 {
+    background: #3c3b31;
+    color: white;
+    border-radius: 5px;
+    font-weight: bold;
+}
+QLabel#label1[active="true"], QLabel#label2[active="true"], QLabel#label3[active="true"] {
+    background: #4CAF50;
+}
+"""
+
+logger = logging.getLogger("UiUpdates")
+
+
+def apply_state(widget, name, value):
+    """设置动态属性并让样式表重新匹配，属性未变化时返回 False"""
+    if widget.property(name) == value:
+        return False
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+    return True
+
+
+class FrameUpdater(QObject):
+    """
+    按帧合并的界面更新器（只能在主线程使用）。
+
+    构造函数参数：
+    parent: 父对象
+    interval: 合并窗口（毫秒），默认一帧
+    """
+
+    def __init__(self, parent=None, interval=FRAME_INTERVAL_MS):
+        super().__init__(parent)
+        self._texts = {}  # 控件 -> 待应用的文字
+        self._states = {}  # (控件, 属性名) -> 待应用的属性值
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.flush)
+        self._report_timer = None
+        self._last_report = None
+        self.requested = 0  # set_text/set_state 调用次数
+        self.applied = 0  # 与当前内容不同、实际应用的修改数
+        self.flushes = 0  # 合并后的应用批次
+        self.repaints = 0  # 被跟踪控件收到的绘制事件数
+
+    def track(self, *widgets):
+        """统计这些控件的实际重绘次数"""
+        for widget in widgets:
+            widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            self.repaints += 1
+        return False
+
+    def set_text(self, label, text):
+        """修改标签文字，下一帧生效"""
+        self.requested += 1
+        self._texts[label] = text
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def set_state(self, widget, name, value):
+        """修改控件的动态属性（样式表状态），下一帧生效"""
+        self.requested += 1
+        self._states[(widget, name)] = value
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """立即应用所有待处理的修改"""
+        self._timer.stop()
+        states, self._states = self._states, {}
+        texts, self._texts = self._texts, {}
+        if not states and not texts:
+            return
+        self.flushes += 1
+        for (widget, name), value in states.items():
+            if apply_state(widget, name, value):
+                self.applied += 1
+        for label, text in texts.items():
+            if label.text() != text:
+                label.setText(text)
+                self.applied += 1
+
+    def stats(self):
+        return {
+            'requested': self.requested,
+            'applied': self.applied,
+            'flushes': self.flushes,
+            'repaints': self.repaints,
+        }
+
+    def start_periodic_report(self, interval):
+        """每隔 interval 秒输出一次更新请求速率与实际重绘速率"""
+        self._last_report = (time.monotonic(), self.stats())
+        self._report_timer = QTimer(self)
+        self._report_timer.timeout.connect(self._report)
+        self._report_timer.start(int(interval * 1000))
+
+    def _report(self):
+        now = time.monotonic()
+        stats = self.stats()
+        last_time, last = self._last_report
+        elapsed = max(now - last_time, 1e-9)
+        rates = {key: (stats[key] - last[key]) / elapsed for key in stats}
+        self._last_report = (now, stats)
+        logger.info(f"界面更新: 请求 {rates['requested']:.1f}/s，实际修改 {rates['applied']:.1f}/s，"
+                    f"批次 {rates['flushes']:.1f}/s，重绘 {rates['repaints']:.1f}/s")